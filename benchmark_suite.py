@@ -0,0 +1,316 @@
+"""Timing suite for the hot paths of all three games.
+
+Each case times one small operation with timeit, taking the best of
+several repeats, and reports seconds per operation. Results can be saved
+as JSON and compared against an earlier run; compare exits with status 1
+when any case got slower than the threshold allows.
+
+importtime imports each game module in a fresh interpreter under
+python -X importtime and exits with status 1 when one takes longer than
+its budget or pulls in a heavy subsystem (NumPy) that should only load
+when it is used.
+
+Run from the repository root:
+    python benchmark_suite.py run --output baseline.json
+    python benchmark_suite.py run --output current.json
+    python benchmark_suite.py compare baseline.json current.json --threshold 0.10
+    python benchmark_suite.py importtime
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import timeit
+
+from game_io import NullRenderer
+from oo_ttt_game.oo_ttt_game import BitBoard, Board, Square, TTTGame
+from oo_twenty_one.oo_twenty_one import CARDS, Deck, Participant, TwentyOneGame
+from rps_game.oop_rps import Player, RPSGame, Rule
+
+# Import budgets in milliseconds, best of several fresh interpreters.
+IMPORT_BUDGETS = {
+    "oo_ttt_game.oo_ttt_game": 50,
+    "oo_twenty_one.oo_twenty_one": 50,
+    "rps_game.oop_rps": 50,
+    "game_server.game_server": 150,
+}
+# Modules none of the above may import.
+HEAVY_MODULES = ("numpy",)
+
+# Squares marked X, O, X, ... on the representative TTT boards.
+TTT_BOARDS = {
+    "empty": (),
+    "opening": (5, 1),
+    "midgame": (5, 1, 9, 3),
+    "won": (1, 4, 2, 5, 3),
+    "full": (1, 2, 3, 5, 4, 6, 8, 7, 9),
+}
+# Boards where the computer (O) to move finds each kind of move.
+TTT_COMPUTER_BOARDS = {
+    "win": (1, 4, 2, 5, 9),
+    "block": (1, 5, 2),
+    "center": (1,),
+    "random": (5, 1, 9),
+}
+
+
+def _ttt_board(board_class, squares):
+    """Return a board with the squares marked alternately X and O."""
+    board = board_class()
+    for index, square in enumerate(squares):
+        marker = Square.HUMAN_MARKER if index % 2 == 0 else Square.COMPUTER_MARKER
+        board.mark_square(square, marker)
+    return board
+
+
+def ttt_check_winner(board_class, squares):
+    """Time TTTGame.check_winner on a fixed board."""
+    game = TTTGame(board_class=board_class, renderer=NullRenderer())
+    game.board = _ttt_board(board_class, squares)
+    return game.check_winner
+
+
+def ttt_computer_moves(squares):
+    """Time TTTGame.computer_moves, resetting the board before each call."""
+    game = TTTGame(difficulty="normal", renderer=NullRenderer())
+    position = _ttt_board(BitBoard, squares).bitmasks()
+    board = game.board
+
+    def run():
+        board.human_bits, board.computer_bits = position
+        game.computer_moves()
+    return run
+
+
+def ttt_full_game():
+    """Time a headless one-round game against a player taking the lowest square."""
+    def run():
+        game = TTTGame(difficulty="normal", max_score=1, renderer=NullRenderer())
+        game.begin()
+        while not game.finished:
+            game.handle(str(game.board.unused_squares()[0]))
+    return run
+
+
+def deck_construction():
+    """Time building a deck and preparing it for a hand."""
+    def run():
+        Deck().prepare_hand()
+    return run
+
+
+def deck_deal():
+    """Time dealing a whole deck, one card at a time."""
+    deck = Deck()
+
+    def run():
+        deck.prepare_hand()
+        for _ in range(len(CARDS)):
+            deck.deal()
+    return run
+
+
+def participant_score(cards):
+    """Time Participant.score on a hand of the given size."""
+    participant = Participant()
+    participant.hand = list(CARDS[:cards])
+    return participant.score
+
+
+def twenty_one_full_game():
+    """Time a headless one-hand game where the player always stays."""
+    def run():
+        game = TwentyOneGame(renderer=NullRenderer())
+        game.begin()
+        while not game.finished:
+            game.handle('s' if game.state == "player_turn" else 'n')
+    return run
+
+
+def rule_compare():
+    """Time Rule.compare over all nine pairs of moves."""
+    rule = Rule(renderer=NullRenderer())
+    pairs = [(human, computer) for human in Player.CHOICES for computer in Player.CHOICES]
+
+    def run():
+        for human_move, computer_move in pairs:
+            rule.compare(human_move, computer_move)
+        rule.render_frame()
+    return run
+
+
+def rps_full_game():
+    """Time a headless game to five points where the player always picks rock."""
+    def run():
+        game = RPSGame(renderer=NullRenderer())
+        game.begin()
+        while not game.finished:
+            if game.state == 'move':
+                game.handle('rock')
+            else:
+                game.handle('no' if game.is_game_over() else 'yes')
+    return run
+
+
+def suite():
+    """Return {case name: function returning the callable to time}."""
+    cases = {}
+    for board_class in (BitBoard, Board):
+        for name, squares in TTT_BOARDS.items():
+            cases[f"ttt.check_winner.{board_class.__name__}.{name}"] = (
+                lambda board_class=board_class, squares=squares:
+                ttt_check_winner(board_class, squares))
+    for name, squares in TTT_COMPUTER_BOARDS.items():
+        cases[f"ttt.computer_moves.{name}"] = lambda squares=squares: ttt_computer_moves(squares)
+    cases["ttt.full_game"] = ttt_full_game
+    cases["twenty_one.deck_construction"] = deck_construction
+    cases["twenty_one.deck_deal_52"] = deck_deal
+    for cards in (2, 5, 10):
+        cases[f"twenty_one.score.{cards}_cards"] = lambda cards=cards: participant_score(cards)
+    cases["twenty_one.full_game"] = twenty_one_full_game
+    cases["rps.compare_9"] = rule_compare
+    cases["rps.full_game"] = rps_full_game
+    return cases
+
+
+def time_case(make_callable, repeat=5, min_time=0.2):
+    """Return the best seconds per call of the callable over several repeats."""
+    random.seed(0)
+    timer = timeit.Timer(make_callable())
+    number, _ = timer.autorange()
+    number = max(number, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run(names=None, repeat=5, min_time=0.2):
+    """Time the selected cases; return a JSON-ready results dict."""
+    results = {}
+    for name, make_callable in suite().items():
+        if names and not any(name.startswith(prefix) for prefix in names):
+            continue
+        seconds = time_case(make_callable, repeat, min_time)
+        results[name] = {"seconds_per_op": seconds, "ops_per_second": 1 / seconds}
+        print(f"{name:<40} {seconds * 1e6:>12.3f} us  {1 / seconds:>14,.0f} ops/s")
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.10):
+    """Print the change of every common case; return the regressed names."""
+    regressions = []
+    print(f"{'Case':<40} {'Baseline us':>12} {'Current us':>12} {'Change':>8}")
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]["seconds_per_op"]
+        after = result["seconds_per_op"]
+        change = after / before - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {before * 1e6:>12.3f} {after * 1e6:>12.3f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def import_time(module):
+    """Import module in a fresh interpreter; return (seconds, modules loaded).
+
+    The time is the cumulative -X importtime figure of module and its
+    parent packages, so interpreter startup is not counted.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    package = module.split(".")[0]
+    microseconds = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented past the single space after the bar.
+        top_level = not name.startswith("  ")
+        name = name.strip()
+        loaded.add(name)
+        if top_level and name.split(".")[0] == package:
+            microseconds += int(cumulative)
+    return microseconds / 1e6, loaded
+
+
+def check_import_times(budget_ms=None, repeat=5):
+    """Print each game module's import time; return the modules over budget."""
+    failures = []
+    print(f"{'Module':<32} {'Import ms':>10} {'Budget ms':>10}")
+    for module, default_budget in IMPORT_BUDGETS.items():
+        budget = default_budget if budget_ms is None else budget_ms
+        timings = [import_time(module) for _ in range(repeat)]
+        seconds = min(elapsed for elapsed, _ in timings)
+        heavy = [name for name in HEAVY_MODULES if name in timings[0][1]]
+        flag = ""
+        if seconds * 1e3 > budget:
+            flag = "  OVER BUDGET"
+        if heavy:
+            flag += f"  IMPORTS {', '.join(heavy)}"
+        if flag:
+            failures.append(module)
+        print(f"{module:<32} {seconds * 1e3:>10.1f} {budget:>10.0f}{flag}")
+    return failures
+
+
+def main():
+    """Run or compare the suite from the command line."""
+    parser = argparse.ArgumentParser(description="Time the games' hot paths.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="time the cases")
+    run_parser.add_argument("names", nargs="*", help="case name prefixes to run (default: all)")
+    run_parser.add_argument("--output", help="write the results to this JSON file")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--min-time", type=float, default=0.2,
+                            help="seconds per repeat, at least")
+    compare_parser = commands.add_parser("compare", help="check a run against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="allowed slowdown as a fraction (default 0.10)")
+    import_parser = commands.add_parser("importtime", help="check the game modules' import time")
+    import_parser.add_argument("--budget-ms", type=float,
+                               help="budget for every module (default: per-module budgets)")
+    import_parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run(args.names, args.repeat, args.min_time)
+        if args.output:
+            with open(args.output, "w") as file:
+                json.dump(results, file, indent=2)
+        return 0
+
+    if args.command == "importtime":
+        failures = check_import_times(args.budget_ms, args.repeat)
+        if failures:
+            print(f"\n{len(failures)} module(s) over budget or importing heavy modules.")
+            return 1
+        print("\nEvery module imports within budget.")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed more than {args.threshold:.0%}.")
+        return 1
+    print(f"\nNo case regressed more than {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""Numeric ids for the three games, shared by the replay log and results store.
+
+Both write the id in place of the game's name, so an id must never change
+once logs or databases using it exist.
+"""
+
+GAME_IDS = {"ttt": 0, "twenty-one": 1, "rps": 2}
+GAME_NAMES = {game_id: name for name, game_id in GAME_IDS.items()}
@@ -0,0 +1,87 @@
+"""Renderers and input sources shared by the three games.
+
+Every game takes a renderer and an input source. A renderer is any
+object with a write(frame) method; the games collect the lines of each
+step into one frame, so a renderer sees a single write() per step. An
+input source is called with a prompt and returns the answer, like input().
+
+sys.stdout and input() are the defaults. The classes here cover the
+other cases: a terminal renderer that flushes once per frame, a null
+renderer for simulations and benchmarks, a capturing renderer for
+servers, and scripted input for automated runs. autoplay() drives a game
+to the end from a function that answers its prompts.
+"""
+
+import sys
+
+
+class TerminalRenderer:
+    """Writes each frame to a stream with one write and one flush."""
+
+    def __init__(self, stream=None):
+        """Initialize the renderer on a text stream, sys.stdout by default."""
+        self.stream = sys.stdout if stream is None else stream
+        self.frames = 0
+
+    def write(self, frame):
+        """Write a whole frame and flush it."""
+        self.stream.write(frame)
+        self.stream.flush()
+        self.frames += 1
+
+
+class NullRenderer:
+    """Discards every frame."""
+
+    def write(self, frame):
+        """Ignore the frame."""
+
+
+class CaptureRenderer:
+    """Keeps frames in memory until they are taken."""
+
+    def __init__(self):
+        """Initialize an empty capture."""
+        self._frames = []
+
+    def write(self, frame):
+        """Store the frame."""
+        self._frames.append(frame)
+
+    def take(self):
+        """Return everything written since the last take() and clear it."""
+        output = "".join(self._frames)
+        self._frames.clear()
+        return output
+
+
+class ScriptedInput:
+    """Answers prompts from a fixed sequence instead of the keyboard.
+
+    Raises EOFError once the answers run out, as input() does at the end
+    of its stream. With echo set, each prompt and answer is written to that
+    renderer so a transcript reads like an interactive session.
+    """
+
+    def __init__(self, answers, echo=None):
+        """Initialize the source with an iterable of answers."""
+        self._answers = iter(answers)
+        self.echo = echo
+
+    def __call__(self, prompt=""):
+        """Return the next answer."""
+        try:
+            answer = next(self._answers)
+        except StopIteration:
+            raise EOFError("Scripted input ran out of answers.") from None
+        if self.echo is not None:
+            self.echo.write(f"{prompt}{answer}\n")
+        return answer
+
+
+def autoplay(game, answer):
+    """Run a game to the end, replying to each prompt with answer(game)."""
+    game.begin()
+    while not game.finished:
+        game.handle(answer(game))
+    return game
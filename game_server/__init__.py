@@ -0,0 +1 @@
+"""Asyncio line-protocol server hosting the three games, and its load test."""
@@ -0,0 +1,5 @@
+"""Entry point for python -m game_server."""
+
+from .game_server import main
+
+main()
@@ -0,0 +1,200 @@
+"""Asyncio line-protocol server hosting all three games.
+
+Each connection is one session. The server first asks which game to
+play, then feeds every line the client sends to the game's handle() and
+sends back what the game rendered followed by its next prompt. Every
+response ends with a line holding only END_OF_RESPONSE; the server closes
+the connection once the game is finished.
+
+A line longer than LINE_LIMIT bytes is skipped with an error response.
+If a game raises, the error is logged and the session ends with an
+error line.
+
+Lines for a game whose computer searches for its moves ("hard" TTT) are
+handled on a worker thread, so the search does not hold up every other
+session; all other lines are handled on the event loop itself.
+
+Run from the repository root: python -m game_server --port 8021
+Set GAMES_METRICS or GAMES_PROFILE to time the games' hot paths or
+profile the server (see instrumentation.py).
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import random
+
+from game_io import CaptureRenderer
+from instrumentation import configure_from_environment
+
+END_OF_RESPONSE = "."
+# Longest line, in bytes, the server reads from a client.
+LINE_LIMIT = 4096
+GAME_PROMPT = "Choose a game (rps, ttt, twenty-one): "
+# Difficulties whose computer moves run a search (TTTGame.HARD_TIME_LIMIT).
+SEARCHING_DIFFICULTIES = ("hard",)
+
+logger = logging.getLogger(__name__)
+
+
+# Each game's module is imported the first time a session picks it.
+# pylint: disable=import-outside-toplevel
+def _rps_game(renderer):
+    """Return a new RPS game against the predicting computer."""
+    from rps_game.oop_rps import PredictingComputer, RPSGame
+    rng = random.Random()
+    return RPSGame(computer=PredictingComputer(rng=rng), renderer=renderer, rng=rng)
+
+
+def _ttt_game(renderer):
+    """Return a new Tic Tac Toe game."""
+    from oo_ttt_game.oo_ttt_game import TTTGame
+    return TTTGame(renderer=renderer)
+
+
+def _twenty_one_game(renderer):
+    """Return a new Twenty-One game."""
+    from oo_twenty_one.oo_twenty_one import TwentyOneGame
+    return TwentyOneGame(renderer=renderer)
+
+
+GAMES = {
+    "rps": _rps_game,
+    "ttt": _ttt_game,
+    "twenty-one": _twenty_one_game,
+}
+
+
+class Session:
+    """One player's game, advanced a line at a time."""
+
+    def __init__(self):
+        """Initialize a session that has not picked a game yet."""
+        self.game = None
+        self.output = CaptureRenderer()
+
+    @property
+    def finished(self):
+        """Check if the session's game has ended."""
+        return self.game is not None and self.game.finished
+
+    @property
+    def searches(self):
+        """Check if the game's computer searches for its moves."""
+        return getattr(self.game, "difficulty", None) in SEARCHING_DIFFICULTIES
+
+    @property
+    def prompt(self):
+        """Return the question the session is waiting on."""
+        return GAME_PROMPT if self.game is None else self.game.prompt
+
+    def handle(self, line):
+        """Apply one line from the player; return the rendered response."""
+        if self.game is not None:
+            self.game.handle(line)
+        elif line.strip().lower() in GAMES:
+            self.game = GAMES[line.strip().lower()](self.output)
+            self.game.begin()
+        else:
+            self.output.write(f"Unknown game: {line.strip()}\n")
+        return self.output.take()
+
+    def render(self, output):
+        """Return output followed by the next prompt and the end marker."""
+        prompt = self.prompt
+        if not self.finished and prompt:
+            output += prompt + "\n"
+        return output + END_OF_RESPONSE + "\n"
+
+
+async def read_line(reader):
+    """Return the next line, b"" at the end of the stream, or None if it was too long.
+
+    A line over the reader's limit is discarded up to and including its
+    newline.
+    """
+    too_long = False
+    while True:
+        try:
+            line = await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as error:
+            # The stream ended; a last line without a newline still counts.
+            return None if too_long else error.partial
+        except asyncio.LimitOverrunError as error:
+            # readuntil() leaves the data buffered; drop what it looked at.
+            await reader.readexactly(error.consumed)
+            too_long = True
+            continue
+        return None if too_long else line
+
+
+async def _handle(session, line):
+    """Apply a line to the session, off the event loop if its game searches."""
+    if session.searches:
+        return await asyncio.get_running_loop().run_in_executor(None, session.handle, line)
+    return session.handle(line)
+
+
+async def serve_session(reader, writer, idle_timeout=300):
+    """Run one session over a connection."""
+    session = Session()
+    try:
+        writer.write(session.render("").encode())
+        await writer.drain()
+        while not session.finished:
+            line = await asyncio.wait_for(read_line(reader), idle_timeout)
+            if line is None:
+                response = f"Line too long: the limit is {LINE_LIMIT} bytes.\n"
+            elif not line:
+                break
+            else:
+                try:
+                    response = await _handle(session, line.decode(errors="replace")
+                                             .rstrip("\r\n"))
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception("Game error in session from %s",
+                                     writer.get_extra_info("peername"))
+                    writer.write(f"Internal error; ending the session.\n{END_OF_RESPONSE}\n"
+                                 .encode())
+                    await writer.drain()
+                    break
+            writer.write(session.render(response).encode())
+            await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
+
+
+async def start_server(host="127.0.0.1", port=8021):
+    """Start the server; return the asyncio.Server."""
+    return await asyncio.start_server(serve_session, host, port, limit=LINE_LIMIT,
+                                      backlog=4096)
+
+
+async def _serve_forever(host, port):
+    """Start the server and run until cancelled."""
+    server = await start_server(host, port)
+    addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Serving games on {addresses}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    """Run the server from the command line."""
+    parser = argparse.ArgumentParser(description="Serve RPS, TTT and Twenty-One over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8021)
+    args = parser.parse_args()
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    configure_from_environment()
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_serve_forever(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Asyncio load generator for the game server.
+
+Opens many concurrent sessions that play scripted games and reports
+sessions per second and response latency percentiles. By default it
+starts a server in the same process on a free port.
+
+With --hard, that many "hard" TTT sessions, whose computer moves each
+search for a quarter of a second, play alongside the others. The
+figures stay those of the other sessions, to show whether the searches
+hold them up.
+
+Run from the repository root: python -m game_server.load_test --sessions 2000 --concurrency 500
+"""
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import time
+
+from .game_server import END_OF_RESPONSE, start_server
+
+# Lines sent by a client for each game. Clients stop once the server
+# closes the session or the script runs out.
+SCRIPTS = {
+    "rps": ["rps"] + ["rock", "yes", "paper", "yes", "scissors", "yes"] * 3 + ["rock", "no"],
+    "ttt": ["ttt", "1", "normal"] + [str(square) for square in range(1, 10)],
+    "twenty-one": ["twenty-one", "s", "n"],
+}
+HARD_SCRIPT = ["ttt", "1", "hard"] + [str(square) for square in range(1, 10)]
+
+
+async def read_response(reader):
+    """Read one response; return False if the server closed the session."""
+    while True:
+        line = await reader.readline()
+        if not line:
+            return False
+        if line.rstrip(b"\n").decode() == END_OF_RESPONSE:
+            return True
+
+
+async def run_session(host, port, script, latencies):
+    """Play one scripted session, recording each response's latency."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        if not await read_response(reader):
+            return
+        for line in script:
+            start = time.perf_counter()
+            writer.write(line.encode() + b"\n")
+            await writer.drain()
+            still_open = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if not still_open:
+                return
+    except ConnectionError:
+        pass # The server ended the session before the script ran out
+    finally:
+        writer.close()
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
+
+
+def percentile(values, fraction):
+    """Return the value at the given fraction of the sorted values, or None without any."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def run_load(sessions, concurrency, host=None, port=None, hard_sessions=0):
+    """Run the load test; return (sessions/s, p50 seconds, p99 seconds, hard p50).
+
+    hard_sessions "hard" TTT sessions run alongside the others but are
+    left out of the rate and percentiles; hard p50 is the median latency
+    of their responses. A percentile is None when no response was timed.
+    """
+    server = None
+    if host is None:
+        host = "127.0.0.1"
+        server = await start_server(host, 0)
+        port = server.sockets[0].getsockname()[1]
+
+    latencies = []
+    scripts = itertools.cycle(SCRIPTS.values())
+    limit = asyncio.Semaphore(concurrency)
+
+    async def limited(script):
+        async with limit:
+            await run_session(host, port, script, latencies)
+
+    async def regular():
+        start = time.perf_counter()
+        await asyncio.gather(*(limited(next(scripts)) for _ in range(sessions)))
+        return time.perf_counter() - start
+
+    hard_latencies = []
+    elapsed, *_ = await asyncio.gather(
+        regular(), *(run_session(host, port, HARD_SCRIPT, hard_latencies)
+                     for _ in range(hard_sessions)))
+
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+    return (sessions / elapsed, percentile(latencies, 0.5), percentile(latencies, 0.99),
+            percentile(hard_latencies, 0.5))
+
+
+def main():
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(description="Load test the game server.")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--host", default=None,
+                        help="server to test; omit to start one in-process")
+    parser.add_argument("--port", type=int, default=8021)
+    parser.add_argument("--hard", type=int, default=0,
+                        help='"hard" TTT sessions to play alongside the others')
+    args = parser.parse_args()
+    rate, p50, p99, hard_p50 = asyncio.run(run_load(args.sessions, args.concurrency,
+                                                    args.host, args.port, args.hard))
+    report = f"Sessions: {args.sessions}, Concurrency: {args.concurrency}, Sessions/s: {rate:,.0f}"
+    if p50 is not None:
+        report += f", p50: {p50 * 1000:.2f} ms, p99: {p99 * 1000:.2f} ms"
+    print(report)
+    if hard_p50 is not None:
+        print(f"Hard TTT sessions: {args.hard}, p50: {hard_p50 * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Opt-in timing of the games' hot paths.
+
+enable() wraps the methods listed in HOT_PATHS with a timer that records
+each call's duration in a histogram; disable() puts the original methods
+back. Nothing is wrapped until enable() is called, so a game that never
+turns instrumentation on runs exactly the code it would without it.
+
+Histograms use fixed, doubling bucket bounds, so recording a call is a
+bisect and two additions. They export as JSON (count, sum, p50, p99 per
+path) or in the Prometheus text format.
+
+configure_from_environment() turns things on from the environment; the
+three games' main() and the game server call it:
+    GAMES_METRICS=metrics.json   time the hot paths, write them at exit
+                                 (a .prom file gets the Prometheus format)
+    GAMES_PROFILE=games.prof     run cProfile, dump its stats at exit
+
+Run a game in the terminal with instrumentation on:
+    python instrumentation.py ttt --output metrics.json
+"""
+
+import argparse
+import atexit
+import bisect
+import cProfile
+import functools
+import importlib
+import json
+import os
+import time
+
+# (module, class, method, metric name)
+HOT_PATHS = (
+    ("oo_ttt_game.oo_ttt_game", "TTTGame", "computer_moves", "ttt.computer_moves"),
+    ("oo_ttt_game.oo_ttt_game", "TTTGame", "is_game_over", "ttt.is_game_over"),
+    ("oo_ttt_game.oo_ttt_game", "Board", "render", "ttt.board_render"),
+    ("oo_ttt_game.oo_ttt_game", "BitBoard", "render", "ttt.board_render"),
+    ("oo_ttt_game.oo_ttt_game", "TTTGame", "render_frame", "ttt.render_frame"),
+    ("oo_twenty_one.oo_twenty_one", "Deck", "deal", "twenty_one.deal"),
+    ("oo_twenty_one.oo_twenty_one", "Shoe", "deal", "twenty_one.deal"),
+    ("oo_twenty_one.oo_twenty_one", "Participant", "score", "twenty_one.score"),
+    ("oo_twenty_one.oo_twenty_one", "TwentyOneGame", "render_frame", "twenty_one.render_frame"),
+    ("rps_game.oop_rps", "Rule", "compare", "rps.compare"),
+    ("rps_game.oop_rps", "Rule", "render_frame", "rps.render_frame"),
+)
+
+# Upper bounds in seconds: 100 ns doubling up to about 1.7 s, then +Inf.
+BUCKET_BOUNDS = tuple(1e-7 * 2 ** power for power in range(25))
+
+
+class Histogram:
+    """Counts of call durations in fixed buckets."""
+    __slots__ = ("counts", "count", "total")
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        """Record one duration."""
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, fraction):
+        """Return the upper bound of the bucket holding the given quantile."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKET_BOUNDS, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Registry:
+    """Histograms by metric name."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.histograms = {}
+
+    def histogram(self, name):
+        """Return the histogram for a name, creating it if needed."""
+        if name not in self.histograms:
+            self.histograms[name] = Histogram()
+        return self.histograms[name]
+
+    def clear(self):
+        """Drop every recorded value."""
+        self.histograms.clear()
+
+    def snapshot(self):
+        """Return {name: {count, sum, p50, p99}} with times in seconds."""
+        return {
+            name: {
+                "count": histogram.count,
+                "sum": histogram.total,
+                "p50": histogram.quantile(0.5),
+                "p99": histogram.quantile(0.99),
+            }
+            for name, histogram in sorted(self.histograms.items())
+        }
+
+    def to_json(self):
+        """Return the snapshot as JSON text."""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self, metric="game_call_seconds"):
+        """Return every histogram in the Prometheus text format."""
+        lines = [f"# HELP {metric} Time spent in instrumented game calls.",
+                 f"# TYPE {metric} histogram"]
+        for name, histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKET_BOUNDS, histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{path="{name}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{path="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{metric}_sum{{path="{name}"}} {histogram.total:.9f}')
+            lines.append(f'{metric}_count{{path="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the histograms to path, as Prometheus text for .prom files."""
+        text = self.to_prometheus() if path.endswith(".prom") else self.to_json()
+        with open(path, "w") as file:
+            file.write(text)
+
+
+REGISTRY = Registry()
+_originals = {}
+
+
+def timed(function, histogram):
+    """Return function wrapped to record each call's duration."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    wrapper.instrumented = function
+    return wrapper
+
+
+def enable(registry=REGISTRY, hot_paths=HOT_PATHS):
+    """Wrap the hot paths with timers recording into registry."""
+    for module_name, class_name, method, name in hot_paths:
+        cls = getattr(importlib.import_module(module_name), class_name)
+        if (cls, method) in _originals:
+            continue
+        original = cls.__dict__[method]
+        _originals[(cls, method)] = original
+        setattr(cls, method, timed(original, registry.histogram(name)))
+
+
+def disable():
+    """Restore every method wrapped by enable()."""
+    for (cls, method), original in _originals.items():
+        setattr(cls, method, original)
+    _originals.clear()
+
+
+def is_enabled():
+    """Check if the hot paths are currently wrapped."""
+    return bool(_originals)
+
+
+def configure_from_environment(environ=os.environ):
+    """Turn on metrics and profiling as GAMES_METRICS/GAMES_PROFILE ask."""
+    metrics_path = environ.get("GAMES_METRICS")
+    if metrics_path:
+        enable()
+        atexit.register(REGISTRY.write, metrics_path)
+    profile_path = environ.get("GAMES_PROFILE")
+    if profile_path:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        atexit.register(_dump_profile, profiler, profile_path)
+
+
+def _dump_profile(profiler, path):
+    """Stop a profiler and write its stats for pstats or snakeviz."""
+    profiler.disable()
+    profiler.dump_stats(path)
+
+
+def main():
+    """Play a game in the terminal with the hot paths timed."""
+    games = {
+        "rps": ("rps_game.oop_rps", "RPSGame", "play"),
+        "ttt": ("oo_ttt_game.oo_ttt_game", "TTTGame", "play"),
+        "twenty-one": ("oo_twenty_one.oo_twenty_one", "TwentyOneGame", "start"),
+    }
+    parser = argparse.ArgumentParser(description="Play a game with its hot paths timed.")
+    parser.add_argument("game", choices=games)
+    parser.add_argument("--output", default="metrics.json",
+                        help="where to write the histograms (.json or .prom)")
+    args = parser.parse_args()
+
+    module_name, class_name, method = games[args.game]
+    enable()
+    game = getattr(importlib.import_module(module_name), class_name)()
+    try:
+        getattr(game, method)()
+    finally:
+        disable()
+        REGISTRY.write(args.output)
+        for name, stats in REGISTRY.snapshot().items():
+            if not stats["count"]:
+                continue
+            print(f"{name:<26} calls: {stats['count']:<8} p50: {stats['p50'] * 1e6:,.1f} us  "
+                  f"p99: {stats['p99'] * 1e6:,.1f} us")
+
+
+if __name__ == "__main__":
+    main()
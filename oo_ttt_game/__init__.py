@@ -0,0 +1,38 @@
+"""Tic Tac Toe: the game, its perfect-play solver, tree search, simulation
+and batched position evaluation.
+
+Names are loaded on first access, so importing the package alone does
+not import the solver, the search, the simulation or NumPy for the batch
+evaluation until they are used.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "BitBoard": ".oo_ttt_game",
+    "Board": ".oo_ttt_game",
+    "Square": ".oo_ttt_game",
+    "TTTGame": ".oo_ttt_game",
+    "MinimaxSolver": ".ttt_solver",
+    "perfect_solver": ".ttt_solver",
+    "MCTSPlayer": ".ttt_mcts",
+    "simulate": ".ttt_simulation",
+    "evaluate": ".ttt_batch",
+    "reachable_positions": ".ttt_batch",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import the module that defines name the first time it is used."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List the lazily exported names with the module's own."""
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,5 @@
+"""Entry point for python -m oo_ttt_game."""
+
+from .oo_ttt_game import main
+
+main()
@@ -0,0 +1,263 @@
+"""Benchmarks for the Tic Tac Toe engines.
+
+Run from the repository root: python -m oo_ttt_game.benchmarks [name ...]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from .oo_ttt_game import BitBoard, Board, Square, TTTGame
+from .ttt_mcts import MCTSPlayer
+from .ttt_simulation import heuristic_policy, perfect_policy, play_game
+from .ttt_solver import MinimaxSolver, perfect_solver
+
+
+def _perfect_game_positions():
+    """Return the (own, opp) position before every move of a perfect game."""
+    solver = perfect_solver()
+    own, opp = 0, 0
+    positions = []
+    while True:
+        square = solver.best_move(own, opp)
+        if square is None:
+            return positions
+        positions.append((own, opp))
+        own, opp = opp, own | 1 << (square - 1)
+
+
+def bench_solver_nodes():
+    """Report nodes searched per move with and without the transposition table."""
+    positions = _perfect_game_positions()
+    print("Move | Nodes (no table) | Nodes (table, cold) | Nodes (table, warm)")
+    print("-----|------------------|---------------------|--------------------")
+    warm = MinimaxSolver(use_table=True)
+    for move_number, (own, opp) in enumerate(positions, start=1):
+        plain = MinimaxSolver(use_table=False)
+        plain.best_move(own, opp)
+        cold = MinimaxSolver(use_table=True)
+        cold.best_move(own, opp)
+        warm.nodes = 0
+        warm.best_move(own, opp)
+        print(f"{move_number:<5}| {plain.nodes:<17}| {cold.nodes:<20}| {warm.nodes}")
+
+    solver = MinimaxSolver()
+    start = time.perf_counter()
+    solver.solve()
+    build_time = time.perf_counter() - start
+    lookups = 100_000
+    start = time.perf_counter()
+    for i in range(lookups):
+        own, opp = positions[i % len(positions)]
+        solver.best_move(own, opp)
+    lookup_time = (time.perf_counter() - start) / lookups
+    print(f"\nSolved table: {len(solver.solved)} positions built in {build_time * 1000:.1f} ms")
+    print(f"Solved lookup: {lookup_time * 1e6:.2f} us per move")
+
+
+def _play_random_game(board, rng, rescan):
+    """Play random moves until a win or a full board; return the move count.
+
+    With rescan the win check walks every line instead of using the
+    board's incremental counters, as a pre-incremental baseline.
+    """
+    squares = board.unused_squares()
+    rng.shuffle(squares)
+    markers = (Square.HUMAN_MARKER, Square.COMPUTER_MARKER)
+    for moves, square in enumerate(squares, start=1):
+        marker = markers[moves % 2]
+        board.mark_square(square, marker)
+        board.winning_square(marker)
+        if rescan:
+            won = any(all(board.squares[key].marker == marker for key in line)
+                      for line in board.lines)
+        else:
+            won = board.is_winner(marker)
+        if won:
+            return moves
+    return len(squares)
+
+
+def bench_board_sizes():
+    """Report random-game throughput as the board grows."""
+    print("Size  | Win | Lines | Moves/s (incremental) | Moves/s (rescan)")
+    print("------|-----|-------|-----------------------|-----------------")
+    for size, win_length, games in ((3, 3, 5000), (7, 5, 500), (11, 5, 200),
+                                    (15, 5, 100), (19, 5, 50)):
+        rates = []
+        for rescan in (False, True):
+            rng = random.Random(size)
+            moves = 0
+            start = time.perf_counter()
+            for _ in range(games):
+                moves += _play_random_game(Board(size, win_length), rng, rescan)
+            rates.append(moves / (time.perf_counter() - start))
+        lines = len(Board(size, win_length).lines)
+        print(f"{size:>2}x{size:<3}| {win_length:<4}| {lines:<6}| "
+              f"{rates[0]:<22,.0f}| {rates[1]:,.0f}")
+
+
+def bench_allocations(games=2_000):
+    """Report memory held per game for each board backend.
+
+    Every game is kept alive and played to the end, so the figures count
+    the game, its board and its players.
+    """
+    for board_class in (Board, BitBoard):
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        played = []
+        rng = random.Random(0)
+        for _ in range(games):
+            game = TTTGame(board_class=board_class, difficulty="normal", max_score=1)
+            _play_random_game(game.board, rng, rescan=False)
+            played.append(game)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        stats = after.compare_to(before, "filename")
+        size = sum(stat.size_diff for stat in stats)
+        blocks = sum(stat.count_diff for stat in stats)
+        print(f"{board_class.__name__:<9} bytes per game: {size / games:,.0f}, "
+              f"memory blocks per game: {blocks / games:,.1f}")
+
+
+def _search_policy(player):
+    """Return a ttt_simulation policy that asks an MCTSPlayer for each move."""
+    def policy(board, marker, opponent_marker, rng):
+        human_bits, computer_bits = board.bitmasks()
+        if marker == Square.HUMAN_MARKER:
+            return player.best_move(human_bits, computer_bits)
+        return player.best_move(computer_bits, human_bits)
+    return policy
+
+
+def bench_mcts(games=100):
+    """Report MCTS playout rates, tree reuse and strength at fixed budgets.
+
+    The heuristic opponent is ttt_simulation's copy of TTTGame's
+    computer_moves (win, block, center, random). MCTS plays X in half the
+    games and O in the other half.
+    """
+    print("Board      | Playouts/s")
+    print("-----------|-----------")
+    for size, win_length in ((3, 3), (5, 4), (7, 5)):
+        player = MCTSPlayer(size, win_length, playouts=20_000, seed=0)
+        player.best_move(0, 0)
+        print(f"{size}x{size}, {win_length:<3}| {player.playouts_per_second():,.0f}")
+
+    player = MCTSPlayer(playouts=1000, seed=0)
+    board = BitBoard()
+    reused = []
+    while True:
+        human_bits, computer_bits = board.bitmasks()
+        board.mark_square(player.best_move(human_bits, computer_bits), Square.HUMAN_MARKER)
+        reused.append(player.last_reused)
+        if board.has_winner() or board.is_full():
+            break
+        board.mark_square(heuristic_policy(board, Square.COMPUTER_MARKER, Square.HUMAN_MARKER,
+                                           random.Random(0)), Square.COMPUTER_MARKER)
+        if board.has_winner() or board.is_full():
+            break
+    print(f"\nTree reuse at 1,000 playouts per move: visits kept per move {reused}")
+
+    print("\nPlayouts | Opponent  | Wins | Draws | Losses | Playouts/s")
+    print("---------|-----------|------|-------|--------|-----------")
+    for playouts in (50, 200, 1000, 2000):
+        for name, opponent in (("heuristic", heuristic_policy), ("perfect", perfect_policy)):
+            player = MCTSPlayer(playouts=playouts, seed=playouts)
+            search = _search_policy(player)
+            rng = random.Random(playouts)
+            outcomes = {"win": 0, "draw": 0, "loss": 0}
+            for game in range(games):
+                if game % 2:
+                    winner = play_game(search, opponent, rng)
+                    marker = Square.HUMAN_MARKER
+                else:
+                    winner = play_game(opponent, search, rng)
+                    marker = Square.COMPUTER_MARKER
+                outcome = "draw" if winner is None else "win" if winner == marker else "loss"
+                outcomes[outcome] += 1
+            print(f"{playouts:<9}| {name:<10}| {outcomes['win']:<5}| {outcomes['draw']:<6}| "
+                  f"{outcomes['loss']:<7}| {player.total_playouts / player.total_seconds:,.0f}")
+
+    print("\nWorkers | Playouts per 0.2 s move")
+    print("--------|------------------------")
+    for workers in (1, 2, 4):
+        player = MCTSPlayer(7, 5, time_limit=0.2, workers=workers, seed=0)
+        player.best_move(0, 0)
+        player.best_move(0, 0)
+        player.close()
+        print(f"{workers:<8}| {player.last_playouts:,}")
+
+
+def _object_evaluation(game, board):
+    """Evaluate one board through TTTGame's methods, as the batch API does."""
+    game.board = board
+    return (game.check_winner(), game.is_winner(game.human), game.is_winner(game.computer),
+            game.find_winning_move(game.human), game.find_winning_move(game.computer),
+            board.unused_squares())
+
+
+def bench_batch(batch=1_000_000):
+    """Report boards evaluated per second, batched in NumPy against one at a time."""
+    # NumPy loads only for this benchmark. pylint: disable=import-outside-toplevel
+    import numpy as np
+    from .ttt_batch import evaluate, reachable_positions, to_boards
+
+    positions = reachable_positions()
+    game = TTTGame(difficulty="normal", renderer=None)
+    print("Method                  | Boards    | Boards/s")
+    print("------------------------|-----------|------------")
+    for board_class in (Board, BitBoard):
+        boards = to_boards(positions, board_class)
+        start = time.perf_counter()
+        for board in boards:
+            _object_evaluation(game, board)
+        rate = len(boards) / (time.perf_counter() - start)
+        print(f"TTTGame on {board_class.__name__:<13}| {len(boards):<10,}| {rate:,.0f}")
+    for size in (len(positions), batch):
+        boards = np.resize(positions, (size, 9))
+        start = time.perf_counter()
+        evaluate(boards)
+        rate = size / (time.perf_counter() - start)
+        print(f"{'evaluate()':<24}| {size:<10,}| {rate:,.0f}")
+
+    # The batch must agree with the objects on every reachable position.
+    # The objects pick one square when there are several threats, so
+    # theirs must be one of those the batch marks.
+    result = evaluate(positions)
+    mismatches = 0
+    for row, board in enumerate(to_boards(positions, BitBoard)):
+        won, human_won, computer_won, human_square, computer_square, unused = (
+            _object_evaluation(game, board))
+        finished = won or not unused
+        expected = (human_won, computer_won, finished, unused if not finished else [])
+        actual = (result.winner[row] == 1, result.winner[row] == -1, result.terminal[row],
+                  list(np.flatnonzero(result.legal[row]) + 1))
+        for square, marked in ((human_square, result.x_wins[row]),
+                               (computer_square, result.o_wins[row])):
+            expected += (True,)
+            actual += (bool(marked[square - 1]) if square else not marked.any(),)
+        mismatches += expected != actual
+    print(f"Checked {len(positions):,} reachable positions: {mismatches} mismatches")
+
+
+BENCHMARKS = {
+    "solver_nodes": bench_solver_nodes,
+    "board_sizes": bench_board_sizes,
+    "allocations": bench_allocations,
+    "mcts": bench_mcts,
+    "batch": bench_batch,
+}
+
+
+def main(names):
+    """Run the named benchmarks, or all of them."""
+    for name in names or BENCHMARKS:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
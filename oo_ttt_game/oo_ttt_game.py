@@ -1,16 +1,24 @@
 """Tic Tac Toe game implementation using object-oriented programming."""
 
+import functools
 import random
+import sys
 
 class Square:
-    """Represents a single square on the Tic Tac Toe board."""
+    """Represents a single square on the Tic Tac Toe board.
+
+    Squares use __slots__ and only ever hold one of the three shared
+    marker constants, so a board costs one small object per square.
+    """
+    __slots__ = ("_marker",)
     INITIAL_MARKER = " "
     HUMAN_MARKER = "X"
     COMPUTER_MARKER = "O"
+    MARKERS = {marker: marker for marker in (INITIAL_MARKER, HUMAN_MARKER, COMPUTER_MARKER)}
 
     def __init__(self, marker=" "):
         """Initialize a square with a marker (' ', 'X', or 'O')."""
-        self._marker = marker
+        self.marker = marker
 
     @property
     def marker(self):
@@ -20,39 +28,359 @@ class Square:
     @marker.setter
     def marker(self, value):
         """Set the square's marker, ensuring it's valid."""
-        if value in (Square.INITIAL_MARKER, Square.HUMAN_MARKER, Square.COMPUTER_MARKER):
-            self._marker = value
-        else:
-            raise ValueError("Invalid marker. Use ' ', 'X', or 'O'.")
+        try:
+            self._marker = Square.MARKERS[value]
+        except (KeyError, TypeError):
+            raise ValueError("Invalid marker. Use ' ', 'X', or 'O'.") from None
 
     def __str__(self):
         """Return the string representation of the square's marker."""
         return self.marker
 
 
+@functools.lru_cache(maxsize=None)
+def winning_lines(size, win_length):
+    """Return every line of win_length squares on a size x size board.
+
+    Lines are listed rows first, then columns, then down-right and
+    down-left diagonals, so the 3x3 board gives Board.WINNING_COMBINATIONS
+    in the same order.
+    """
+    directions = ((0, 1), (1, 0), (1, 1), (1, -1))
+    lines = []
+    for row_step, col_step in directions:
+        for row in range(size):
+            for col in range(size):
+                end_row = row + row_step * (win_length - 1)
+                end_col = col + col_step * (win_length - 1)
+                if 0 <= end_row < size and 0 <= end_col < size:
+                    lines.append(tuple(
+                        (row + row_step * i) * size + col + col_step * i + 1
+                        for i in range(win_length)
+                    ))
+    return tuple(lines)
+
+
+@functools.lru_cache(maxsize=None)
+def lines_through_squares(size, win_length):
+    """Return, for every square, the indexes of the lines that contain it."""
+    through = {key: [] for key in range(1, size * size + 1)}
+    for index, line in enumerate(winning_lines(size, win_length)):
+        for key in line:
+            through[key].append(index)
+    return {key: tuple(indexes) for key, indexes in through.items()}
+
+
 class Board:
-    """Represents the 3x3 Tic Tac Toe board."""
+    """Represents a size x size Tic Tac Toe board, 3x3 by default.
 
-    def __init__(self):
-        """Initialize the board with 9 empty squares."""
-        self.squares = {key: Square() for key in range(1, 10)}
+    A marker wins by filling win_length squares in a row, column or
+    diagonal. The board keeps a per-line count of each marker, updated on
+    every mark, so a move only touches the lines through its square and
+    win and block lookups never rescan the board.
+    """
+    WINNING_COMBINATIONS = [
+        [1, 2, 3], [4, 5, 6], [7, 8, 9],  # Rows
+        [1, 4, 7], [2, 5, 8], [3, 6, 9],  # Columns
+        [1, 5, 9], [3, 5, 7]              # Diagonals
+    ]
+
+    def __init__(self, size=3, win_length=None):
+        """Initialize the board with size * size empty squares."""
+        if win_length is None:
+            win_length = size
+        if not 1 <= win_length <= size:
+            raise ValueError("Win length must be between 1 and the board size.")
+        self.size = size
+        self.win_length = win_length
+        self.squares = {key: Square() for key in range(1, size * size + 1)}
+        self.lines = winning_lines(size, win_length)
+        self.lines_through = lines_through_squares(size, win_length)
+        self._filled = 0
+        self._line_counts = {
+            Square.HUMAN_MARKER: [0] * len(self.lines),
+            Square.COMPUTER_MARKER: [0] * len(self.lines),
+        }
+        self._completed_lines = {Square.HUMAN_MARKER: 0, Square.COMPUTER_MARKER: 0}
+        # Lines one marker short of a win with none of the opponent's.
+        # With a win length of 1 every empty line already qualifies.
+        initial_threats = range(len(self.lines)) if win_length == 1 else ()
+        self._threat_lines = {
+            Square.HUMAN_MARKER: set(initial_threats),
+            Square.COMPUTER_MARKER: set(initial_threats),
+        }
+
+    def render(self):
+        """Return the current state of the board as one block of text."""
+        separator = "+".join(["-----"] * self.size)
+        rows = []
+        for row in range(self.size):
+            first = row * self.size + 1
+            rows.append("|".join(f"  {self.squares[key]}  "
+                                 for key in range(first, first + self.size)))
+        return "\n\n" + f"\n{separator}\n".join(rows) + "\n\n"
 
     def display(self):
         """Display the current state of the board."""
-        print("\n")
-        for i in range(3):
-            print(f"  {self.squares[1 + i*3]}  |  {self.squares[2 + i*3]}  |  {self.squares[3 + i*3]}  ")
-            if i < 2:
-                print("-----+-----+-----")
-        print("\n")
+        print(self.render())
 
     def mark_square(self, square_number, marker):
         """Mark a square with the given marker."""
-        self.squares[square_number].marker = marker
+        square = self.squares[square_number]
+        previous = square.marker
+        square.marker = marker
+        if previous != Square.INITIAL_MARKER:
+            self._filled -= 1
+            self._count_lines(square_number, previous, -1)
+        if marker != Square.INITIAL_MARKER:
+            self._filled += 1
+            self._count_lines(square_number, marker, 1)
+
+    def _count_lines(self, square_number, marker, delta):
+        """Add delta to the marker's count on every line through the square."""
+        counts = self._line_counts[marker]
+        for line in self.lines_through[square_number]:
+            if counts[line] == self.win_length:
+                self._completed_lines[marker] -= 1
+            counts[line] += delta
+            if counts[line] == self.win_length:
+                self._completed_lines[marker] += 1
+            self._update_threats(line)
+
+    def _update_threats(self, line):
+        """Recompute whether the line is a threat for either marker."""
+        human_count = self._line_counts[Square.HUMAN_MARKER][line]
+        computer_count = self._line_counts[Square.COMPUTER_MARKER][line]
+        for marker, own, other in (
+                (Square.HUMAN_MARKER, human_count, computer_count),
+                (Square.COMPUTER_MARKER, computer_count, human_count)):
+            if own == self.win_length - 1 and other == 0:
+                self._threat_lines[marker].add(line)
+            else:
+                self._threat_lines[marker].discard(line)
+
+    def unused_squares(self):
+        """Return the numbers of all empty squares."""
+        return [key for key, square in self.squares.items()
+                if square.marker == Square.INITIAL_MARKER]
+
+    def is_unused_square(self, square_number):
+        """Check if the square exists and is empty."""
+        return (square_number in self.squares and
+                self.squares[square_number].marker == Square.INITIAL_MARKER)
+
+    def center_square(self):
+        """Return the center square, or None if the size is even."""
+        if self.size % 2 == 0:
+            return None
+        return (self.size * self.size + 1) // 2
+
+    def is_full(self):
+        """Check if the board is full (no empty squares)."""
+        return self._filled == len(self.squares)
+
+    def is_winner(self, marker):
+        """Check if the given marker fills a row, column, or diagonal."""
+        return self._completed_lines.get(marker, 0) > 0
+
+    def has_winner(self):
+        """Check if either marker fills a row, column, or diagonal."""
+        return (self.is_winner(Square.HUMAN_MARKER) or
+                self.is_winner(Square.COMPUTER_MARKER))
+
+    def bitmasks(self):
+        """Return (human_bits, computer_bits), with square n at bit n - 1."""
+        human_bits = computer_bits = 0
+        for key, square in self.squares.items():
+            if square.marker == Square.HUMAN_MARKER:
+                human_bits |= 1 << (key - 1)
+            elif square.marker == Square.COMPUTER_MARKER:
+                computer_bits |= 1 << (key - 1)
+        return human_bits, computer_bits
+
+    def winning_square(self, marker):
+        """Return the square that completes a line for the marker, or None."""
+        threat_lines = self._threat_lines[marker]
+        if not threat_lines:
+            return None
+        for key in self.lines[min(threat_lines)]:
+            if self.squares[key].marker == Square.INITIAL_MARKER:
+                return key
+        return None
+
+
+def _build_win_table(line_masks, full_mask):
+    """Return a table marking every mask that contains a complete line."""
+    return tuple(
+        any(mask & line == line for line in line_masks)
+        for mask in range(full_mask + 1)
+    )
+
+
+def _build_threat_table(line_masks, full_mask):
+    """Return a table of the squares that complete a line for every mask.
+
+    A square is included when it is the only square of a line that the mask
+    is missing, whether or not the square is free.
+    """
+    table = []
+    for mask in range(full_mask + 1):
+        threats = 0
+        for line in line_masks:
+            if bin(mask & line).count("1") == 2:
+                threats |= line & ~mask
+        table.append(threats)
+    return tuple(table)
+
+
+def _build_threat_order_table(line_masks, full_mask):
+    """Return, for every mask, its threat squares in the order of their lines.
+
+    A square completing several lines is listed once, for its first line,
+    so the first free square listed is the one the line-by-line scan finds.
+    """
+    table = []
+    for mask in range(full_mask + 1):
+        squares = []
+        for line in line_masks:
+            if bin(mask & line).count("1") == 2:
+                square = (line & ~mask).bit_length()
+                if square not in squares:
+                    squares.append(square)
+        table.append(tuple(squares))
+    return tuple(table)
+
+
+class BitBoard:
+    """Represents the 3x3 board as one 9-bit mask per marker.
+
+    Square n maps to bit n - 1. Wins and "one move from a win" squares are
+    looked up in tables precomputed over all 512 masks, so every check is
+    a few bitwise operations instead of a walk over Square objects.
+    """
+    FULL_MASK = 0b111111111
+    WINNING_MASKS = tuple(
+        sum(1 << (key - 1) for key in combination)
+        for combination in Board.WINNING_COMBINATIONS
+    )
+    WINS = _build_win_table(WINNING_MASKS, FULL_MASK)
+    THREATS = _build_threat_table(WINNING_MASKS, FULL_MASK)
+    THREAT_ORDER = _build_threat_order_table(WINNING_MASKS, FULL_MASK)
+
+    __slots__ = ("human_bits", "computer_bits")
+    size = 3
+    win_length = 3
+
+    def __init__(self, size=3, win_length=3):
+        """Initialize the board with empty masks for both markers."""
+        if (size, win_length) != (3, 3):
+            raise ValueError("BitBoard only supports a 3x3 board with 3 in a row.")
+        self.human_bits = 0
+        self.computer_bits = 0
+
+    @property
+    def squares(self):
+        """Return a snapshot of the board as a dict of Square objects."""
+        return {key: Square(self.marker_at(key)) for key in range(1, 10)}
+
+    def marker_at(self, square_number):
+        """Return the marker on the given square."""
+        bit = 1 << (square_number - 1)
+        if self.human_bits & bit:
+            return Square.HUMAN_MARKER
+        if self.computer_bits & bit:
+            return Square.COMPUTER_MARKER
+        return Square.INITIAL_MARKER
+
+    def render(self):
+        """Return the current state of the board as one block of text."""
+        markers = [self.marker_at(key) for key in range(1, 10)]
+        rows = [f"  {markers[i*3]}  |  {markers[1 + i*3]}  |  {markers[2 + i*3]}  "
+                for i in range(3)]
+        return "\n\n" + "\n-----+-----+-----\n".join(rows) + "\n\n"
+
+    def display(self):
+        """Display the current state of the board."""
+        print(self.render())
+
+    def mark_square(self, square_number, marker):
+        """Mark a square with the given marker."""
+        if square_number not in range(1, 10):
+            raise KeyError(square_number)
+        bit = 1 << (square_number - 1)
+        if marker == Square.HUMAN_MARKER:
+            self.human_bits |= bit
+            self.computer_bits &= ~bit
+        elif marker == Square.COMPUTER_MARKER:
+            self.computer_bits |= bit
+            self.human_bits &= ~bit
+        elif marker == Square.INITIAL_MARKER:
+            self.human_bits &= ~bit
+            self.computer_bits &= ~bit
+        else:
+            raise ValueError("Invalid marker. Use ' ', 'X', or 'O'.")
+
+    def _bits(self, marker):
+        """Return the mask holding the given marker's squares."""
+        if marker == Square.HUMAN_MARKER:
+            return self.human_bits
+        if marker == Square.COMPUTER_MARKER:
+            return self.computer_bits
+        raise ValueError("Invalid marker. Use 'X' or 'O'.")
+
+    def _empty_bits(self):
+        """Return the mask of empty squares."""
+        return ~(self.human_bits | self.computer_bits) & BitBoard.FULL_MASK
+
+    def center_square(self):
+        """Return the center square."""
+        return 5
+
+    def unused_squares(self):
+        """Return the numbers of all empty squares."""
+        empty = self._empty_bits()
+        return [key for key in range(1, 10) if empty & (1 << (key - 1))]
+
+    def is_unused_square(self, square_number):
+        """Check if the square exists and is empty."""
+        return (square_number in range(1, 10) and
+                bool(self._empty_bits() & (1 << (square_number - 1))))
+
+    def is_full(self):
+        """Check if the board is full (no empty squares)."""
+        return self.human_bits | self.computer_bits == BitBoard.FULL_MASK
+
+    def is_winner(self, marker):
+        """Check if the given marker fills a row, column, or diagonal."""
+        return BitBoard.WINS[self._bits(marker)]
+
+    def has_winner(self):
+        """Check if either marker fills a row, column, or diagonal."""
+        return BitBoard.WINS[self.human_bits] or BitBoard.WINS[self.computer_bits]
+
+    def bitmasks(self):
+        """Return (human_bits, computer_bits), with square n at bit n - 1."""
+        return self.human_bits, self.computer_bits
+
+    def winning_square(self, marker):
+        """Return the square that completes a line for the marker, or None.
+
+        With several such squares, the one on the first line in
+        WINNING_COMBINATIONS order wins, as on Board.
+        """
+        bits = self._bits(marker)
+        empty = self._empty_bits()
+        if not BitBoard.THREATS[bits] & empty:
+            return None
+        for square in BitBoard.THREAT_ORDER[bits]:
+            if empty >> (square - 1) & 1:
+                return square
+        return None
 
 
 class Player:
     """Base class for Tic Tac Toe players."""
+    __slots__ = ("marker",)
 
     def __init__(self, marker):
         """Initialize a player with a marker."""
@@ -61,6 +389,7 @@ class Player:
 
 class Human(Player):
     """Represents the human player with marker 'X'."""
+    __slots__ = ()
 
     def __init__(self, marker=Square.HUMAN_MARKER):
         """Initialize the human player."""
@@ -69,6 +398,7 @@ class Human(Player):
 
 class Computer(Player):
     """Represents the computer player with marker 'O'."""
+    __slots__ = ()
 
     def __init__(self, marker=Square.COMPUTER_MARKER):
         """Initialize the computer player."""
@@ -76,49 +406,244 @@ class Computer(Player):
 
 
 class TTTGame:
-    """Manages the Tic Tac Toe game logic and flow."""
-    WINNING_COMBINATIONS = [
-        [1, 2, 3], [4, 5, 6], [7, 8, 9],  # Rows
-        [1, 4, 7], [2, 5, 8], [3, 6, 9],  # Columns
-        [1, 5, 9], [3, 5, 7]              # Diagonals
-    ]
-
-    def __init__(self):
-        """Initialize the game with a board and players."""
-        self.board = Board()
+    """Manages the Tic Tac Toe game logic and flow.
+
+    The game runs as a state machine: begin() starts it, and handle()
+    takes one answer to the current prompt and advances until the next
+    answer is needed or the game is finished. Nothing here blocks on
+    input(); play() drives the machine from the terminal.
+
+    Output goes to a renderer, any object with a write() method. The lines
+    produced by one step are collected into a frame and written with a
+    single write() call.
+    """
+    WINNING_COMBINATIONS = Board.WINNING_COMBINATIONS
+    DIFFICULTIES = ("normal", "hard", "perfect")
+    # Seconds of search per move on "hard".
+    HARD_TIME_LIMIT = 0.25
+
+    def __init__(self, board_class=None, difficulty=None, size=3, win_length=None,
+                 max_score=None, renderer=None, input_source=None, replay=None,
+                 rng=None, seed=None, searcher=None, results=None):
+        """Initialize the game with a board and players.
+
+        size and win_length set the board's dimensions and how many squares
+        in a row win (size by default). board_class picks the board
+        backend: BitBoard (the default for 3x3) or the dict-of-Squares
+        Board. difficulty is "normal", "hard" or "perfect"; "perfect" is
+        only available on 3x3, and other sizes play "normal" unless told
+        otherwise. The player is asked for difficulty and max_score when
+        the game begins if they are not given.
+
+        searcher picks the moves on "hard": anything with
+        ttt_mcts.MCTSPlayer's best_move(own, opp). By default an
+        MCTSPlayer with a HARD_TIME_LIMIT budget is made on first use.
+
+        renderer receives the game's output (sys.stdout by default) and
+        input_source is called with each prompt by play() (input() by
+        default). replay, a replay_log.ReplayWriter, records every move of
+        a 3x3 game. results, a results_store.ResultsStore, records the
+        outcome of every round.
+
+        rng supplies the computer's random moves: any object with
+        random.Random's choice(). Without one the game uses random.Random(seed),
+        or the global random module when no seed is given either. seed is
+        also what the replay log records.
+        """
+        self.size = size
+        self.win_length = size if win_length is None else win_length
+        if board_class is None:
+            board_class = BitBoard if (size, self.win_length) == (3, 3) else Board
+        self.board_class = board_class
+        self.board = self.new_board()
         self.human = Human(Square.HUMAN_MARKER)
         self.computer = Computer(Square.COMPUTER_MARKER)
         self.human_score = 0
         self.computer_score = 0
         self.draws = 0
-        self.max_score = self.get_max_score()
-        
-        
-    def get_max_score(self):
-        """Prompt for the maximum score to win the game.
-
-        Returns:
-            int: The maximum score specified by the player.
-        """
-        while True:
-            try:
-                max_score = int(input("Enter the maximum score to win the game (1 or more): ").strip())
-                if max_score > 0:
-                    self.max_score = max_score
-                    print(f"Maximum score set to {self.max_score}.")
-                    return max_score
-                else:
-                    print("Please enter a positive integer.")
-            except ValueError:
-                print("Invalid input. Please enter a valid number.")
+        self.max_score = max_score
+        if (size, self.win_length) != (3, 3):
+            if difficulty == "perfect":
+                raise ValueError("Perfect difficulty is only available on a 3x3 board.")
+            if difficulty is None:
+                difficulty = "normal"
+        self.difficulty = difficulty
+        self.searcher = searcher
+        self.renderer = sys.stdout if renderer is None else renderer
+        self.input_source = input if input_source is None else input_source
+        self._frame = []
+        if replay is not None and (size, self.win_length) != (3, 3):
+            raise ValueError("Replay logs only record 3x3 games.")
+        self.replay = replay
+        self.results = results
+        self.seed = seed
+        if rng is None:
+            rng = random if seed is None else random.Random(seed)
+        self.rng = rng
+        self.state = None
+        self.finished = False
+
+    @property
+    def prompt(self):
+        """Return the question the game is waiting on, or None."""
+        if self.state == "max_score":
+            return "Enter the maximum score to win the game (1 or more): "
+        if self.state == "difficulty":
+            return f"Choose the computer's difficulty ({self.join_or(TTTGame.DIFFICULTIES)}): "
+        if self.state == "human_move":
+            available_squares = self.board.unused_squares()
+            return f"Choose one of the available squares ({self.join_or(available_squares)}): "
+        if self.state == "play_again":
+            return "Do you want to play again? (y/n): "
+        return None
+
+    def begin(self):
+        """Start the game, asking for any settings that were not given."""
+        self.finished = False
+        if self.replay is not None:
+            self.replay.start_game("ttt", self.seed)
+        self._ask_settings_or_start()
+        self.render_frame()
+
+    def handle(self, answer):
+        """Apply one answer to the current prompt and advance the game."""
+        if self.finished:
+            raise RuntimeError("The game is already finished.")
+        getattr(self, f"_handle_{self.state}")(answer.strip())
+        self.render_frame()
+
+    def play(self):
+        """Run the main game loop."""
+        self.begin()
+        while not self.finished:
+            self.handle(self.input_source(self.prompt))
+
+    def _say(self, text=""):
+        """Add a line of output to the current frame."""
+        self._frame.append(text)
+
+    def render_frame(self):
+        """Write the output collected since the last frame in one write."""
+        if self._frame:
+            self.renderer.write("\n".join(self._frame) + "\n")
+            self._frame.clear()
+
+    def _ask_settings_or_start(self):
+        """Move to the next missing setting, or welcome the player."""
+        if self.max_score is None:
+            self.state = "max_score"
+        elif self.difficulty is None:
+            self.state = "difficulty"
+        else:
+            self.display_welcome_message()
+            self._start_round()
+
+    def _handle_max_score(self, answer):
+        """Set the maximum score from the player's answer."""
+        try:
+            max_score = int(answer)
+        except ValueError:
+            self._say("Invalid input. Please enter a valid number.")
+            return
+        if max_score <= 0:
+            self._say("Please enter a positive integer.")
+            return
+        self.max_score = max_score
+        self._say(f"Maximum score set to {self.max_score}.")
+        self._ask_settings_or_start()
+
+    def _handle_difficulty(self, answer):
+        """Set the computer's difficulty from the player's answer."""
+        difficulty = answer.lower()
+        if difficulty not in TTTGame.DIFFICULTIES:
+            self._say(f"Invalid input. Please enter {self.join_or(TTTGame.DIFFICULTIES)}.")
+            return
+        self.difficulty = difficulty
+        self._say(f"Difficulty set to {difficulty}.")
+        self._ask_settings_or_start()
+
+    def _start_round(self):
+        """Log the start of a round on the fresh board and take the first turn."""
+        if self.replay is not None:
+            self.replay.start_round()
+        self._start_turn()
+
+    def _start_turn(self):
+        """Show the board and wait for the human's move, or end the game."""
+        if self.human_score < self.max_score and self.computer_score < self.max_score:
+            self._say(self.board.render())
+            self.state = "human_move"
+        else:
+            self._finish()
+
+    def _handle_human_move(self, answer):
+        """Mark the human's square, then let the computer reply."""
+        if not answer.isdigit():
+            self._say("Invalid input. Please enter a number.")
+            return
+        choice = int(answer)
+        if not self.board.is_unused_square(choice):
+            self._say("Invalid choice. Square is taken or doesn't exist.")
+            return
+        self.board.mark_square(choice, self.human.marker)
+        if self.replay is not None:
+            self.replay.ttt_move(choice, False)
+        if self.is_game_over():
+            self._end_round()
+            return
+        if self.replay is None:
+            self.computer_moves()
+        else:
+            computer_bits = self.board.bitmasks()[1]
+            self.computer_moves()
+            square = (self.board.bitmasks()[1] ^ computer_bits).bit_length()
+            self.replay.ttt_move(square, True)
+        if self.is_game_over():
+            self._end_round()
+            return
+        self._start_turn()
+
+    def _end_round(self):
+        """Show the result and ask for another round if nobody has won yet."""
+        self._say(self.board.render())
+        self.display_winner()
+        self.display_scores()
+        if self.human_score < self.max_score and self.computer_score < self.max_score:
+            self.state = "play_again"
+        else:
+            self._finish()
+
+    def _handle_play_again(self, answer):
+        """Start a new round or end the game."""
+        answer = answer.lower()
+        if answer in ('y', 'yes'):
+            self.board = self.new_board()
+            self._start_round()
+        elif answer in ('n', 'no'):
+            self._finish()
+        else:
+            self._say("Invalid input. Please enter 'y' or 'n'.")
+
+    def _finish(self):
+        """Show the final scores and end the game."""
+        if self.replay is not None:
+            self.replay.end_game()
+        self._say(f"Final Scores: Player: {self.human_score}, Computer: {self.computer_score}, Draws: {self.draws}")
+        self.display_goodbye_message()
+        self.state = None
+        self.finished = True
+
+    def new_board(self):
+        """Return an empty board of the game's size and win length."""
+        return self.board_class(self.size, self.win_length)
 
     def display_welcome_message(self):
         """Display the welcome message for the game."""
-        print("Welcome to Tic Tac Toe!")
+        self._say("Welcome to Tic Tac Toe!")
 
     def display_goodbye_message(self):
         """Display the goodbye message when the game ends."""
-        print("Thanks for playing! Goodbye!")
+        self._say("Thanks for playing! Goodbye!")
 
     def join_or(self, items, delimiter=', ', final_delimiter=' or '):
         """Join a list of items into a string with proper delimiters."""
@@ -131,43 +656,44 @@ class TTTGame:
         else:
             return f"{delimiter.join(map(str, items[:-1]))}{final_delimiter}{items[-1]}"
 
-    def human_moves(self):
-        """Prompt the human player to choose a square and mark it."""
-        while True:
-            available_squares = [
-                key for key, square in self.board.squares.items()
-                if square.marker == Square.INITIAL_MARKER
-            ]
-            choice_input = input(
-                f"Choose one of the available squares ({self.join_or(available_squares)}): "
-            )
-            if choice_input.isdigit():
-                choice = int(choice_input)
-                if (choice in self.board.squares and
-                        self.board.squares[choice].marker == Square.INITIAL_MARKER):
-                    self.board.mark_square(choice, self.human.marker)
-                    break
-                print("Invalid choice. Square is taken or doesn't exist.")
-            print("Invalid input. Please enter a number.")
-
     def find_winning_move(self, player):
         """Check if the player can win in the next move."""
-        for combination in TTTGame.WINNING_COMBINATIONS:
-            markers = [self.board.squares[i].marker for i in combination]
-            if markers.count(self.computer.marker) == 2 and markers.count(Square.INITIAL_MARKER) == 1:
-                return combination[markers.index(Square.INITIAL_MARKER)]
-        return None
+        return self.board.winning_square(player.marker)
 
     def find_blocking_move(self):
         """Check if the computer needs to block the human's winning move."""
-        for combination in TTTGame.WINNING_COMBINATIONS:
-            markers = [self.board.squares[i].marker for i in combination]
-            if markers.count(self.human.marker) == 2 and markers.count(Square.INITIAL_MARKER) == 1:
-                return combination[markers.index(Square.INITIAL_MARKER)]
-        return None
+        return self.board.winning_square(self.human.marker)
+
+    def find_perfect_move(self):
+        """Return the computer's best square under perfect play."""
+        # Imported here because ttt_solver builds on this module, and so
+        # the solver's tables only load once perfect play is asked for.
+        from .ttt_solver import perfect_solver
+        human_bits, computer_bits = self.board.bitmasks()
+        return perfect_solver().best_move(computer_bits, human_bits)
+
+    def find_search_move(self):
+        """Return the computer's square from a Monte Carlo tree search."""
+        if self.searcher is None:
+            # Imported here for the same reason as the solver.
+            from .ttt_mcts import MCTSPlayer
+            self.searcher = MCTSPlayer(self.size, self.win_length,
+                                       time_limit=TTTGame.HARD_TIME_LIMIT, rng=self.rng)
+        human_bits, computer_bits = self.board.bitmasks()
+        return self.searcher.best_move(computer_bits, human_bits)
 
     def computer_moves(self):
-        """Select a square for the computer: win, block, or random."""
+        """Select a square for the computer: win, block, or random.
+
+        On "perfect" difficulty the move comes from the solved game tree,
+        and on "hard" from a Monte Carlo tree search.
+        """
+        if self.difficulty == "perfect":
+            self.board.mark_square(self.find_perfect_move(), self.computer.marker)
+            return
+        if self.difficulty == "hard":
+            self.board.mark_square(self.find_search_move(), self.computer.marker)
+            return
 
         """Check if the computer can win in the next move."""
         winning_move = self.find_winning_move(self.computer)
@@ -182,16 +708,14 @@ class TTTGame:
             return
 
         """Check if the center square is available and mark it."""
-        if self.board.squares[5].marker == Square.INITIAL_MARKER:
-            self.board.mark_square(5, self.computer.marker)
+        center = self.board.center_square()
+        if center is not None and self.board.is_unused_square(center):
+            self.board.mark_square(center, self.computer.marker)
             return       
 
         """Select a random square for the computer and mark it."""
-        available_squares = [
-            key for key, square in self.board.squares.items()
-            if square.marker == Square.INITIAL_MARKER
-        ]
-        choice = random.choice(available_squares)
+        available_squares = self.board.unused_squares()
+        choice = self.rng.choice(available_squares)
         self.board.mark_square(choice, self.computer.marker)
 
     def is_game_over(self):
@@ -200,84 +724,50 @@ class TTTGame:
 
     def is_board_full(self):
         """Check if the board is full (no empty squares)."""
-        return all(square.marker != Square.INITIAL_MARKER
-                   for square in self.board.squares.values())
+        return self.board.is_full()
 
     def check_winner(self):
-        """Check if any player has three markers in a row, column, or diagonal."""
-        for combination in TTTGame.WINNING_COMBINATIONS:
-            if (self.board.squares[combination[0]].marker ==
-                    self.board.squares[combination[1]].marker ==
-                    self.board.squares[combination[2]].marker != Square.INITIAL_MARKER):
-                return True
-        return False
+        """Check if any player has a winning line in a row, column, or diagonal."""
+        return self.board.has_winner()
 
     def is_winner(self, player):
         """Check if the given player has won."""
-        return any(
-            self.board.squares[combo[0]].marker ==
-            self.board.squares[combo[1]].marker ==
-            self.board.squares[combo[2]].marker == player.marker
-            for combo in TTTGame.WINNING_COMBINATIONS
-        )
+        return self.board.is_winner(player.marker)
 
     def display_winner(self):
         """Display the game result (win or draw)."""
+        outcome = 0
         if self.check_winner():
             if self.is_winner(self.human):
                 self.human_score += 1
-                print("Player wins!")
+                outcome = 1
+                self._say("Player wins!")
             elif self.is_winner(self.computer):
                 self.computer_score += 1
-                print("Computer wins!")
+                outcome = -1
+                self._say("Computer wins!")
         else:   
             self.draws += 1
-            print("It's a draw!")
+            self._say("It's a draw!")
+        if self.results is not None:
+            self.results.record("ttt", outcome)
     
     def display_scores(self):
         """Display the current scores of both players and draws."""
-        print(f"\nScores: Player: {self.human_score}, Computer: {self.computer_score}, Draws: {self.draws}\n")
-
-    def play_again(self):
-        """Ask the players if they want to play again."""
-        while True:
-            answer = input("Do you want to play again? (y/n): ").strip().lower()
-            if answer in ('y', 'yes'):
-                self.board = Board()
-                return True
-            if answer in ('n', 'no'):
-                return False
-            print("Invalid input. Please enter 'y' or 'n'.")
+        self._say(f"\nScores: Player: {self.human_score}, Computer: {self.computer_score}, Draws: {self.draws}\n")
+
+
+def main():
+    """Play Tic Tac Toe in the terminal."""
+    # Instrumentation and SQLite are only loaded for the terminal game.
+    # pylint: disable=import-outside-toplevel
+    from instrumentation import configure_from_environment
+    from results_store import results_from_environment
+    configure_from_environment()
+    with results_from_environment() as results:
+        ttt = TTTGame(results=results)
+        ttt.play()
 
-    def play(self):
-        """Run the main game loop."""
-        self.display_welcome_message()
-        while self.human_score < self.max_score and self.computer_score < self.max_score:
-            self.board.display()
-            self.human_moves()
-            if self.is_game_over():
-                self.board.display()
-                self.display_winner()
-                self.display_scores()
-                if (self.human_score < self.max_score and
-                        self.computer_score < self.max_score and
-                        self.play_again()):
-                    continue
-                break
-                    
-            self.computer_moves()
-            if self.is_game_over():
-                self.board.display()
-                self.display_winner()
-                self.display_scores()
-                if (self.human_score < self.max_score and
-                        self.computer_score < self.max_score and
-                        self.play_again()):
-                    continue
-                break
-        
-        print(f"Final Scores: Player: {self.human_score}, Computer: {self.computer_score}, Draws: {self.draws}")
-        self.display_goodbye_message()
 
-ttt = TTTGame()
-ttt.play()
+if __name__ == "__main__":
+    main()
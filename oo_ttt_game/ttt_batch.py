@@ -0,0 +1,202 @@
+"""Batched NumPy evaluation of 3x3 Tic Tac Toe positions.
+
+A batch of boards is an (M, 9) int8 array, square n in column n - 1,
+holding 1 for X (the human, who moves first), -1 for O and 0 for an
+empty square. evaluate() works on the whole batch at once through the
+(8, 9) line-incidence matrix built from Board.WINNING_COMBINATIONS: one
+matrix product gives every line's sum, a sum of 3 or -3 is a win, and a
+sum of 2 or -2 is a line one move from a win for X or O. A second
+product maps those lines back to the squares that complete them.
+
+reachable_positions() enumerates every position that can come up in a
+game, ply by ply, as one deduplicated array; with canonical=True,
+rotations and reflections of a position count once.
+
+Requires NumPy.
+
+Run from the repository root: python -m oo_ttt_game.ttt_batch --output positions.npz
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from .oo_ttt_game import BitBoard, Board, Square
+
+X, O, EMPTY = 1, -1, 0
+
+
+def _incidence_matrix():
+    """Return the (8, 9) matrix with a 1 where a winning line holds a square."""
+    incidence = np.zeros((len(Board.WINNING_COMBINATIONS), 9), dtype=np.int8)
+    for line, combination in enumerate(Board.WINNING_COMBINATIONS):
+        incidence[line, np.array(combination) - 1] = 1
+    return incidence
+
+
+def _symmetries():
+    """Return the (8, 9) square permutations of the board's rotations and reflections."""
+    squares = np.arange(9).reshape(3, 3)
+    turns = [np.rot90(squares, turn) for turn in range(4)]
+    return np.array([grid.ravel() for grid in turns + [grid.T for grid in turns]])
+
+
+INCIDENCE = _incidence_matrix()
+SYMMETRIES = _symmetries()
+# Line products run as float32 matrix products, which NumPy hands to BLAS;
+# the sums are small integers, so they are exact.
+_INCIDENCE_T = INCIDENCE.T.astype(np.float32)
+_INCIDENCE_F = INCIDENCE.astype(np.float32)
+_ONES = np.ones(9, dtype=np.float32)
+# Base-3 place values of the squares, for position codes.
+_POWERS = 3 ** np.arange(9, dtype=np.int32)
+
+
+class BatchEvaluation:
+    """The evaluation of a batch of boards, one row per board.
+
+    winner is 1 where X has a line, -1 where O has one and 0 otherwise,
+    including impossible boards where both do. terminal marks won and
+    full boards, and legal the empty squares of the others. x_wins and
+    o_wins mark the empty squares that would complete a line for X or for
+    O, like BitBoard.winning_square. to_move is X on boards with as many
+    Xs as Os and O otherwise.
+    """
+
+    def __init__(self, boards):
+        """Evaluate an (M, 9) int8 array of boards."""
+        boards = np.ascontiguousarray(boards, dtype=np.int8).reshape(-1, 9)
+        values = boards.astype(np.float32)
+        line_sums = values @ _INCIDENCE_T
+        # NumPy reduces 8 booleans a row slowly; read each row as one
+        # 8-byte integer instead, nonzero when any line is complete.
+        x_won = (line_sums == 3).view(np.uint64)[:, 0] != 0
+        o_won = (line_sums == -3).view(np.uint64)[:, 0] != 0
+        empty = boards == EMPTY
+        full = (values * values) @ _ONES == 9
+        self.boards = boards
+        self.winner = x_won.view(np.int8) - o_won.view(np.int8)
+        self.terminal = x_won | o_won | full
+        self.legal = empty & ~self.terminal[:, None]
+        self.x_wins = empty & ((line_sums == 2).astype(np.float32) @ _INCIDENCE_F > 0)
+        self.o_wins = empty & ((line_sums == -2).astype(np.float32) @ _INCIDENCE_F > 0)
+        self.to_move = np.where(values @ _ONES == 0, X, O).astype(np.int8)
+
+    def __len__(self):
+        return len(self.boards)
+
+    def win_moves(self):
+        """Return the squares that win at once for the side to move."""
+        return np.where((self.to_move == X)[:, None], self.x_wins, self.o_wins)
+
+    def block_moves(self):
+        """Return the squares the side to move must take to stop the other side's win."""
+        return np.where((self.to_move == X)[:, None], self.o_wins, self.x_wins)
+
+
+def evaluate(boards):
+    """Return the BatchEvaluation of an (M, 9) int8 array of boards."""
+    return BatchEvaluation(boards)
+
+
+def first_squares(masks):
+    """Return the lowest marked square number (1-9) of each row, or 0 if none."""
+    masks = np.asarray(masks, dtype=bool)
+    return np.where(masks.any(axis=1), masks.argmax(axis=1) + 1, 0).astype(np.int8)
+
+
+def position_codes(boards):
+    """Return each board as a base-3 number, X as 1 and O as 2."""
+    return (np.asarray(boards, dtype=np.int8) % 3).astype(np.int32) @ _POWERS
+
+
+def canonical_boards(boards):
+    """Return each board's symmetry with the lowest position code."""
+    boards = np.asarray(boards, dtype=np.int8)
+    variants = boards[:, SYMMETRIES]
+    codes = (variants % 3).astype(np.int32) @ _POWERS
+    return variants[np.arange(len(boards)), codes.argmin(axis=1)]
+
+
+def _unique_boards(boards, canonical):
+    """Return boards without repeats, in position-code order."""
+    if canonical:
+        boards = canonical_boards(boards)
+    _, first = np.unique(position_codes(boards), return_index=True)
+    return boards[first]
+
+
+def reachable_positions(canonical=False, by_ply=False):
+    """Return every position reachable in play as an (N, 9) int8 array.
+
+    Positions are listed by ply, starting from the empty board, and
+    include won and drawn ones. There are 5478, or 765 with canonical.
+    With by_ply the result is a list of one array per ply instead.
+    """
+    level = np.zeros((1, 9), dtype=np.int8)
+    levels = [level]
+    for ply in range(9):
+        live = level[~evaluate(level).terminal]
+        if not len(live):
+            break
+        parents, squares = np.nonzero(live == EMPTY)
+        children = live[parents]
+        children[np.arange(len(children)), squares] = X if ply % 2 == 0 else O
+        level = _unique_boards(children, canonical)
+        levels.append(level)
+    return levels if by_ply else np.concatenate(levels)
+
+
+def from_boards(boards):
+    """Return an (M, 9) int8 array from Board or BitBoard objects."""
+    masks = np.array([board.bitmasks() for board in boards], dtype=np.int32).reshape(-1, 2, 1)
+    squares = (masks >> np.arange(9)) & 1
+    return (squares[:, 0] - squares[:, 1]).astype(np.int8)
+
+
+def to_boards(boards, board_class=BitBoard):
+    """Return a list of board objects, one per row of an (M, 9) array."""
+    markers = {X: Square.HUMAN_MARKER, O: Square.COMPUTER_MARKER}
+    objects = []
+    for row in np.asarray(boards).tolist():
+        board = board_class()
+        for index, value in enumerate(row):
+            if value:
+                board.mark_square(index + 1, markers[value])
+        objects.append(board)
+    return objects
+
+
+def main():
+    """Enumerate the reachable positions and optionally save them with their evaluation."""
+    parser = argparse.ArgumentParser(description="Enumerate and evaluate every TTT position.")
+    parser.add_argument("--canonical", action="store_true",
+                        help="count rotations and reflections once")
+    parser.add_argument("--output", help="write the positions and evaluation to this .npz file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    levels = reachable_positions(args.canonical, by_ply=True)
+    positions = np.concatenate(levels)
+    result = evaluate(positions)
+    elapsed = time.perf_counter() - start
+    print("Ply | Positions | X won | O won | Drawn")
+    print("----|-----------|-------|-------|------")
+    offset = 0
+    for ply, level in enumerate(levels):
+        winner = result.winner[offset:offset + len(level)]
+        drawn = result.terminal[offset:offset + len(level)] & (winner == EMPTY)
+        offset += len(level)
+        print(f"{ply:<4}| {len(level):<10,}| {(winner == X).sum():<6,}| "
+              f"{(winner == O).sum():<6,}| {drawn.sum():,}")
+    print(f"{len(positions):,} positions enumerated and evaluated in {elapsed * 1e3:.1f} ms")
+    if args.output:
+        np.savez_compressed(args.output, boards=positions, winner=result.winner,
+                            terminal=result.terminal, legal=result.legal,
+                            to_move=result.to_move, x_wins=result.x_wins, o_wins=result.o_wins)
+        print(f"Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Monte Carlo Tree Search (UCT) player for Tic Tac Toe.
+
+Positions are a pair of bitmasks, (own, opp), seen from the side to move,
+with square n at bit n - 1 as in BitBoard and ttt_solver. Any board size
+and win length works.
+
+Each playout descends the tree by UCT, adds one node, and finishes the
+game with random moves played on plain integers: the empty squares go in
+a scratch list the player reuses, and a win is a mask test against the
+lines through the square just played. No Board or Square objects are
+built during a search.
+
+A search runs until its playout budget or time budget is spent, but
+always plays at least one playout, so there is a move to choose even
+when the clock runs out at once. After a
+move the player keeps the chosen child, so on its next turn the subtree
+under the opponent's reply becomes the new root with its statistics
+intact. With workers > 1 the playouts are split across a process pool
+instead (root parallelism): every worker searches its own tree and the
+root visit counts are summed. Trees built in workers are not reused.
+"""
+
+import functools
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .oo_ttt_game import winning_lines
+
+EXPLORATION = math.sqrt(2)
+DEFAULT_PLAYOUTS = 2000
+# Playouts between clock checks when searching on a time budget.
+CLOCK_INTERVAL = 64
+
+
+@functools.lru_cache(maxsize=None)
+def line_masks(size, win_length):
+    """Return, for every 0-based square, the masks of the lines through it."""
+    through = [[] for _ in range(size * size)]
+    for line in winning_lines(size, win_length):
+        mask = sum(1 << (key - 1) for key in line)
+        for key in line:
+            through[key - 1].append(mask)
+    return tuple(tuple(masks) for masks in through)
+
+
+class Node:
+    """A position in the search tree.
+
+    value is the total reward of the playouts through the node, from the
+    point of view of the player whose move led here. result is that
+    player's reward when the move ended the game (1 for a win, 0 for a
+    draw) and None otherwise.
+    """
+    __slots__ = ("own", "opp", "move", "parent", "children", "untried",
+                 "visits", "value", "result")
+
+    def __init__(self, own, opp, move=None, parent=None, result=None, full_mask=0):
+        """Initialize an unvisited node for the position (own, opp)."""
+        self.own = own
+        self.opp = opp
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.visits = 0
+        self.value = 0.0
+        self.result = result
+        empty = ~(own | opp) & full_mask if result is None else 0
+        self.untried = [index for index in range(full_mask.bit_length())
+                        if empty >> index & 1]
+
+
+class MCTSPlayer:
+    """Chooses moves by Monte Carlo Tree Search with the UCT rule."""
+
+    def __init__(self, size=3, win_length=None, playouts=None, time_limit=None,
+                 exploration=EXPLORATION, workers=1, reuse_tree=True, rng=None, seed=None):
+        """Initialize the player for a board size and win length.
+
+        Each move gets playouts playouts, or as many as fit in time_limit
+        seconds; with neither given the budget is DEFAULT_PLAYOUTS. With
+        both, the search stops at whichever runs out first. workers > 1
+        runs that budget on every worker process at once.
+
+        rng supplies the random numbers (any object with random.Random's
+        random()); without one the player uses random.Random(seed).
+        """
+        if playouts is not None and playouts < 1:
+            raise ValueError("Playouts must be at least 1.")
+        if time_limit is not None and time_limit < 0:
+            raise ValueError("The time limit cannot be negative.")
+        if workers < 1:
+            raise ValueError("Workers must be at least 1.")
+        self.size = size
+        self.win_length = size if win_length is None else win_length
+        if playouts is None and time_limit is None:
+            playouts = DEFAULT_PLAYOUTS
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.workers = workers
+        self.reuse_tree = reuse_tree
+        self.rng = random.Random(seed) if rng is None else rng
+        self.full_mask = (1 << size * size) - 1
+        self.lines = line_masks(size, self.win_length)
+        self.root = None
+        self._scratch = [0] * (size * size)
+        self._pool = None
+        self.last_playouts = 0
+        self.last_reused = 0
+        self.last_seconds = 0.0
+        self.total_playouts = 0
+        self.total_seconds = 0.0
+
+    def best_move(self, own, opp):
+        """Return the square number to play for the side owning own."""
+        if ~(own | opp) & self.full_mask == 0:
+            return None
+        start = time.perf_counter()
+        if self.workers > 1:
+            index = self._parallel_move(own, opp)
+        else:
+            index = self._serial_move(own, opp)
+        self.last_seconds = time.perf_counter() - start
+        self.total_playouts += self.last_playouts
+        self.total_seconds += self.last_seconds
+        return index + 1
+
+    def playouts_per_second(self):
+        """Return the playout rate of the last search."""
+        return self.last_playouts / self.last_seconds if self.last_seconds else 0.0
+
+    def close(self):
+        """Shut down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _serial_move(self, own, opp):
+        """Search in this process and keep the chosen subtree."""
+        root = self._reusable_root(own, opp)
+        self.last_reused = root.visits
+        self.last_playouts = self.search(root)
+        best = max(root.children, key=lambda child: child.visits)
+        best.parent = None
+        self.root = best if self.reuse_tree else None
+        return best.move
+
+    def _parallel_move(self, own, opp):
+        """Search one tree per worker and play the most visited move overall."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        seeds = [int(self.rng.random() * (1 << 53)) for _ in range(self.workers)]
+        jobs = [self._pool.submit(_search_root, self.size, self.win_length, own, opp,
+                                  self.playouts, self.time_limit, self.exploration, seed)
+                for seed in seeds]
+        visits = {}
+        self.last_playouts = 0
+        for job in jobs:
+            playouts, counts = job.result()
+            self.last_playouts += playouts
+            for move, count in counts:
+                visits[move] = visits.get(move, 0) + count
+        self.last_reused = 0
+        self.root = None
+        if not visits:
+            # Every worker plays at least one playout; this only guards
+            # against a pool that returned nothing.
+            empty = ~(own | opp) & self.full_mask
+            moves = [index for index in range(self.size * self.size) if empty >> index & 1]
+            return moves[int(self.rng.random() * len(moves))]
+        return max(visits, key=visits.get)
+
+    def _reusable_root(self, own, opp):
+        """Return the kept node for (own, opp), or a new root."""
+        root = self.root
+        self.root = None
+        if root is not None:
+            for child in root.children:
+                if child.own == own and child.opp == opp:
+                    child.parent = None
+                    return child
+        return Node(own, opp, full_mask=self.full_mask)
+
+    def search(self, root):
+        """Run playouts from root until the budget is spent; return the count.
+
+        The first playout always runs, whatever the time budget.
+        """
+        playouts = self.playouts
+        deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        count = 0
+        while playouts is None or count < playouts:
+            if deadline is not None and count and count % CLOCK_INTERVAL == 0 \
+                    and time.perf_counter() >= deadline:
+                break
+            self._playout(root)
+            count += 1
+        return count
+
+    def _playout(self, root):
+        """Select, expand, simulate and back up one playout."""
+        node = root
+        exploration = self.exploration
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            best_score = -math.inf
+            for child in node.children:
+                score = (child.value / child.visits +
+                         exploration * math.sqrt(log_visits / child.visits))
+                if score > best_score:
+                    best, best_score = child, score
+            node = best
+
+        if node.untried:
+            untried = node.untried
+            pick = int(self.rng.random() * len(untried))
+            index = untried[pick]
+            untried[pick] = untried[-1]
+            untried.pop()
+            mover = node.own | 1 << index
+            result = None
+            for line in self.lines[index]:
+                if mover & line == line:
+                    result = 1
+                    break
+            else:
+                if mover | node.opp == self.full_mask:
+                    result = 0
+            child = Node(node.opp, mover, index, node, result, self.full_mask)
+            node.children.append(child)
+            node = child
+
+        if node.result is not None:
+            reward = node.result
+        else:
+            reward = -self._rollout(node.own, node.opp)
+
+        while node is not None:
+            node.visits += 1
+            node.value += reward
+            reward = -reward
+            node = node.parent
+
+    def _rollout(self, own, opp):
+        """Play random moves to the end; return 1, 0 or -1 for the side to move."""
+        squares = self._scratch
+        lines = self.lines
+        random_draw = self.rng.random
+        count = 0
+        empty = ~(own | opp) & self.full_mask
+        while empty:
+            low = empty & -empty
+            squares[count] = low.bit_length() - 1
+            count += 1
+            empty ^= low
+        mover, other, reward = own, opp, 1
+        while count:
+            pick = int(random_draw() * count)
+            index = squares[pick]
+            count -= 1
+            squares[pick] = squares[count]
+            mover |= 1 << index
+            for line in lines[index]:
+                if mover & line == line:
+                    return reward
+            mover, other, reward = other, mover, -reward
+        return 0
+
+
+def _search_root(size, win_length, own, opp, playouts, time_limit, exploration, seed):
+    """Search one tree in a worker; return (playouts, [(move, visits), ...])."""
+    player = MCTSPlayer(size, win_length, playouts, time_limit, exploration,
+                        reuse_tree=False, seed=seed)
+    root = Node(own, opp, full_mask=player.full_mask)
+    count = player.search(root)
+    return count, [(child.move, child.visits) for child in root.children]
@@ -0,0 +1,165 @@
+"""Headless batch self-play for Tic Tac Toe.
+
+Plays many games between two policies without any input() or print()
+calls, optionally spread across a process pool. Chunk n of the games is
+played on rng_streams.stream(seed, n), so a run is reproducible for a
+given seed and chunk size whatever the number of workers. simulate()
+therefore requires NumPy; play_game() and the policies do not.
+
+Run from the repository root:
+    python -m oo_ttt_game.ttt_simulation --games 100000 --x heuristic --o perfect
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .oo_ttt_game import BitBoard, Board, Square
+
+
+def random_policy(board, marker, opponent_marker, rng):
+    """Pick a random empty square."""
+    return rng.choice(board.unused_squares())
+
+
+def heuristic_policy(board, marker, opponent_marker, rng):
+    """Win, block, take the center, or pick a random square, like TTTGame."""
+    square = board.winning_square(marker) or board.winning_square(opponent_marker)
+    if square:
+        return square
+    center = board.center_square()
+    if center is not None and board.is_unused_square(center):
+        return center
+    return rng.choice(board.unused_squares())
+
+
+def perfect_policy(board, marker, opponent_marker, rng):
+    """Play the solved best move (3x3 only)."""
+    # Imported here so workers that never play perfectly skip the solver.
+    from .ttt_solver import perfect_solver
+    human_bits, computer_bits = board.bitmasks()
+    if marker == Square.HUMAN_MARKER:
+        return perfect_solver().best_move(human_bits, computer_bits)
+    return perfect_solver().best_move(computer_bits, human_bits)
+
+
+POLICIES = {
+    "random": random_policy,
+    "heuristic": heuristic_policy,
+    "perfect": perfect_policy,
+}
+
+
+class SimulationResult:
+    """Aggregate outcome of a batch of games."""
+
+    def __init__(self, x_wins=0, o_wins=0, draws=0, seconds=0.0):
+        """Initialize the result with win, draw and timing totals."""
+        self.x_wins = x_wins
+        self.o_wins = o_wins
+        self.draws = draws
+        self.seconds = seconds
+
+    @property
+    def games(self):
+        """Return the number of games played."""
+        return self.x_wins + self.o_wins + self.draws
+
+    @property
+    def games_per_second(self):
+        """Return the throughput of the run."""
+        return self.games / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        """Return a one-line summary of the result."""
+        return (f"Games: {self.games}, X wins: {self.x_wins}, O wins: {self.o_wins}, "
+                f"Draws: {self.draws}, Games/s: {self.games_per_second:,.0f}")
+
+
+def _new_board(size, win_length):
+    """Return an empty board, using BitBoard for the classic 3x3 game."""
+    if (size, win_length) == (3, 3):
+        return BitBoard()
+    return Board(size, win_length)
+
+
+def play_game(x_policy, o_policy, rng, size=3, win_length=3):
+    """Play one game with X moving first; return the winner's marker or None."""
+    board = _new_board(size, win_length)
+    turns = ((x_policy, Square.HUMAN_MARKER, Square.COMPUTER_MARKER),
+             (o_policy, Square.COMPUTER_MARKER, Square.HUMAN_MARKER))
+    turn = 0
+    while True:
+        policy, marker, opponent_marker = turns[turn]
+        board.mark_square(policy(board, marker, opponent_marker, rng), marker)
+        if board.is_winner(marker):
+            return marker
+        if board.is_full():
+            return None
+        turn ^= 1
+
+
+def _resolve_policy(policy):
+    """Return the policy function for a name or a callable."""
+    return POLICIES[policy] if isinstance(policy, str) else policy
+
+
+def _play_chunk(games, x_policy, o_policy, seed, index, size, win_length):
+    """Play chunk index of games on its stream; return (x_wins, o_wins, draws)."""
+    # Imported here so play_game() and the policies work without NumPy.
+    from rng_streams import stream
+    x_policy = _resolve_policy(x_policy)
+    o_policy = _resolve_policy(o_policy)
+    rng = stream(seed, index)
+    counts = {Square.HUMAN_MARKER: 0, Square.COMPUTER_MARKER: 0, None: 0}
+    for _ in range(games):
+        counts[play_game(x_policy, o_policy, rng, size, win_length)] += 1
+    return counts[Square.HUMAN_MARKER], counts[Square.COMPUTER_MARKER], counts[None]
+
+
+def simulate(games, x_policy="heuristic", o_policy="heuristic", workers=1,
+             seed=0, size=3, win_length=None, chunk_size=10_000):
+    """Play games between two policies and return a SimulationResult.
+
+    Policies are names from POLICIES or module-level functions taking
+    (board, marker, opponent_marker, rng) and returning a square number.
+    With workers > 1 the chunks run in a process pool (None uses every
+    CPU); policies must then be picklable.
+    """
+    win_length = size if win_length is None else win_length
+    chunks = []
+    for index, first in enumerate(range(0, games, chunk_size)):
+        chunk_games = min(chunk_size, games - first)
+        chunks.append((chunk_games, x_policy, o_policy, seed, index, size, win_length))
+
+    start = time.perf_counter()
+    if workers == 1:
+        totals = [_play_chunk(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            totals = list(pool.map(_play_chunk, *zip(*chunks)))
+    seconds = time.perf_counter() - start
+
+    x_wins, o_wins, draws = (sum(column) for column in zip(*totals)) if totals else (0, 0, 0)
+    return SimulationResult(x_wins, o_wins, draws, seconds)
+
+
+def main():
+    """Run a simulation from the command line."""
+    parser = argparse.ArgumentParser(description="Headless Tic Tac Toe self-play.")
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--x", default="heuristic", choices=POLICIES)
+    parser.add_argument("--o", default="heuristic", choices=POLICIES)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes; 0 uses every CPU")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=None)
+    args = parser.parse_args()
+    print(simulate(args.games, args.x, args.o, workers=args.workers or None,
+                   seed=args.seed, size=args.size, win_length=args.win_length))
+
+
+if __name__ == "__main__":
+    main()
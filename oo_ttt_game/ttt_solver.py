@@ -0,0 +1,245 @@
+"""Perfect-play minimax solver for Tic Tac Toe.
+
+Positions are a pair of 9-bit masks, (own, opp), seen from the side to
+move, using the same square-to-bit mapping as BitBoard. Scores are from
+the side to move: 0 for a draw, and a win or loss is worth one more than
+the number of empty squares left, so faster wins score higher.
+"""
+
+import struct
+
+from .oo_ttt_game import BitBoard
+
+FULL_MASK = BitBoard.FULL_MASK
+WINS = BitBoard.WINS
+INFINITY = 100
+
+# Try the center first, then corners, then edges: good moves early make
+# alpha-beta cut more.
+MOVE_ORDER = (5, 1, 3, 7, 9, 2, 4, 6, 8)
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Each entry of a saved table: canonical key, score and best square.
+_RECORD = struct.Struct("<IbB")
+
+
+def _square_permutations():
+    """Return the 8 rotations and reflections of the board.
+
+    Each permutation maps a 0-based square index to its index after the
+    transformation.
+    """
+    transforms = (
+        lambda r, c: (r, c),
+        lambda r, c: (c, 2 - r),
+        lambda r, c: (2 - r, 2 - c),
+        lambda r, c: (2 - c, r),
+        lambda r, c: (r, 2 - c),
+        lambda r, c: (2 - r, c),
+        lambda r, c: (c, r),
+        lambda r, c: (2 - c, 2 - r),
+    )
+    permutations = []
+    for transform in transforms:
+        permutation = [0] * 9
+        for index in range(9):
+            row, col = transform(*divmod(index, 3))
+            permutation[index] = row * 3 + col
+        permutations.append(tuple(permutation))
+    return tuple(permutations)
+
+
+def _mask_tables(permutations):
+    """Return, per permutation, a table of every mask after applying it."""
+    tables = []
+    for permutation in permutations:
+        table = []
+        for mask in range(FULL_MASK + 1):
+            moved = 0
+            for index in range(9):
+                if mask & (1 << index):
+                    moved |= 1 << permutation[index]
+            table.append(moved)
+        tables.append(tuple(table))
+    return tuple(tables)
+
+
+PERMUTATIONS = _square_permutations()
+SYMMETRY_TABLES = _mask_tables(PERMUTATIONS)
+
+
+def canonical(own, opp):
+    """Return (key, symmetry) for the smallest image of the position.
+
+    key packs the transformed masks as own | opp << 9 and is the same for
+    all 8 symmetric variants of a position.
+    """
+    best_key = None
+    best_symmetry = 0
+    for symmetry, table in enumerate(SYMMETRY_TABLES):
+        key = table[own] | table[opp] << 9
+        if best_key is None or key < best_key:
+            best_key = key
+            best_symmetry = symmetry
+    return best_key, best_symmetry
+
+
+def empty_count(own, opp):
+    """Return the number of empty squares."""
+    return 9 - bin(own | opp).count("1")
+
+
+class MinimaxSolver:
+    """Searches Tic Tac Toe positions with alpha-beta negamax.
+
+    With use_table the search keeps a transposition table keyed on the
+    canonical board, so symmetric and transposed positions are searched
+    once. solve() builds the exact score and best move of every reachable
+    position, after which best_move() is a table lookup.
+    """
+
+    def __init__(self, use_table=True):
+        """Initialize the solver with empty tables."""
+        self.use_table = use_table
+        self.table = {}
+        self.solved = {}
+        self.nodes = 0
+
+    def search(self, own, opp, alpha=-INFINITY, beta=INFINITY):
+        """Return the score of the position for the side to move."""
+        self.nodes += 1
+        if WINS[opp]:
+            return -(empty_count(own, opp) + 1)
+        if own | opp == FULL_MASK:
+            return 0
+
+        key = None
+        if self.use_table:
+            key, _ = canonical(own, opp)
+            entry = self.table.get(key)
+            if entry is not None:
+                score, flag = entry
+                if flag == EXACT:
+                    return score
+                if flag == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        original_alpha = alpha
+        best = -INFINITY
+        for square in MOVE_ORDER:
+            bit = 1 << (square - 1)
+            if (own | opp) & bit:
+                continue
+            score = -self.search(opp, own | bit, -beta, -alpha)
+            if score > best:
+                best = score
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        if self.use_table:
+            if best <= original_alpha:
+                flag = UPPER
+            elif best >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            self.table[key] = (best, flag)
+        return best
+
+    def solve(self):
+        """Build the exact score and best move of every reachable position."""
+        if not self.solved:
+            self._solve(0, 0)
+        return self.solved
+
+    def _solve(self, own, opp):
+        """Solve a position and its successors; return its score."""
+        key, symmetry = canonical(own, opp)
+        entry = self.solved.get(key)
+        if entry is not None:
+            return entry[0]
+
+        table = SYMMETRY_TABLES[symmetry]
+        own, opp = table[own], table[opp]
+        if WINS[opp]:
+            score, best_square = -(empty_count(own, opp) + 1), 0
+        elif own | opp == FULL_MASK:
+            score, best_square = 0, 0
+        else:
+            score, best_square = -INFINITY, 0
+            for square in MOVE_ORDER:
+                bit = 1 << (square - 1)
+                if (own | opp) & bit:
+                    continue
+                child_score = -self._solve(opp, own | bit)
+                if child_score > score:
+                    score, best_square = child_score, square
+        self.solved[key] = (score, best_square)
+        return score
+
+    def best_move(self, own, opp):
+        """Return the best square (1-9) for the side to move, or None."""
+        if own | opp == FULL_MASK or WINS[own] or WINS[opp]:
+            return None
+        if self.solved:
+            key, symmetry = canonical(own, opp)
+            canonical_square = self.solved[key][1]
+            return PERMUTATIONS[symmetry].index(canonical_square - 1) + 1
+
+        best_square, best = None, -INFINITY
+        for square in MOVE_ORDER:
+            bit = 1 << (square - 1)
+            if (own | opp) & bit:
+                continue
+            score = -self.search(opp, own | bit, -INFINITY, -best)
+            if best_square is None or score > best:
+                best_square, best = square, score
+        return best_square
+
+    def save(self, path):
+        """Write the solved table to a compact binary file."""
+        with open(path, "wb") as file:
+            for key, (score, square) in self.solved.items():
+                file.write(_RECORD.pack(key, score, square))
+
+    def load(self, path):
+        """Read a solved table written by save()."""
+        with open(path, "rb") as file:
+            data = file.read()
+        self.solved = {
+            key: (score, square)
+            for key, score, square in _RECORD.iter_unpack(data)
+        }
+
+
+_perfect_solver = None
+
+
+def perfect_solver(path=None):
+    """Return the shared solved solver, building it on first use.
+
+    If path is given, the table is loaded from that file when it exists
+    and written there after being built otherwise.
+    """
+    global _perfect_solver
+    if _perfect_solver is None:
+        solver = MinimaxSolver()
+        if path is not None:
+            try:
+                solver.load(path)
+            except FileNotFoundError:
+                solver.solve()
+                solver.save(path)
+        else:
+            solver.solve()
+        _perfect_solver = solver
+    return _perfect_solver
@@ -0,0 +1,40 @@
+"""Twenty-One: the game, strategy tables, card counting, Monte Carlo and bankroll odds.
+
+Names are loaded on first access, so importing the package alone does
+not import NumPy or the strategy tables until they are used.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "Card": ".oo_twenty_one",
+    "Deck": ".oo_twenty_one",
+    "Shoe": ".oo_twenty_one",
+    "Player": ".oo_twenty_one",
+    "Dealer": ".oo_twenty_one",
+    "TwentyOneGame": ".oo_twenty_one",
+    "StrategyPlayer": ".twenty_one_strategy",
+    "StrategyTable": ".twenty_one_strategy",
+    "strategy_table": ".twenty_one_strategy",
+    "CountingPlayer": ".twenty_one_counting",
+    "ShoeTracker": ".twenty_one_counting",
+    "simulate": ".twenty_one_mc",
+    "bankroll_odds": ".twenty_one_bankroll",
+    "hand_odds": ".twenty_one_bankroll",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import the module that defines name the first time it is used."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List the lazily exported names with the module's own."""
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,5 @@
+"""Entry point for python -m oo_twenty_one."""
+
+from .oo_twenty_one import main
+
+main()
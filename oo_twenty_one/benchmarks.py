@@ -0,0 +1,215 @@
+"""Benchmarks for the Twenty-One engines.
+
+Run from the repository root: python -m oo_twenty_one.benchmarks [name ...]
+"""
+
+import math
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+
+from game_io import NullRenderer, autoplay
+
+from . import twenty_one_bankroll, twenty_one_mc
+from .oo_twenty_one import CARDS, Card, Deck, Participant, Shoe, TwentyOneGame
+from .twenty_one_counting import HI_LO, ShoeTracker
+from .twenty_one_strategy import StrategyPlayer, card_value, composition_table
+
+
+def rescan_score(hand):
+    """Score a hand by rescanning it, as Participant.score did originally."""
+    score = sum(Card.VALUES[card.rank] for card in hand)
+    num_aces = sum(1 for card in hand if card.rank == 'A')
+    while score > 21 and num_aces > 0:
+        score -= 10
+        num_aces -= 1
+    return score
+
+
+def bench_monte_carlo():
+    """Report NumPy simulation throughput and agreement with the object game."""
+    vectorized = twenty_one_mc.simulate(10_000_000, seed=1)
+    objects = twenty_one_mc.simulate_objects(100_000, seed=2)
+    print(f"NumPy:   {vectorized}")
+    print(f"Objects: {objects}")
+    print(f"Speedup: {vectorized.hands_per_second / objects.hands_per_second:.0f}x, "
+          f"z-score of mean difference: {vectorized.z_score(objects):+.2f}")
+
+
+def bench_scoring():
+    """Report per-hand scoring cost, rescanning versus incremental.
+
+    tests/test_twenty_one_scoring.py checks the incremental scores against
+    the rescanning ones.
+    """
+    rng = random.Random(1)
+    print("Cards | Rescan (us/hand) | Incremental (us/hand)")
+    print("------|------------------|----------------------")
+    for size in (2, 3, 5, 8):
+        hand = rng.sample(CARDS, size)
+        participant = Participant()
+        participant.hand = hand
+        # Scored the way the game does: score() and is_busted() per card dealt.
+        rescan = timeit.timeit(lambda: (rescan_score(hand) > 21, rescan_score(hand)),
+                               number=100_000)
+        incremental = timeit.timeit(lambda: (participant.is_busted(), participant.score()),
+                                    number=100_000)
+        print(f"{size:<6}| {rescan * 10:<17.3f}| {incremental * 10:.3f}")
+
+
+def _play_hand(game):
+    """Deal a hand and play it out, standing on 17, without printing."""
+    game.deck.prepare_hand()
+    game.player.clear_hand()
+    game.dealer.clear_hand()
+    game.deal_cards()
+    while game.player.score() < 17:
+        game.player.hit(game.deck)
+    while not game.player.is_busted() and game.dealer.score() < 17:
+        game.dealer.hit(game.deck)
+    return game.hand_outcome()
+
+
+class PlainCard:
+    """A card as Card was before interning: a new object with a __dict__."""
+
+    def __init__(self, rank, suit):
+        self.rank = rank
+        self.suit = suit
+
+
+class FreshCardDeck(Deck):
+    """A deck that builds 52 new cards every hand, as Deck originally did."""
+
+    def prepare_hand(self):
+        """Build and shuffle 52 new cards for a new hand."""
+        self.cards = [PlainCard(rank, suit) for rank in Card.RANKS for suit in Card.SUITS]
+        self.rng.shuffle(self.cards)
+
+
+def _hand_state(game):
+    """Return the objects a game's next hand replaces."""
+    return game.deck.cards, game.player.hand, game.dealer.hand
+
+
+def bench_allocations(games=200, hands=20):
+    """Report memory blocks and bytes allocated per hand, before and after interning.
+
+    The same games replay hands. What each hand replaces (the deck's
+    cards and both hands) is kept alive, so a hand cannot reuse the
+    memory the previous one freed and the deltas count what it allocates.
+    """
+    print("Deck            | Blocks per hand | Bytes per hand")
+    print("----------------|-----------------|---------------")
+    for label, deck_class in (("Fresh cards", FreshCardDeck), ("Shared cards", Deck)):
+        played = []
+        for _ in range(games):
+            game = TwentyOneGame()
+            game.deck = deck_class()
+            _play_hand(game)
+            played.append(game)
+        held = []
+        blocks = size = 0
+        tracemalloc.start()
+        for _ in range(hands):
+            for game in played:
+                held.append(_hand_state(game))
+                start_blocks = sys.getallocatedblocks()
+                start_size = tracemalloc.get_traced_memory()[0]
+                _play_hand(game)
+                size += tracemalloc.get_traced_memory()[0] - start_size
+                blocks += sys.getallocatedblocks() - start_blocks
+        tracemalloc.stop()
+        print(f"{label:<16}| {blocks / (games * hands):<16.1f}| {size / (games * hands):,.0f}")
+
+
+def scan_true_count(shoe):
+    """Return the Hi-Lo true count by scanning the dealt part of the shoe."""
+    running = sum(HI_LO[card_value(CARDS[code])] for code in shoe.codes[:shoe.position])
+    return running / (shoe.cards_remaining() / len(CARDS))
+
+
+def bench_counting(decks=6):
+    """Report true-count query cost, scanning versus tracked, and table caching."""
+    tracker = ShoeTracker(decks)
+    shoe = Shoe(decks, penetration=1.0, rng=random.Random(0), tracker=tracker)
+    print("Dealt | Scan (us/query) | Tracked (us/query)")
+    print("------|-----------------|-------------------")
+    for dealt in (52, 104, 208):
+        while shoe.position < dealt:
+            shoe.deal()
+        assert abs(scan_true_count(shoe) - tracker.true_count()) < 1e-9
+        scan = timeit.timeit(lambda: scan_true_count(shoe), number=1_000)
+        tracked = timeit.timeit(tracker.true_count, number=1_000)
+        print(f"{dealt:<6}| {scan * 1000:<16.3f}| {tracked * 1000:.3f}")
+
+    composition_table.cache_clear()
+    cold = timeit.timeit(lambda: composition_table(tracker.composition()), number=1)
+    warm = timeit.timeit(lambda: composition_table(tracker.composition()), number=1_000) / 1_000
+    print(f"EV table for a composition: {cold * 1000:.1f} ms cold, {warm * 1e6:.2f} us cached "
+          f"({composition_table.cache_info()})")
+
+
+def bench_bankroll(sessions=5_000):
+    """Report exact bankroll solve and query times, checked against played sessions."""
+    twenty_one_bankroll.hand_odds.cache_clear()
+    twenty_one_bankroll.bankroll_odds.cache_clear()
+    twenty_one_bankroll.dealer_finishes.cache_clear()
+    start = time.perf_counter()
+    odds = twenty_one_bankroll.bankroll_odds(policy="strategy")
+    cold = time.perf_counter() - start
+    print(f"Hand odds (strategy table): {odds.hand}")
+    print(f"First solve: {cold * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    queries = 0
+    for target in range(2, 101):
+        chain = twenty_one_bankroll.bankroll_odds(target, policy="strategy")
+        for money in range(1, target):
+            chain.goal_probability(money)
+            queries += 1
+    sweep = time.perf_counter() - start
+    cached = timeit.timeit(lambda: twenty_one_bankroll.bankroll_odds(
+        policy="strategy").goal_probability(5), number=10_000) / 10_000
+    print(f"What-if sweep, targets 2-100 and every start: {queries:,} queries in "
+          f"{sweep * 1000:.1f} ms; cached query {cached * 1e6:.2f} us")
+
+    # The player only answers "play again", so a session's hands are its
+    # answers plus the first hand.
+    answers = []
+    start = time.perf_counter()
+    reached = 0
+    for seed in range(sessions):
+        game = autoplay(TwentyOneGame(player=StrategyPlayer(), renderer=NullRenderer(),
+                                      seed=seed), lambda game: answers.append(1) or 'y')
+        reached += game.player.money >= 10
+    played = time.perf_counter() - start
+    expected = odds.goal_probability()
+    error = math.sqrt(expected * (1 - expected) / sessions)
+    print(f"Reach $10 from $5: exact {expected:.4f}, played {reached / sessions:.4f} "
+          f"(z {(reached / sessions - expected) / error:+.2f})")
+    print(f"Hands per session: exact {odds.expected_hands():.2f}, "
+          f"played {(len(answers) + sessions) / sessions:.2f}")
+    print(f"{sessions:,} sessions played in {played:.1f} s")
+
+
+BENCHMARKS = {
+    "monte_carlo": bench_monte_carlo,
+    "scoring": bench_scoring,
+    "allocations": bench_allocations,
+    "counting": bench_counting,
+    "bankroll": bench_bankroll,
+}
+
+
+def main(names):
+    """Run the named benchmarks, or all of them."""
+    for name in names or BENCHMARKS:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,45 +1,171 @@
 """Twenty-One (Blackjack) game implementation using object-oriented programming."""
 
 import random
+import sys
+from array import array
 
 class Card:
-    """Represents a single playing card."""
+    """Represents a single playing card.
+
+    Cards are interned: Card(rank, suit) always returns the same shared
+    instance for a given rank and suit, so the 52 distinct cards are
+    allocated once and reused by every deck, shoe and hand.
+    """
+    __slots__ = ('rank', 'suit', 'code')
+    _interned = {}
     RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
     SUITS = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
     VALUES = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9,
               '10': 10, 'J': 10, 'Q': 10, 'K': 10, 'A': 11}
 
-    def __init__(self, rank, suit):
-        #rank and suit
-        self.rank = rank
-        self.suit = suit
+    def __new__(cls, rank, suit):
+        """Return the shared card with the given rank and suit."""
+        card = cls._interned.get((rank, suit))
+        if card is None:
+            card = super().__new__(cls)
+            card.rank = rank
+            card.suit = suit
+            card.code = cls.RANKS.index(rank) * len(cls.SUITS) + cls.SUITS.index(suit)
+            cls._interned[(rank, suit)] = card
+        return card
 
     def __str__(self):
         """Return a string representation of the card."""
         return f"{self.rank} of {self.suit}"
 
+    @staticmethod
+    def from_code(code):
+        """Return the shared Card for a card code (0-51)."""
+        return CARDS[code]
+
+# The 52 distinct cards, shared by every deck and shoe. A card's code is
+# its index here: rank index * 4 + suit index.
+CARDS = tuple(Card(rank, suit) for rank in Card.RANKS for suit in Card.SUITS)
+
 class Deck:
     """Represents a deck of 52 playing cards."""
-    def __init__(self):
-       self.cards = [Card(rank, suit) for rank in Card.RANKS for suit in Card.SUITS]
+    def __init__(self, rng=None, tracker=None):
+        # Shuffles with rng.shuffle(); the global random module by default
+        self.rng = random if rng is None else rng
+        # A twenty_one_counting.ShoeTracker told of every deal, if given
+        self.tracker = tracker
+        self.cards = []
+        self.prepare_hand()
+
+    def prepare_hand(self):
+        """Restore and shuffle all 52 cards for a new hand."""
+        self.cards = list(CARDS)
+        self.rng.shuffle(self.cards)
+        if self.tracker is not None:
+            self.tracker.reset(1)
 
     def deal(self):
         """Deal and return a random card from the deck."""
         if not self.cards:
-            self.cards = [Card(rank, suit) for rank in Card.RANKS for suit in Card.SUITS]
-        return self.cards.pop(random.randrange(len(self.cards)))
+            self.prepare_hand()
+        card = self.cards.pop()
+        if self.tracker is not None:
+            self.tracker.deal(card.code)
+        return card
+
+class Shoe:
+    """Represents a multi-deck shoe dealt down to a cut card.
+
+    The shoe is a compact array of card codes, shuffled once and dealt by
+    advancing a cursor. It is only reshuffled between hands, once the
+    cursor has passed the cut card placed at `penetration` of the shoe.
+    """
+    def __init__(self, decks=6, penetration=0.75, rng=None, tracker=None):
+        """Initialize and shuffle a shoe of the given number of decks.
+
+        rng.shuffle() shuffles it; the global random module by default.
+        tracker, a twenty_one_counting.ShoeTracker, is told of every deal
+        and reshuffle.
+        """
+        if decks < 1:
+            raise ValueError("A shoe needs at least one deck.")
+        if not 0 < penetration <= 1:
+            raise ValueError("Penetration must be greater than 0 and at most 1.")
+        self.decks = decks
+        self.penetration = penetration
+        self.rng = random if rng is None else rng
+        self.tracker = tracker
+        self.codes = array('B', range(len(CARDS))) * decks
+        self.cut_card = int(len(self.codes) * penetration)
+        self.position = 0
+        self.shuffle()
+
+    def shuffle(self):
+        """Shuffle every card back into the shoe."""
+        self.rng.shuffle(self.codes)
+        self.position = 0
+        if self.tracker is not None:
+            self.tracker.reset(self.decks)
+
+    def cards_remaining(self):
+        """Return the number of cards left to deal."""
+        return len(self.codes) - self.position
+
+    def prepare_hand(self):
+        """Reshuffle if the cut card has been reached."""
+        if self.position >= self.cut_card:
+            self.shuffle()
+
+    def deal(self):
+        """Deal and return the next card in the shoe."""
+        if self.position >= len(self.codes):
+            self.shuffle()
+        code = self.codes[self.position]
+        self.position += 1
+        if self.tracker is not None:
+            self.tracker.deal(code)
+        return CARDS[code]
 
 class Participant:
-    """Base class for game participants (Player and Dealer)."""
+    """Base class for game participants (Player and Dealer).
+
+    The hand's hard total (aces counted as 1) and ace count are kept up to
+    date as cards are added, so score() and is_busted() never rescan the
+    hand. Add cards with hit() or add_card() rather than appending to
+    hand directly.
+    """
+    __slots__ = ('_hand', '_hard_total', '_aces', 'stayed')
+
     def __init__(self):
         """Initialize a participant with an empty hand."""
         self.hand = []
         self.stayed = False
 
+    @property
+    def hand(self):
+        """Get the cards in the participant's hand."""
+        return self._hand
+
+    @hand.setter
+    def hand(self, cards):
+        """Replace the hand and recount its totals."""
+        self.clear_hand()
+        for card in cards:
+            self.add_card(card)
+
+    def clear_hand(self):
+        """Empty the participant's hand."""
+        self._hand = []
+        self._hard_total = 0
+        self._aces = 0
+
+    def add_card(self, card):
+        """Add a card to the hand and update the running totals."""
+        self._hand.append(card)
+        if card.rank == 'A':
+            self._aces += 1
+            self._hard_total += 1
+        else:
+            self._hard_total += Card.VALUES[card.rank]
+
     def hit(self, deck):
         """Add a card to the participant's hand."""
-        card = deck.deal()
-        self.hand.append(card)
+        self.add_card(deck.deal())
 
     def stay(self):
         """Mark the participant as staying."""
@@ -47,26 +173,31 @@ class Participant:
 
     def is_busted(self):
         """Check if the participant's score exceeds 21."""
-        return self.score() > 21
+        return self._hard_total > 21
     
     def score(self):
-        """Calculate the participant's score, adjusting for Aces."""
-        score = sum(Card.VALUES[card.rank] for card in self.hand)
-        num_aces = sum(1 for card in self.hand if card.rank == 'A')
-        while score > 21 and num_aces > 0:
-            score -= 10
-            num_aces -= 1
-        return score
+        """Calculate the participant's score, counting one Ace as 11 if it fits."""
+        if self._aces and self._hard_total <= 11:
+            return self._hard_total + 10
+        return self._hard_total
 
 class Player(Participant):
     """Represents the human player."""
+    __slots__ = ('money',)
+
     def __init__(self):
         super().__init__()
         self.money = 5
+
+    def choose(self, dealer_upcard):
+        """Return None: a human answers through TwentyOneGame.handle()."""
+        return None
                 
 
 class Dealer(Participant):
     """Represents the dealer."""
+    __slots__ = ('hidden',)
+
     def __init__(self):
         """Initialize the dealer."""
         super().__init__()
@@ -87,34 +218,156 @@ class Dealer(Participant):
             self.hit(deck)
 
 class TwentyOneGame:
-    """Manages the Twenty-One game logic and flow."""
-    def __init__(self):
-        """Initialize the game with a deck, player, and dealer."""
-        self.deck = Deck()
-        self.player = Player()
+    """Manages the Twenty-One game logic and flow.
+
+    The game runs as a state machine: begin() starts it, and handle()
+    takes one answer to the current prompt and advances until the next
+    answer is needed or the game is finished. start() drives the machine
+    from the terminal.
+
+    Output goes to a renderer, any object with a write() method. The lines
+    produced by one step are collected into a frame and written with a
+    single write() call.
+    """
+    def __init__(self, shoe_decks=None, penetration=0.75, player=None, renderer=None,
+                 input_source=None, replay=None, rng=None, seed=None, tracker=None,
+                 results=None):
+        """Initialize the game with a deck, player, and dealer.
+
+        With shoe_decks the cards come from a Shoe of that many decks,
+        kept across hands and reshuffled at the given penetration.
+        Otherwise every hand gets a fresh single deck. player defaults to
+        a human Player; a Player subclass whose choose() returns 'h' or
+        's' plays without being asked. renderer receives the game's output
+        (sys.stdout by default) and input_source is called with each prompt
+        by start() (input() by default). replay, a replay_log.ReplayWriter,
+        records every settled hand. results, a results_store.ResultsStore,
+        records each hand's outcome and the player's money after it.
+
+        rng shuffles the cards: any object with random.Random's shuffle().
+        Without one the game uses random.Random(seed), or the global random
+        module when no seed is given either. seed is also what the replay
+        log records.
+
+        tracker, a twenty_one_counting.ShoeTracker, follows the cards dealt
+        from the deck or shoe. The dealer's hidden card is kept from it
+        until revealed.
+        """
+        self.seed = seed
+        if rng is None:
+            rng = random if seed is None else random.Random(seed)
+        self.rng = rng
+        self.tracker = tracker
+        if shoe_decks is None:
+            self.deck = Deck(rng, tracker)
+        else:
+            self.deck = Shoe(shoe_decks, penetration, rng, tracker)
+        self.player = player or Player()
         self.dealer = Dealer()
+        self.renderer = sys.stdout if renderer is None else renderer
+        self.input_source = input if input_source is None else input_source
+        self._frame = []
+        self.replay = replay
+        self.results = results
+        self.state = None
+        self.finished = False
+
+    @property
+    def prompt(self):
+        """Return the question the game is waiting on, or None."""
+        if self.state == "player_turn":
+            return "Do you want to hit (h) or stay (s)? "
+        if self.state == "play_again":
+            return "Do you want to play again? (y/n): "
+        return None
+
+    def begin(self):
+        """Welcome the player and deal the first hand."""
+        self.finished = False
+        if self.replay is not None:
+            self.replay.start_game("twenty-one", self.seed)
+        self.display_welcome_message()
+        self._start_hand()
+        self.render_frame()
+
+    def handle(self, answer):
+        """Apply one answer to the current prompt and advance the game."""
+        if self.finished:
+            raise RuntimeError("The game is already finished.")
+        getattr(self, f"_handle_{self.state}")(answer.strip().lower())
+        self.render_frame()
 
     def start(self):
         """Run the main game loop."""
-        self.display_welcome_message()
+        self.begin()
+        while not self.finished:
+            self.handle(self.input_source(self.prompt))
+
+    def _say(self, text=""):
+        """Add a line of output to the current frame."""
+        self._frame.append(text)
+
+    def render_frame(self):
+        """Write the output collected since the last frame in one write."""
+        if self._frame:
+            self.renderer.write("\n".join(self._frame) + "\n")
+            self._frame.clear()
+
+    def _start_hand(self):
+        """Deal a new hand while the player has money and hasn't won."""
+        if not 0 < self.player.money < 10:
+            self._finish()
+            return
+        self.deck.prepare_hand() # Fresh deck, or reshuffle at the cut card
+        self.player.clear_hand()
+        self.dealer.clear_hand()
+        self.player.stayed = False
+        self.dealer.stayed = False
+        self.deal_cards()
+        self.dealer.hide()
+        if self.tracker is not None:
+            self.tracker.conceal(self.dealer.hand[1].code)
+        self.show_cards()
+        self._continue_hand()
 
-        while self.player.money > 0 and self.player.money < 10:
-            self.deck = Deck() # Reset the deck for each game
-            self.player.hand = []  # Reset player's hand
-            self.dealer.hand = []  # Reset dealer's hand
-            self.player.stayed = False  
-            self.dealer.stayed = False
-            self.dealer.hide()
-            self.deal_cards()
-            self.show_cards()
-            self.player_turn()
-            if not self.player.is_busted():
-                self.dealer_turn()
-            self.display_result()
-            if not self.play_again():
-                break   
+    def _continue_hand(self):
+        """Play on until the player must answer or the hand is settled."""
+        if self.player_turn():
+            self.state = "player_turn"
+            return
+        if not self.player.is_busted():
+            self.dealer_turn()
+        self.display_result()
+        if self.player.money == 0:
+            self._say("You have no money left. Game over!")
+            self._finish()
+        elif self.player.money >= 10:
+            self._say("Congratulations! You have reached $10. You win the game!")
+            self._finish()
+        else:
+            self.state = "play_again"
+
+    def _handle_player_turn(self, answer):
+        """Hit or stay on the player's answer."""
+        self.apply_choice(answer)
+        self._continue_hand()
+
+    def _handle_play_again(self, answer):
+        """Deal another hand or end the game."""
+        if answer in ('y', 'yes'):
+            self._start_hand()
+        elif answer in ('n', 'no'):
+            self._finish()
+        else:
+            self._say("Invalid input. Please enter 'y' or 'n'.")
 
+    def _finish(self):
+        """Say goodbye and end the game."""
+        if self.replay is not None:
+            self.replay.end_game()
         self.display_goodbye_message()
+        self.state = None
+        self.finished = True
 
     def deal_cards(self):
         """Run the main game loop."""
@@ -122,83 +375,116 @@ class TwentyOneGame:
 
     def show_cards(self):
         """Display the dealer's and player's hands."""
-        print("\nDealer's Hand:")
+        self._say("\nDealer's Hand:")
         if self.dealer.hidden:
-            print(f"{self.dealer.hand[0]} and [Hidden Card]")
+            self._say(f"{self.dealer.hand[0]} and [Hidden Card]")
         else:
-            print(", ".join(str(card) for card in self.dealer.hand))
-            print(f"Dealer's Score: {self.dealer.score()}")
-
-        print("\nPlayer's Hand:")
-        print(", ".join(str(card) for card in self.player.hand))
-        print(f"Player's Score: {self.player.score()}")
-        print(f"Player's Money: ${self.player.money}")
+            self._say(", ".join(str(card) for card in self.dealer.hand))
+            self._say(f"Dealer's Score: {self.dealer.score()}")
+
+        self._say("\nPlayer's Hand:")
+        self._say(", ".join(str(card) for card in self.player.hand))
+        self._say(f"Player's Score: {self.player.score()}")
+        self._say(f"Player's Money: ${self.player.money}")
+
+    def apply_choice(self, choice):
+        """Hit or stay on a player's choice."""
+        if choice in ('h', 'hit'):
+            self.player.hit(self.deck)
+            self.show_cards()
+        elif choice in ('s', 'stay'):
+            self.player.stay()
+        else:
+            self._say("Invalid input. Please enter 'h' or 's'.")
 
     def player_turn(self):
-        """Handle the player's turn."""
+        """Play the player's own choices until done or an answer is needed.
+
+        Returns True while the player still has to answer.
+        """
         while not self.player.stayed and not self.player.is_busted():
-            choice = input("Do you want to hit (h) or stay (s)? ").strip().lower()
-            if choice in ('h', 'hit'):
-                self.player.hit(self.deck)
-                self.show_cards()
-            elif choice in ('s', 'stay'):
-                self.player.stay()
-            else:
-                print("Invalid input. Please enter 'h' or 's'.")
+            choice = self.player.choose(self.dealer.hand[0])
+            if choice is None:
+                return True
+            self.apply_choice(choice)
+        return False
+
+    def reveal_dealer(self):
+        """Turn the dealer's hidden card face up."""
+        if self.dealer.hidden and self.tracker is not None:
+            self.tracker.reveal(self.dealer.hand[1].code)
+        self.dealer.reveal()
 
     def dealer_turn(self):
         """Handle the dealer's turn."""
-        self.dealer.reveal()
+        self.reveal_dealer()
         self.show_cards()
 
         while self.dealer.score() < 17:
-            print("Dealer hits.")
+            self._say("Dealer hits.")
             self.dealer.hit(self.deck)
             self.show_cards()
 
     def display_welcome_message(self):
         """Display the welcome message."""
-        print("Welcome to Twenty-One!")
+        self._say("Welcome to Twenty-One!")
 
     def display_goodbye_message(self):
         """Display the goodbye message."""
-        print("Thanks for playing Twenty-One! Goodbye!")
+        self._say("Thanks for playing Twenty-One! Goodbye!")
+
+    def hand_outcome(self):
+        """Return the player's result for the hand: 1 win, 0 tie, -1 loss."""
+        if self.player.is_busted():
+            return -1
+        if self.dealer.is_busted() or self.player.score() > self.dealer.score():
+            return 1
+        if self.player.score() < self.dealer.score():
+            return -1
+        return 0
+
+    def hand_payout(self):
+        """Return the money the hand wins or loses.
+
+        A bust loses the hand but, as the game has always played, does not
+        cost the player's dollar; every other hand pays its outcome.
+        """
+        if self.player.is_busted():
+            return 0
+        return self.hand_outcome()
 
     def display_result(self):
         """Display the game result and update player's money."""
-        self.dealer.reveal()
+        self.reveal_dealer()
         self.show_cards()   
 
+        outcome = self.hand_outcome()
+        if self.replay is not None:
+            self.replay.twenty_one_hand([card.code for card in self.player.hand],
+                                        [card.code for card in self.dealer.hand])
         if self.player.is_busted():
-            print("You busted! Dealer wins.")
-        elif self.dealer.is_busted() or self.player.score() > self.dealer.score():
-            print("You win!")
-            self.player.money += 1
-        elif self.player.score() < self.dealer.score():
-            print("Dealer wins!")
-            self.player.money -= 1
+            self._say("You busted! Dealer wins.")
+        elif outcome == 1:
+            self._say("You win!")
+        elif outcome == -1:
+            self._say("Dealer wins!")
         else:
-            print("It's a tie!")
-
-    def play_again(self):
-        """Ask the player if they want to play again."""
-
-        if self.player.money == 0:
-            print("You have no money left. Game over!")
-            return
-        
-        if self.player.money >= 10:
-            print("Congratulations! You have reached $10. You win the game!")
-            return
-
-        while True:
-            choice = input("Do you want to play again? (y/n): ").strip().lower()
-            if choice in ('y', 'yes'):
-                return True
-            elif choice in ('n', 'no'):
-                return False
-            else:
-                print("Invalid input. Please enter 'y' or 'n'.")
-
-game = TwentyOneGame()
-game.start()
\ No newline at end of file
+            self._say("It's a tie!")
+        self.player.money += self.hand_payout()
+        if self.results is not None:
+            self.results.record("twenty-one", outcome, self.player.money)
+
+def main():
+    """Play Twenty-One in the terminal."""
+    # Instrumentation and SQLite are only loaded for the terminal game.
+    # pylint: disable=import-outside-toplevel
+    from instrumentation import configure_from_environment
+    from results_store import results_from_environment
+    configure_from_environment()
+    with results_from_environment() as results:
+        game = TwentyOneGame(results=results)
+        game.start()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
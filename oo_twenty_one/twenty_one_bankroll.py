@@ -0,0 +1,343 @@
+"""Exact hand odds and bankroll risk of ruin for Twenty-One.
+
+hand_odds() gives a hand's win, tie, loss and bust probabilities exactly. It
+enumerates every card the player can draw from a fresh shoe, taking each
+card out of the shoe as it is dealt, with the player hitting by a fixed
+policy and the dealer hitting below 17 as in TwentyOneGame.dealer_turn.
+
+The dealer's side is not searched card by card for every shoe the
+player can leave behind. For each upcard, the ways the dealer can finish
+are listed once as the multiset of cards drawn, with the number of
+orders the dealer could draw them in. Against a given shoe, a multiset's
+chance is that count times a product of falling factorials. All the shoes
+the player's stands leave are scored at once with NumPy.
+
+bankroll_odds() treats a session as the absorbing Markov chain behind
+TwentyOneGame.start. The player's money moves up or down one stake a
+hand, or stays put on a tie or a bust, until it reaches 0 or the target. Solving
+the chain's (tridiagonal) linear systems gives the chance of reaching the
+target and the expected number of hands for every starting bankroll at
+once.
+
+Both are memoized on their configuration, so once a rule and stake have
+been solved, what-if queries over starting bankrolls are lookups.
+
+Requires NumPy.
+
+Run from the repository root:
+    python -m oo_twenty_one.twenty_one_bankroll --policy strategy --target 10
+"""
+
+import argparse
+import functools
+import time
+
+import numpy as np
+
+from .twenty_one_strategy import (BUST, DEALER_FINALS, DEALER_STANDS_ON, MAX_HARD_TOTAL,
+                                  VALUES, _score, full_composition, remove_card,
+                                  strategy_table)
+
+START_MONEY = 5
+TARGET_MONEY = 10
+STAKE = 1
+
+
+class HandOdds:
+    """Win, tie, loss and bust probabilities of one hand.
+
+    loss is the chance of losing to the dealer's total; a bust loses the
+    hand too but, as in TwentyOneGame.hand_payout, costs nothing.
+    """
+
+    def __init__(self, win=0.0, tie=0.0, loss=0.0, bust=0.0):
+        """Initialize the odds from the four outcome probabilities."""
+        self.win = win
+        self.tie = tie
+        self.loss = loss
+        self.bust = bust
+
+    @property
+    def mean(self):
+        """Return the player's expected return per hand at a stake of 1."""
+        return self.win - self.loss
+
+    def __str__(self):
+        """Return a one-line summary of the odds."""
+        return (f"Win: {self.win:.5f}, Tie: {self.tie:.5f}, Loss: {self.loss:.5f}, "
+                f"Bust: {self.bust:.5f}, Mean return: {self.mean:+.5f}")
+
+
+class BankrollOdds:
+    """Chances of reaching the target and expected hands per starting bankroll."""
+
+    def __init__(self, hand, target, stake, goal, hands):
+        """Initialize the odds with dicts keyed by starting money."""
+        self.hand = hand
+        self.target = target
+        self.stake = stake
+        self._goal = goal
+        self._hands = hands
+
+    def _check(self, start):
+        """Raise ValueError unless start is a bankroll strictly inside the chain."""
+        if start not in self._goal:
+            raise ValueError(f"Starting money must be between 1 and {self.target - 1}.")
+
+    def goal_probability(self, start=START_MONEY):
+        """Return the chance of reaching the target from start."""
+        self._check(start)
+        return self._goal[start]
+
+    def ruin_probability(self, start=START_MONEY):
+        """Return the chance of losing everything from start."""
+        self._check(start)
+        return 1.0 - self._goal[start]
+
+    def expected_hands(self, start=START_MONEY):
+        """Return the expected number of hands played from start."""
+        self._check(start)
+        return self._hands[start]
+
+
+def _draws(composition):
+    """Yield (value, probability, composition after) for every next card."""
+    total = sum(composition)
+    for index, count in enumerate(composition):
+        if count:
+            yield (index + 1, count / total,
+                   composition[:index] + (count - 1,) + composition[index + 1:])
+
+
+def _hit_rule(decks, policy):
+    """Return a function (hard, has_ace, upcard) -> True to hit for a policy.
+
+    policy is a total the player hits below, like the dealer's 17, or
+    "strategy" for the strategy table of the shoe.
+    """
+    if policy == "strategy":
+        return strategy_table(decks).should_hit
+    return lambda hard, has_ace, upcard: _score(hard, has_ace) < policy
+
+
+@functools.lru_cache(maxsize=None)
+def dealer_finishes(upcard, decks=1):
+    """Return every way the dealer can finish from an upcard.
+
+    Returns (drawn, orders, finals): drawn is an array with one row per
+    multiset of cards the dealer takes (the hidden card and every hit),
+    counted by value; orders is how many draw orders of that multiset the
+    dealer would actually play out; finals indexes DEALER_FINALS.
+    """
+    limits = remove_card(full_composition(decks), upcard)
+    finishes = {}
+    # Every multiset in a layer has the same number of cards, so its
+    # order count is complete once the previous layer is expanded.
+    layer = {(0,) * len(VALUES): 1}
+    while layer:
+        next_layer = {}
+        for drawn, orders in layer.items():
+            hard = upcard + sum(value * count for value, count in zip(VALUES, drawn))
+            score = _score(hard, upcard == 1 or drawn[0] > 0)
+            if score >= DEALER_STANDS_ON:
+                finishes[drawn] = (orders, DEALER_FINALS.index(min(score, BUST)))
+                continue
+            for index, limit in enumerate(limits):
+                if drawn[index] < limit:
+                    more = drawn[:index] + (drawn[index] + 1,) + drawn[index + 1:]
+                    next_layer[more] = next_layer.get(more, 0) + orders
+        layer = next_layer
+    drawn = np.array(list(finishes), dtype=np.intp)
+    orders = np.array([orders for orders, _ in finishes.values()], dtype=np.float64)
+    finals = np.array([final for _, final in finishes.values()], dtype=np.intp)
+    return drawn, orders, finals
+
+
+def dealer_finals(upcard, compositions, decks=1):
+    """Return the dealer's final-total chances against each composition.
+
+    compositions are shoes after the upcard, with the hidden card still
+    in them. Returns an array with a row per composition, ordered as
+    DEALER_FINALS.
+    """
+    drawn, orders, finals = dealer_finishes(upcard, decks)
+    shoes = np.array(compositions, dtype=np.float64)
+    depth = int(drawn.sum(axis=1).max()) + 1
+    # falling[c, v, m] = shoes[c, v] * (shoes[c, v] - 1) * ... (m factors);
+    # it reaches 0 once m exceeds the cards of that value left.
+    steps = np.arange(depth - 1, dtype=np.float64)
+    falling = np.ones((len(shoes), len(VALUES), depth))
+    falling[:, :, 1:] = np.cumprod(shoes[:, :, None] - steps, axis=2)
+    totals = shoes.sum(axis=1)
+    falling_total = np.ones((len(shoes), depth))
+    falling_total[:, 1:] = np.cumprod(totals[:, None] - steps, axis=1)
+
+    chances = np.broadcast_to(orders, (len(shoes), len(orders))).copy()
+    for index in range(len(VALUES)):
+        chances *= falling[:, index, drawn[:, index]]
+    chances /= falling_total[:, drawn.sum(axis=1)]
+    table = np.zeros((len(shoes), len(DEALER_FINALS)))
+    for final in range(len(DEALER_FINALS)):
+        table[:, final] = chances[:, finals == final].sum(axis=1)
+    return table
+
+
+def _stand_odds(score, finals):
+    """Return (win, tie, loss, bust) for standing on score against finals."""
+    win = finals[-1]
+    tie = loss = 0.0
+    for final, chance in zip(DEALER_FINALS, finals[:-1]):
+        if score > final:
+            win += chance
+        elif score == final:
+            tie += chance
+        else:
+            loss += chance
+    return win, tie, loss, 0.0
+
+
+def _collect_stands(hard, has_ace, upcard, composition, hits, seen, stands):
+    """Add the composition of every shoe the player can stand on to stands."""
+    if hard > MAX_HARD_TOTAL:
+        return
+    key = (hard, has_ace, upcard, composition)
+    if key in seen:
+        return
+    seen.add(key)
+    if hits(hard, has_ace, upcard):
+        for value, _, rest in _draws(composition):
+            _collect_stands(hard + value, has_ace or value == 1, upcard, rest, hits, seen, stands)
+    else:
+        stands[upcard].add(composition)
+
+
+def _player_odds(hard, has_ace, upcard, composition, hits, finals, memo):
+    """Return (win, tie, loss, bust) for a player hand about to decide."""
+    if hard > MAX_HARD_TOTAL:
+        return 0.0, 0.0, 0.0, 1.0
+    key = (hard, has_ace, upcard, composition)
+    if key not in memo:
+        if hits(hard, has_ace, upcard):
+            odds = [0.0] * 4
+            for value, probability, rest in _draws(composition):
+                card_odds = _player_odds(
+                    hard + value, has_ace or value == 1, upcard, rest, hits, finals, memo)
+                for outcome, chance in enumerate(card_odds):
+                    odds[outcome] += probability * chance
+            memo[key] = tuple(odds)
+        else:
+            memo[key] = _stand_odds(_score(hard, has_ace), finals[upcard, composition])
+    return memo[key]
+
+
+def _first_hands(decks):
+    """Yield (chance, hard, has_ace, upcard, shoe left) for every deal.
+
+    Cards come out player, dealer, player; the hidden card stays in the
+    shoe until the dealer plays, which gives the same odds.
+    """
+    for first, first_chance, after_first in _draws(full_composition(decks)):
+        for upcard, upcard_chance, after_upcard in _draws(after_first):
+            for second, second_chance, rest in _draws(after_upcard):
+                yield (first_chance * upcard_chance * second_chance, first + second,
+                       first == 1 or second == 1, upcard, rest)
+
+
+@functools.lru_cache(maxsize=None)
+def hand_odds(decks=1, policy=DEALER_STANDS_ON):
+    """Return the exact HandOdds of a hand dealt from a fresh shoe.
+
+    The player hits below policy (a total) or by the strategy table when
+    policy is "strategy".
+    """
+    hits = _hit_rule(decks, policy)
+    stands = {upcard: set() for upcard in VALUES}
+    seen = set()
+    for _, hard, has_ace, upcard, rest in _first_hands(decks):
+        _collect_stands(hard, has_ace, upcard, rest, hits, seen, stands)
+    finals = {}
+    for upcard, compositions in stands.items():
+        compositions = list(compositions)
+        if compositions:
+            rows = dealer_finals(upcard, compositions, decks).tolist()
+            finals.update(((upcard, composition), row)
+                          for composition, row in zip(compositions, rows))
+
+    memo = {}
+    odds = [0.0] * 4
+    for chance, hard, has_ace, upcard, rest in _first_hands(decks):
+        hand = _player_odds(hard, has_ace, upcard, rest, hits, finals, memo)
+        for outcome, hand_chance in enumerate(hand):
+            odds[outcome] += chance * hand_chance
+    return HandOdds(*odds)
+
+
+def _solve_tridiagonal(lower, diagonal, upper, rhs):
+    """Solve a tridiagonal system with constant diagonals (Thomas algorithm)."""
+    size = len(rhs)
+    upper_prime = [0.0] * size
+    rhs_prime = [0.0] * size
+    for i in range(size):
+        below = lower if i else 0.0
+        pivot = diagonal - below * (upper_prime[i - 1] if i else 0.0)
+        upper_prime[i] = upper / pivot
+        rhs_prime[i] = (rhs[i] - below * (rhs_prime[i - 1] if i else 0.0)) / pivot
+    solution = [0.0] * size
+    for i in reversed(range(size)):
+        solution[i] = rhs_prime[i] - (upper_prime[i] * solution[i + 1] if i + 1 < size else 0.0)
+    return solution
+
+
+@functools.lru_cache(maxsize=None)
+def bankroll_odds(target=TARGET_MONEY, stake=STAKE, decks=1, policy=DEALER_STANDS_ON):
+    """Return the BankrollOdds of sessions played until $0 or target.
+
+    Every bankroll from 1 to target - 1 is solved. Money that steps by
+    stake only meets the bankrolls in its residue class, so each class
+    is its own chain, with ruin at or below 0 and the goal at or above
+    target.
+    """
+    hand = hand_odds(decks, policy)
+    # g_i = win g_(i+1) + (tie + bust) g_i + loss g_(i-1), and the same
+    # plus one hand for the expected length.
+    diagonal = hand.win + hand.loss
+    goal = {}
+    hands = {}
+    for first in range(1, min(stake, target - 1) + 1):
+        states = list(range(first, target, stake))
+        reaches_goal = [0.0] * len(states)
+        reaches_goal[-1] = hand.win
+        for money, chance in zip(states, _solve_tridiagonal(
+                -hand.loss, diagonal, -hand.win, reaches_goal)):
+            goal[money] = chance
+        for money, length in zip(states, _solve_tridiagonal(
+                -hand.loss, diagonal, -hand.win, [1.0] * len(states))):
+            hands[money] = length
+    return BankrollOdds(hand, target, stake, goal, hands)
+
+
+def main():
+    """Print the odds of every starting bankroll from the command line."""
+    parser = argparse.ArgumentParser(description="Exact Twenty-One bankroll odds.")
+    parser.add_argument("--target", type=int, default=TARGET_MONEY)
+    parser.add_argument("--stake", type=int, default=STAKE)
+    parser.add_argument("--decks", type=int, default=1)
+    parser.add_argument("--policy", default=str(DEALER_STANDS_ON),
+                        help='total the player hits below, or "strategy"')
+    args = parser.parse_args()
+    policy = args.policy if args.policy == "strategy" else int(args.policy)
+
+    start = time.perf_counter()
+    odds = bankroll_odds(args.target, args.stake, args.decks, policy)
+    elapsed = time.perf_counter() - start
+    print(odds.hand)
+    print(f"Solved in {elapsed * 1000:.1f} ms\n")
+    print("Start | Reach target | Ruin    | Expected hands")
+    print("------|--------------|---------|---------------")
+    for money in range(1, args.target):
+        print(f"${money:<5}| {odds.goal_probability(money):<13.5f}| "
+              f"{odds.ruin_probability(money):<8.5f}| {odds.expected_hands(money):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Shoe composition tracking and Hi-Lo card counting for Twenty-One.
+
+A ShoeTracker attached to a Deck or Shoe (or to TwentyOneGame through its
+tracker argument) is told about every card as it is dealt and every
+reshuffle. It keeps per-rank and per-value counts of the cards still to
+come and the Hi-Lo running count, all updated in O(1) per card, so count
+and composition queries never scan the shoe.
+
+The game conceals the dealer's hidden card from the tracker until it is
+revealed, so the counts only ever reflect cards a player could have seen.
+If the shoe is reshuffled while a card is concealed, that card came from
+the old shoe and is not counted into the new one when it is revealed.
+
+CountingPlayer bets nothing (the game stakes $1 a hand) but plays each
+decision from the strategy table for the tracker's current composition.
+"""
+
+from .oo_twenty_one import CARDS, Card, Player
+from .twenty_one_strategy import VALUES, add_card, card_value, composition_table
+
+# Hi-Lo tags by card value: 2-6 count +1, 7-9 count 0, tens and aces -1.
+HI_LO = {1: -1, 2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 0, 8: 0, 9: 0, 10: -1}
+
+# Per card code: rank index, value index (ace 0 ... ten 9) and Hi-Lo tag.
+_RANK_INDEX = tuple(Card.RANKS.index(card.rank) for card in CARDS)
+_VALUE_INDEX = tuple(card_value(card) - 1 for card in CARDS)
+_HI_LO_TAG = tuple(HI_LO[card_value(card)] for card in CARDS)
+
+
+class ShoeTracker:
+    """Remaining counts and the Hi-Lo count of a deck or shoe."""
+
+    def __init__(self, decks=1):
+        """Initialize the tracker for a freshly shuffled shoe of decks."""
+        self.reset(decks)
+
+    def reset(self, decks=None):
+        """Start over for a full shoe, keeping the deck count if not given."""
+        if decks is not None:
+            self.decks = decks
+        per_rank = len(Card.SUITS) * self.decks
+        self.rank_counts = [per_rank] * len(Card.RANKS)
+        self.value_counts = [0] * len(VALUES)
+        for code in range(0, len(CARDS), len(Card.SUITS)):
+            self.value_counts[_VALUE_INDEX[code]] += per_rank
+        self.total_cards = len(CARDS) * self.decks
+        self.cards_remaining = self.total_cards
+        self.running_count = 0
+        # Codes concealed since the last reset, still to be revealed
+        self.concealed = []
+
+    def deal(self, code):
+        """Count a card code leaving the shoe."""
+        self.rank_counts[_RANK_INDEX[code]] -= 1
+        self.value_counts[_VALUE_INDEX[code]] -= 1
+        self.cards_remaining -= 1
+        self.running_count += _HI_LO_TAG[code]
+
+    def conceal(self, code):
+        """Uncount a dealt card that stays face down."""
+        self.rank_counts[_RANK_INDEX[code]] += 1
+        self.value_counts[_VALUE_INDEX[code]] += 1
+        self.cards_remaining += 1
+        self.running_count -= _HI_LO_TAG[code]
+        self.concealed.append(code)
+
+    def reveal(self, code):
+        """Count a concealed card once it is turned face up.
+
+        A card concealed before the last reset is dropped instead.
+        """
+        if code in self.concealed:
+            self.concealed.remove(code)
+            self.deal(code)
+
+    def rank_remaining(self, rank):
+        """Return how many cards of a rank ('2'-'A') are left."""
+        return self.rank_counts[Card.RANKS.index(rank)]
+
+    def composition(self):
+        """Return the remaining cards per value, ace first (a cache key)."""
+        return tuple(self.value_counts)
+
+    def probability(self, value):
+        """Return the chance the next card has the given value (ace is 1)."""
+        if not self.cards_remaining:
+            return 0.0
+        return self.value_counts[value - 1] / self.cards_remaining
+
+    def decks_remaining(self):
+        """Return the number of decks left, in fractions of a deck."""
+        return self.cards_remaining / len(CARDS)
+
+    def penetration(self):
+        """Return the fraction of the shoe dealt so far."""
+        return 1 - self.cards_remaining / self.total_cards
+
+    def true_count(self):
+        """Return the running count per remaining deck."""
+        decks = self.decks_remaining()
+        return self.running_count / decks if decks else 0.0
+
+    def bet_units(self, max_units=8):
+        """Return a Hi-Lo bet in units: true count minus one, 1 to max_units."""
+        return max(1, min(max_units, int(self.true_count()) - 1))
+
+    def expected_values(self, hard, has_ace, upcard):
+        """Return (stand EV, hit EV) under the current composition.
+
+        upcard is a Card already counted by the tracker.
+        """
+        composition = add_card(self.composition(), card_value(upcard))
+        return composition_table(composition).expected_values(hard, has_ace, card_value(upcard))
+
+
+class CountingPlayer(Player):
+    """A player that hits or stays by the EV of the shoe as tracked."""
+    __slots__ = ('tracker',)
+
+    def __init__(self, tracker):
+        """Initialize the player reading a ShoeTracker."""
+        super().__init__()
+        self.tracker = tracker
+
+    def choose(self, dealer_upcard):
+        """Return 'h' or 's', whichever has the higher expected return."""
+        stand, hit = self.tracker.expected_values(self._hard_total, self._aces > 0,
+                                                  dealer_upcard)
+        return 'h' if hit > stand else 's'
@@ -0,0 +1,196 @@
+"""Vectorized Monte Carlo simulation of Twenty-One hands with NumPy.
+
+Each hand gets its own freshly shuffled 52-card deck, as in
+TwentyOneGame.start. Cards are stored as hard values (aces count 1) and a
+hand is scored like Participant.score: one ace counts 11 when that does
+not bust the hand. The player hits below stand_on, the dealer hits below
+17, and a hand pays as TwentyOneGame.hand_payout does: +1 for a win, -1
+for a loss to the dealer, and nothing for a tie or a player bust.
+
+simulate() plays batch n on rng_streams.stream(seed, n), so a run is
+reproducible for a given seed and batch size.
+
+Requires NumPy.
+"""
+
+import math
+import random
+import time
+
+import numpy as np
+
+from rng_streams import stream
+
+from .oo_twenty_one import Card, TwentyOneGame
+
+DEALER_STANDS_ON = 17
+# play_hands' outcome for a player bust, which loses the hand but pays 0.
+BUSTED = -2
+
+# One deck as hard card values: aces are 1 and promoted in _scores().
+DECK_VALUES = np.array(
+    [1 if rank == 'A' else Card.VALUES[rank] for rank in Card.RANKS for _ in Card.SUITS],
+    dtype=np.int8,
+)
+
+# Cards a single hand can use: every card but the player's and dealer's
+# last has a hard value adding up to at most 20 + 16, which takes at most
+# 15 of the lowest cards, so 17 is the true bound.
+CARDS_PER_HAND = 20
+
+
+class MonteCarloResult:
+    """Aggregate return of a batch of simulated hands.
+
+    losses counts hands lost to the dealer and busts the hands the player
+    busted, which lose without costing anything.
+    """
+
+    def __init__(self, hands=0, wins=0, ties=0, losses=0, busts=0, seconds=0.0):
+        """Initialize the result with outcome counts and timing."""
+        self.hands = hands
+        self.wins = wins
+        self.ties = ties
+        self.losses = losses
+        self.busts = busts
+        self.seconds = seconds
+
+    @property
+    def mean(self):
+        """Return the player's mean return per hand."""
+        return (self.wins - self.losses) / self.hands
+
+    @property
+    def variance(self):
+        """Return the variance of the per-hand return."""
+        return (self.wins + self.losses) / self.hands - self.mean ** 2
+
+    @property
+    def standard_error(self):
+        """Return the standard error of the mean return."""
+        return math.sqrt(self.variance / self.hands)
+
+    @property
+    def hands_per_second(self):
+        """Return the throughput of the run."""
+        return self.hands / self.seconds if self.seconds else 0.0
+
+    def z_score(self, other):
+        """Return how many standard errors apart two results' means are."""
+        spread = math.hypot(self.standard_error, other.standard_error)
+        return (self.mean - other.mean) / spread if spread else 0.0
+
+    def __str__(self):
+        """Return a one-line summary of the result."""
+        return (f"Hands: {self.hands:,}, Mean return: {self.mean:+.5f} "
+                f"(SE {self.standard_error:.5f}), Variance: {self.variance:.5f}, "
+                f"Busts: {self.busts / self.hands:.2%}, Hands/s: {self.hands_per_second:,.0f}")
+
+
+def _scores(hard, aces):
+    """Return hand scores, counting one ace as 11 when it does not bust."""
+    return np.where((aces > 0) & (hard <= 11), hard + 10, hard)
+
+
+def _draw(shoes, position, hard, aces, rows, limit):
+    """Hit the given rows until their score reaches limit or they bust."""
+    rows = rows[_scores(hard[rows], aces[rows]) < limit]
+    while rows.size:
+        cards = shoes[rows, position[rows]]
+        position[rows] += 1
+        hard[rows] += cards
+        aces[rows] += cards == 1
+        rows = rows[_scores(hard[rows], aces[rows]) < limit]
+
+
+def shuffled_decks(rng, hands, cards=CARDS_PER_HAND):
+    """Return the first cards of a fresh shuffled deck for every hand.
+
+    Runs only the first `cards` steps of a Fisher-Yates shuffle, one
+    vectorized swap per step across all hands, instead of permuting
+    whole decks.
+    """
+    decks = np.tile(DECK_VALUES, (hands, 1))
+    rows = np.arange(hands)
+    remaining = np.arange(len(DECK_VALUES), len(DECK_VALUES) - cards, -1)
+    picks = (rng.random((cards, hands)) * remaining[:, None]).astype(np.intp)
+    for step in range(cards):
+        columns = picks[step] + step
+        chosen = decks[rows, columns]
+        decks[rows, columns] = decks[:, step]
+        decks[:, step] = chosen
+    return decks[:, :cards]
+
+
+def play_hands(rng, hands, stand_on=DEALER_STANDS_ON):
+    """Play hands at once; return an int8 array of +1, 0, -1 and BUSTED outcomes."""
+    shoes = shuffled_decks(rng, hands)
+    player_hard = (shoes[:, 0] + shoes[:, 2]).astype(np.int16)
+    player_aces = (shoes[:, 0] == 1).astype(np.int8) + (shoes[:, 2] == 1)
+    dealer_hard = (shoes[:, 1] + shoes[:, 3]).astype(np.int16)
+    dealer_aces = (shoes[:, 1] == 1).astype(np.int8) + (shoes[:, 3] == 1)
+    position = np.full(hands, 4, dtype=np.intp)
+    everyone = np.arange(hands)
+
+    _draw(shoes, position, player_hard, player_aces, everyone, stand_on)
+    player = _scores(player_hard, player_aces)
+    player_busted = player > 21
+    _draw(shoes, position, dealer_hard, dealer_aces, everyone[~player_busted],
+          DEALER_STANDS_ON)
+    dealer = _scores(dealer_hard, dealer_aces)
+
+    outcomes = np.sign(player - dealer).astype(np.int8)
+    outcomes[dealer > 21] = 1
+    outcomes[player_busted] = BUSTED
+    return outcomes
+
+
+def simulate(hands, stand_on=DEALER_STANDS_ON, seed=None, batch_size=200_000):
+    """Simulate hands in NumPy batches and return a MonteCarloResult.
+
+    Without a seed the batches are streams of a fresh random root seed.
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    result = MonteCarloResult()
+    start = time.perf_counter()
+    for index, first in enumerate(range(0, hands, batch_size)):
+        batch = min(batch_size, hands - first)
+        rng = stream(seed, index).generator
+        counts = np.bincount(play_hands(rng, batch, stand_on) - BUSTED, minlength=4)
+        result.busts += int(counts[0])
+        result.losses += int(counts[1])
+        result.ties += int(counts[2])
+        result.wins += int(counts[3])
+        result.hands += batch
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def simulate_objects(hands, stand_on=DEALER_STANDS_ON, seed=None):
+    """Simulate hands with the object-based game, as a reference."""
+    game = TwentyOneGame(rng=random.Random(seed))
+    result = MonteCarloResult()
+    start = time.perf_counter()
+    for _ in range(hands):
+        game.deck.prepare_hand()
+        game.player.clear_hand()
+        game.dealer.clear_hand()
+        game.deal_cards()
+        while game.player.score() < stand_on:
+            game.player.hit(game.deck)
+        if not game.player.is_busted():
+            while game.dealer.score() < DEALER_STANDS_ON:
+                game.dealer.hit(game.deck)
+        outcome = game.hand_outcome()
+        if game.player.is_busted():
+            result.busts += 1
+        elif outcome == 1:
+            result.wins += 1
+        elif outcome == -1:
+            result.losses += 1
+        else:
+            result.ties += 1
+        result.hands += 1
+    result.seconds = time.perf_counter() - start
+    return result
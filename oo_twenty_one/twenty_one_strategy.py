@@ -0,0 +1,294 @@
+"""Precomputed dealer-outcome and hit/stay tables for Twenty-One.
+
+Cards are grouped by value: index 0 is the ace (counted 1, promoted to 11
+in scoring like Participant.score), then 2 through 9, and index 9 holds
+every ten-valued card. A shoe composition is a tuple of the counts left
+for each value.
+
+The dealer's final-total distribution for each upcard comes from an exact
+recursion over the remaining composition, memoized on (hard total, ace
+held, composition). The player's hit/stay expected values then use the
+card probabilities of the shoe minus the upcard, ignoring the depletion
+caused by the player's own cards.
+
+Tables for a full shoe are cached on disk as float32, in the user's cache
+directory (CACHE_DIR), and loaded on first use. A cache that cannot be
+read or written is skipped and the table kept in memory only. Tables for
+a partly dealt shoe, keyed by its composition, are kept
+in an in-memory LRU cache by composition_table().
+"""
+
+import functools
+import os
+import struct
+import tempfile
+from array import array
+
+from .oo_twenty_one import Card, Player
+
+DEALER_STANDS_ON = 17
+BUST = 22
+# Dealer final totals in the order used by dealer_distribution().
+DEALER_FINALS = (17, 18, 19, 20, 21, BUST)
+VALUES = tuple(range(1, 11))
+MAX_HARD_TOTAL = 21
+# A player bust loses the hand without costing money; see hand_payout().
+BUST_RETURN = 0.0
+
+
+
+def _user_cache_dir():
+    """Return the games' directory under the user's cache directory."""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "ls-py120-games")
+
+
+CACHE_DIR = _user_cache_dir()
+# Entries in a table: stand and hit values per upcard, hard total and ace.
+TABLE_SIZE = len(VALUES) * (MAX_HARD_TOTAL + 1) * 4
+_HEADER = struct.Struct("<4sBB")
+_MAGIC = b"T21S"
+_VERSION = 2
+# Dealer recursion entries kept across compositions (a few thousand each).
+DEALER_CACHE_SIZE = 1 << 18
+COMPOSITION_CACHE_SIZE = 128
+
+
+def card_value(card):
+    """Return a card's value as used by the tables: 1 for an ace."""
+    return 1 if card.rank == 'A' else Card.VALUES[card.rank]
+
+
+def full_composition(decks=1):
+    """Return the composition of a fresh shoe of the given number of decks."""
+    counts = [0] * len(VALUES)
+    for rank in Card.RANKS:
+        value = 1 if rank == 'A' else Card.VALUES[rank]
+        counts[value - 1] += len(Card.SUITS) * decks
+    return tuple(counts)
+
+
+def _score(hard, has_ace):
+    """Return a hand's score, counting one ace as 11 when it fits."""
+    return hard + 10 if has_ace and hard <= 11 else hard
+
+
+@functools.lru_cache(maxsize=DEALER_CACHE_SIZE)
+def _dealer_finals(hard, has_ace, composition):
+    """Return the dealer's final-total probabilities from a partial hand."""
+    score = _score(hard, has_ace)
+    if score >= DEALER_STANDS_ON:
+        return tuple(float(final == min(score, BUST)) for final in DEALER_FINALS)
+
+    remaining = sum(composition)
+    totals = [0.0] * len(DEALER_FINALS)
+    for index, count in enumerate(composition):
+        if not count:
+            continue
+        value = index + 1
+        drawn = composition[:index] + (count - 1,) + composition[index + 1:]
+        finals = _dealer_finals(hard + value, has_ace or value == 1, drawn)
+        probability = count / remaining
+        for final, chance in enumerate(finals):
+            totals[final] += probability * chance
+    return tuple(totals)
+
+
+def remove_card(composition, value):
+    """Return the composition with one card of the given value dealt."""
+    index = value - 1
+    if not composition[index]:
+        raise ValueError(f"No cards of value {value} left in the shoe.")
+    return composition[:index] + (composition[index] - 1,) + composition[index + 1:]
+
+
+def add_card(composition, value):
+    """Return the composition with one card of the given value put back."""
+    index = value - 1
+    return composition[:index] + (composition[index] + 1,) + composition[index + 1:]
+
+
+def dealer_distribution(upcard, composition):
+    """Return the dealer's final-total probabilities, ordered as DEALER_FINALS.
+
+    composition is the shoe before the upcard was dealt.
+    """
+    return _dealer_finals(upcard, upcard == 1, remove_card(composition, upcard))
+
+
+def stand_value(score, finals):
+    """Return the expected return of standing on score against finals."""
+    if score > MAX_HARD_TOTAL:
+        return BUST_RETURN
+    value = finals[-1]
+    for final, chance in zip(DEALER_FINALS, finals[:-1]):
+        if score > final:
+            value += chance
+        elif score < final:
+            value -= chance
+    return value
+
+
+def _player_values(upcard, composition):
+    """Return {(hard, has_ace): (stand EV, hit EV)} for one upcard."""
+    finals = dealer_distribution(upcard, composition)
+    remaining = remove_card(composition, upcard)
+    total = sum(remaining)
+    probabilities = [count / total for count in remaining]
+    values = {}
+
+    def best(hard, has_ace):
+        """Return the best expected return from a player hand."""
+        if hard > MAX_HARD_TOTAL:
+            return BUST_RETURN
+        if (hard, has_ace) not in values:
+            stand = stand_value(_score(hard, has_ace), finals)
+            hit = sum(probability * best(hard + value, has_ace or value == 1)
+                      for value, probability in zip(VALUES, probabilities) if probability)
+            values[(hard, has_ace)] = (stand, hit)
+        return max(values[(hard, has_ace)])
+
+    for hard in range(MAX_HARD_TOTAL, 1, -1):
+        for has_ace in (False, True):
+            best(hard, has_ace)
+    return values
+
+
+class StrategyTable:
+    """Stand and hit expected values for every upcard and player hand.
+
+    Entries are stored flat, indexed by upcard value (1-10), hard total
+    (0-21, aces counted 1) and whether the hand holds an ace, so every
+    query is one array lookup. Upcards with no cards left in the
+    composition keep zero entries.
+    """
+
+    def __init__(self, decks=1, values=None, composition=None):
+        """Initialize the table, computing it when values are not given.
+
+        The table is for a full shoe of the given decks unless a
+        composition is given; decks is then 0.
+        """
+        self.decks = 0 if composition is not None else decks
+        self.composition = composition or full_composition(decks)
+        self.values = values if values is not None else self._compute(self.composition)
+
+    @staticmethod
+    def _index(upcard, hard, has_ace):
+        """Return the offset of an entry's stand value."""
+        return (((upcard - 1) * (MAX_HARD_TOTAL + 1) + hard) * 2 + bool(has_ace)) * 2
+
+    @classmethod
+    def _compute(cls, composition):
+        """Return the flat value array for a shoe composition."""
+        values = array('f', [0.0]) * TABLE_SIZE
+        for upcard in VALUES:
+            if not composition[upcard - 1]:
+                continue
+            for (hard, has_ace), (stand, hit) in _player_values(upcard, composition).items():
+                index = cls._index(upcard, hard, has_ace)
+                values[index] = stand
+                values[index + 1] = hit
+        return values
+
+    def expected_values(self, hard, has_ace, upcard):
+        """Return (stand EV, hit EV) for a hand against an upcard value."""
+        index = self._index(upcard, hard, has_ace)
+        return self.values[index], self.values[index + 1]
+
+    def should_hit(self, hard, has_ace, upcard):
+        """Check if hitting has the higher expected return."""
+        index = self._index(upcard, hard, has_ace)
+        return hard <= MAX_HARD_TOTAL and self.values[index + 1] > self.values[index]
+
+    def save(self, path):
+        """Write the table to a compact binary file.
+
+        The file is written under a temporary name and then renamed, so
+        an interrupted save never leaves a partial table at path.
+        """
+        header = _HEADER.pack(_MAGIC, _VERSION, self.decks)
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                                                 suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(header)
+                self.values.tofile(file)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """Read a table written by save()."""
+        with open(path, "rb") as file:
+            magic, version, decks = _HEADER.unpack(file.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not a strategy table.")
+            data = file.read()
+        if len(data) != TABLE_SIZE * array('f').itemsize:
+            raise ValueError(f"{path} does not hold a whole strategy table.")
+        return cls(decks, array('f', data))
+
+
+_tables = {}
+
+
+def strategy_table(decks=1, cache_dir=CACHE_DIR):
+    """Return the strategy table for a shoe of the given decks.
+
+    Tables are loaded from cache_dir on first use, or computed and written
+    there if missing. Pass cache_dir=None to skip the disk cache. A cache
+    file that cannot be read, or a directory that cannot be written, only
+    costs the computation.
+    """
+    if decks not in _tables:
+        path = cache_dir and os.path.join(cache_dir, f"strategy_{decks}deck.bin")
+        try:
+            table = StrategyTable.load(path) if path else None
+        except (OSError, ValueError, struct.error):
+            table = None
+        if table is not None and table.decks != decks:
+            table = None
+        if table is None:
+            table = StrategyTable(decks)
+            if path:
+                try:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    table.save(path)
+                except (OSError, struct.error):
+                    pass  # Keep the table in memory only
+        _tables[decks] = table
+    return _tables[decks]
+
+
+@functools.lru_cache(maxsize=COMPOSITION_CACHE_SIZE)
+def composition_table(composition):
+    """Return the strategy table for a shoe composition.
+
+    composition is the shoe as the player sees it before the dealer's
+    upcard. The most recently used tables are kept, evicting the least
+    recently used past COMPOSITION_CACHE_SIZE.
+    """
+    return StrategyTable(composition=tuple(composition))
+
+
+class StrategyPlayer(Player):
+    """A player that hits or stays by the precomputed strategy table."""
+    __slots__ = ('decks',)
+
+    def __init__(self, decks=1):
+        """Initialize the player for a shoe of the given decks."""
+        super().__init__()
+        self.decks = decks
+
+    def choose(self, dealer_upcard):
+        """Return 'h' or 's' from the strategy table."""
+        table = strategy_table(self.decks)
+        if table.should_hit(self._hard_total, self._aces > 0, card_value(dealer_upcard)):
+            return 'h'
+        return 's'
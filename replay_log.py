@@ -0,0 +1,377 @@
+"""Compact binary replay log shared by the three games.
+
+A log file starts with a 5-byte header and then holds games back to back.
+Each game is a GAME record, a body and an END byte:
+
+    GAME   0xF0, game id, flags, seed (8 bytes, little-endian);
+           flags bit 0 is set when the seed is known, bit 1 when the
+           seed is not an unsigned 64-bit int and seed_hash(seed) is
+           stored in its place
+    ROUND  0xF1, starts a TTT round or a Twenty-One hand
+    END    0xF2
+
+Body bytes below 0xF0 depend on the game:
+
+    ttt         one byte per move: the square (1-9), plus 0x10 when the
+                computer made it
+    twenty-one  one byte per card: the card code (0-51), plus 0x40 when it
+                went to the dealer; a hand is logged once it is settled
+    rps         one byte per round: the human's move in bits 2-3 and the
+                computer's in bits 0-1, as indexes into Player.CHOICES
+
+Games take a ReplayWriter as their replay argument. Writes are buffered
+and the file is only ever appended to. The replayer memory-maps the file
+and scores each game from its bytes alone, without the game classes.
+
+Run from the repository root:
+    python replay_log.py stats games.log
+    python replay_log.py bench --games 20000
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import random
+import struct
+import tempfile
+import time
+
+from game_ids import GAME_IDS, GAME_NAMES
+
+GAME, ROUND, END = 0xF0, 0xF1, 0xF2
+SEED_KNOWN = 0x01
+SEED_HASHED = 0x02
+COMPUTER_MOVE = 0x10
+DEALER_CARD = 0x40
+
+_HEADER = struct.Struct("<4sB")
+_MAGIC = b"GRPL"
+_VERSION = 1
+_GAME_RECORD = struct.Struct("<BBBQ")
+_SEED_LIMIT = 1 << 64
+
+# Card values by card code (rank index * 4 + suit index), aces as 1.
+_CARD_VALUES = bytes(min(rank + 2, 10) if rank < 12 else 1 for rank in range(13) for _ in range(4))
+_TTT_LINES = (0b000000111, 0b000111000, 0b111000000, 0b001001001,
+              0b010010010, 0b100100100, 0b100010001, 0b001010100)
+STARTING_MONEY = 5
+GOAL_MONEY = 10
+
+
+def seed_hash(seed):
+    """Return the 64-bit number logged for a seed that does not fit the record.
+
+    random.Random accepts negative and very large ints, strings, bytes and
+    floats as seeds; those are logged as a hash of the seed's type and repr.
+    """
+    digest = hashlib.blake2b(f"{type(seed).__name__}:{seed!r}".encode(), digest_size=8)
+    return int.from_bytes(digest.digest(), "little")
+
+
+class ReplayWriter:
+    """Appends game events to a replay log through an in-memory buffer."""
+
+    def __init__(self, path, buffer_size=65536):
+        """Open path for appending, writing the header if the file is new."""
+        self._file = open(path, "ab")
+        self._buffer = bytearray()
+        self.buffer_size = buffer_size
+        if self._file.tell() == 0:
+            self._buffer += _HEADER.pack(_MAGIC, _VERSION)
+
+    def _append(self, data):
+        """Buffer bytes, writing them out once the buffer is full."""
+        self._buffer += data
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def start_game(self, game, seed=None):
+        """Record the start of a game, with the seed of its RNG if known."""
+        if seed is None:
+            flags, value = 0, 0
+        elif type(seed) is int and 0 <= seed < _SEED_LIMIT:
+            flags, value = SEED_KNOWN, seed
+        else:
+            flags, value = SEED_KNOWN | SEED_HASHED, seed_hash(seed)
+        self._append(_GAME_RECORD.pack(GAME, GAME_IDS[game], flags, value))
+
+    def start_round(self):
+        """Record the start of a TTT round or a Twenty-One hand."""
+        self._append(bytes((ROUND,)))
+
+    def ttt_move(self, square, by_computer):
+        """Record a TTT move."""
+        self._append(bytes((square | COMPUTER_MOVE if by_computer else square,)))
+
+    def twenty_one_hand(self, player_codes, dealer_codes):
+        """Record a settled Twenty-One hand from both sides' card codes."""
+        self._append(bytes((ROUND, *player_codes, *(code | DEALER_CARD for code in dealer_codes))))
+
+    def rps_round(self, human_index, computer_index):
+        """Record an RPS round from both moves' indexes."""
+        self._append(bytes((human_index << 2 | computer_index,)))
+
+    def end_game(self):
+        """Record the end of a game."""
+        self._append(bytes((END,)))
+
+    def flush(self):
+        """Write the buffered bytes to the file."""
+        if self._buffer:
+            self._file.write(self._buffer)
+            self._buffer.clear()
+        self._file.flush()
+
+    def close(self):
+        """Flush and close the log."""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class GameSummary:
+    """A replayed game's result.
+
+    For ttt, wins/losses/ties are rounds won by the human, won by the
+    computer and drawn. For twenty-one they are hands, and money is the
+    player's final bankroll. For rps they are rounds. When seed_hashed is
+    set, seed is seed_hash() of the game's seed rather than the seed itself.
+    """
+    __slots__ = ("game", "seed", "seed_hashed", "wins", "losses", "ties", "unfinished", "money", "events")
+
+    def __init__(self, game, seed, seed_hashed=False):
+        """Initialize an empty summary."""
+        self.game = game
+        self.seed = seed
+        self.seed_hashed = seed_hashed
+        self.wins = 0
+        self.losses = 0
+        self.ties = 0
+        self.unfinished = 0
+        self.money = STARTING_MONEY if game == "twenty-one" else None
+        self.events = 0
+
+    def __repr__(self):
+        return (f"GameSummary({self.game!r}, wins={self.wins}, losses={self.losses}, "
+                f"ties={self.ties}, money={self.money})")
+
+
+def _score_ttt(summary, body):
+    """Score every round of a TTT game body."""
+    for moves in body.split(bytes((ROUND,)))[1:]:
+        human = computer = 0
+        for move in moves:
+            if move & COMPUTER_MOVE:
+                computer |= 1 << ((move ^ COMPUTER_MOVE) - 1)
+            else:
+                human |= 1 << (move - 1)
+        if any(human & line == line for line in _TTT_LINES):
+            summary.wins += 1
+        elif any(computer & line == line for line in _TTT_LINES):
+            summary.losses += 1
+        elif len(moves) == 9:
+            summary.ties += 1
+        else:
+            summary.unfinished += 1
+
+
+def _hand_score(hard, aces):
+    """Return a hand's score, counting one ace as 11 when it fits."""
+    return hard + 10 if aces and hard <= 11 else hard
+
+
+def _score_twenty_one(summary, body):
+    """Score every hand of a Twenty-One game body."""
+    values = _CARD_VALUES
+    for cards in body.split(bytes((ROUND,)))[1:]:
+        player = dealer = player_aces = dealer_aces = 0
+        for card in cards:
+            if card & DEALER_CARD:
+                value = values[card ^ DEALER_CARD]
+                dealer += value
+                dealer_aces += value == 1
+            else:
+                value = values[card]
+                player += value
+                player_aces += value == 1
+        player = _hand_score(player, player_aces)
+        dealer = _hand_score(dealer, dealer_aces)
+        if player > 21:
+            # A bust loses the hand but not the player's dollar.
+            summary.losses += 1
+        elif dealer <= 21 and player < dealer:
+            summary.losses += 1
+            summary.money -= 1
+        elif dealer > 21 or player > dealer:
+            summary.wins += 1
+            summary.money += 1
+        else:
+            summary.ties += 1
+
+
+def _score_rps(summary, body):
+    """Score every round of an RPS game body."""
+    for human in range(3):
+        for computer in range(3):
+            count = body.count(human << 2 | computer)
+            outcome = (human - computer) % 3
+            if outcome == 0:
+                summary.ties += count
+            elif outcome == 1:
+                summary.wins += count
+            else:
+                summary.losses += count
+
+
+_SCORERS = {"ttt": _score_ttt, "twenty-one": _score_twenty_one, "rps": _score_rps}
+
+
+def replay(path):
+    """Yield a GameSummary for every game in a replay log.
+
+    A game cut off before its END byte (a crash or a dropped connection)
+    is scored up to where it stops.
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, version = _HEADER.unpack_from(data)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not a replay log.")
+            position = _HEADER.size
+            size = len(data)
+            while position < size:
+                tag, game_id, flags, seed = _GAME_RECORD.unpack_from(data, position)
+                if tag != GAME:
+                    raise ValueError(f"Expected a game record at byte {position} of {path}.")
+                summary = GameSummary(GAME_NAMES[game_id], seed if flags & SEED_KNOWN else None,
+                                      bool(flags & SEED_HASHED))
+                start = position + _GAME_RECORD.size
+                # Body bytes are all below GAME and END, so the first of
+                # either marks where the body stops.
+                end = data.find(bytes((END,)), start)
+                following = data.find(bytes((GAME,)), start)
+                if end == -1 or following != -1 and following < end:
+                    end = size if following == -1 else following
+                    position = end
+                else:
+                    position = end + 1
+                body = data[start:end]
+                summary.events = len(body)
+                _SCORERS[summary.game](summary, body)
+                yield summary
+
+
+def aggregate(path):
+    """Return {game: totals dict} over every game in a replay log."""
+    totals = {}
+    for summary in replay(path):
+        total = totals.setdefault(summary.game, {
+            "games": 0, "wins": 0, "losses": 0, "ties": 0, "unfinished": 0, "events": 0,
+        })
+        total["games"] += 1
+        total["wins"] += summary.wins
+        total["losses"] += summary.losses
+        total["ties"] += summary.ties
+        total["unfinished"] += summary.unfinished
+        total["events"] += summary.events
+        if summary.money is not None:
+            total["reached_goal"] = total.get("reached_goal", 0) + (summary.money >= GOAL_MONEY)
+            total["went_broke"] = total.get("went_broke", 0) + (summary.money <= 0)
+    return totals
+
+
+def display_stats(totals):
+    """Print aggregate stats per game."""
+    for game, total in totals.items():
+        line = (f"{game:<11} games: {total['games']:<8,} events: {total['events']:<11,} "
+                f"wins: {total['wins']:<9,} losses: {total['losses']:<9,} "
+                f"ties: {total['ties']:<9,}")
+        if "reached_goal" in total:
+            line += f" reached ${GOAL_MONEY}: {total['reached_goal']:,} broke: {total['went_broke']:,}"
+        print(line)
+
+
+def write_sample_log(path, games, seed=0):
+    """Play games headlessly with every game logging to path.
+
+    Each game gets its own seed, and the scripted human draws from the
+    game's RNG too, so any logged game can be replayed from its seed.
+    """
+    # pylint: disable=import-outside-toplevel
+    from game_io import NullRenderer
+    from oo_ttt_game.oo_ttt_game import TTTGame
+    from oo_twenty_one.oo_twenty_one import TwentyOneGame
+    from rps_game.oop_rps import Player, RPSGame
+
+    seeds = random.Random(seed)
+    writer = ReplayWriter(path)
+    try:
+        for _ in range(games):
+            ttt = TTTGame(difficulty="normal", max_score=3, renderer=NullRenderer(), replay=writer,
+                          seed=seeds.getrandbits(63))
+            ttt.begin()
+            while not ttt.finished:
+                if ttt.state == "human_move":
+                    ttt.handle(str(ttt.rng.choice(ttt.board.unused_squares())))
+                else:
+                    ttt.handle("y")
+
+            twenty_one = TwentyOneGame(renderer=NullRenderer(), replay=writer,
+                                       seed=seeds.getrandbits(63))
+            twenty_one.begin()
+            while not twenty_one.finished:
+                if twenty_one.state == "player_turn":
+                    twenty_one.handle('h' if twenty_one.player.score() < 15 else 's')
+                else:
+                    twenty_one.handle('y')
+
+            rps = RPSGame(renderer=NullRenderer(), replay=writer, seed=seeds.getrandbits(63))
+            rps.begin()
+            while not rps.finished:
+                if rps.state == 'move':
+                    rps.handle(rps.rng.choice(Player.CHOICES))
+                else:
+                    rps.handle('no' if rps.is_game_over() else 'yes')
+    finally:
+        writer.close()
+
+
+def main():
+    """Print stats for a replay log, or time the replayer on a sample log."""
+    parser = argparse.ArgumentParser(description="Replay log tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    stats_parser = commands.add_parser("stats", help="print aggregate stats for a log")
+    stats_parser.add_argument("path")
+    bench_parser = commands.add_parser("bench", help="time the replayer on a sample log")
+    bench_parser.add_argument("--games", type=int, default=20000,
+                              help="games of each kind to play into the sample log")
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        start = time.perf_counter()
+        totals = aggregate(args.path)
+        elapsed = time.perf_counter() - start
+        display_stats(totals)
+        events = sum(total["events"] for total in totals.values())
+        print(f"\n{events:,} events in {elapsed:.2f} s ({events / elapsed:,.0f} events/s)")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sample.log")
+        start = time.perf_counter()
+        write_sample_log(path, args.games)
+        print(f"Played and logged {3 * args.games:,} games in {time.perf_counter() - start:.2f} s"
+              f" ({os.path.getsize(path):,} bytes)")
+        start = time.perf_counter()
+        totals = aggregate(path)
+        elapsed = time.perf_counter() - start
+        display_stats(totals)
+        events = sum(total["events"] for total in totals.values())
+        print(f"\nReplayed {events:,} events in {elapsed:.3f} s ({events / elapsed:,.0f} events/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+"""SQLite results store shared by the three games.
+
+Games take a ResultsStore as their results argument and record every
+finished TTT round, Twenty-One hand and RPS round: the game, the player,
+the outcome for the player (1 win, 0 tie, -1 loss) and, for Twenty-One,
+the bankroll after the hand.
+
+record() only appends the result to a deque. A background writer thread
+owns its own connection, wakes every flush_interval seconds, takes
+whatever results have queued up and writes them batch_size at a time,
+one transaction per batch, so the game loop never waits on the disk and
+a busy store commits large batches. The same transaction adds the
+batch's totals to the standings table, one row per player and game,
+indexed by wins and by win rate, which answers leaderboard and win-rate
+questions without scanning the results. The results table keeps every
+result and is indexed by player and game for a player's recent history.
+
+The database runs in WAL mode, so queries from the game's thread read
+the committed results while the writer appends.
+
+The terminal games keep their results when the environment asks:
+    GAMES_RESULTS=results.db     the database to record into
+    GAMES_PLAYER=alice           the player's name (the login name by default)
+
+Run from the repository root:
+    python results_store.py leaderboard results.db --game ttt
+    python results_store.py player results.db alice
+    python results_store.py bench --rows 20000000
+"""
+
+import argparse
+import collections
+import contextlib
+import getpass
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from game_ids import GAME_IDS, GAME_NAMES
+from game_io import NullRenderer, autoplay
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    game INTEGER NOT NULL,
+    player INTEGER NOT NULL REFERENCES players (id),
+    outcome INTEGER NOT NULL,
+    money INTEGER,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_by_player ON results (player, game);
+CREATE TABLE IF NOT EXISTS standings (
+    player INTEGER NOT NULL REFERENCES players (id),
+    game INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    ties INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    PRIMARY KEY (player, game)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS standings_by_wins ON standings (game, wins);
+CREATE INDEX IF NOT EXISTS standings_by_win_rate
+    ON standings (game, CAST(wins AS REAL) / (wins + ties + losses), wins);
+"""
+_INSERT_RESULT = ("INSERT INTO results (game, player, outcome, money, played_at) "
+                  "VALUES (?, ?, ?, ?, ?)")
+_ADD_STANDINGS = """
+INSERT INTO standings (player, game, wins, ties, losses) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (player, game) DO UPDATE SET
+    wins = wins + excluded.wins,
+    ties = ties + excluded.ties,
+    losses = losses + excluded.losses
+"""
+# Leaderboard orders; win_rate ranks by wins per result played.
+_ORDERS = {
+    "wins": "wins DESC",
+    "win_rate": "CAST(wins AS REAL) / (wins + ties + losses) DESC, wins DESC",
+}
+# Standing columns by outcome.
+_COLUMNS = {1: 0, 0: 1, -1: 2}
+# Queued after the results to stop the writer.
+_STOP = object()
+
+
+def _connect(path):
+    """Open path with the store's pragmas."""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    # Rows go into the results index at random places, so every batch
+    # dirties pages all over it: give it 64 MiB of cache and let 64 MiB of
+    # WAL build up before a checkpoint writes the pages back.
+    connection.execute("PRAGMA cache_size = -65536")
+    connection.execute("PRAGMA wal_autocheckpoint = 16384")
+    return connection
+
+
+class ResultsStore:
+    """Records game results through a background writer thread."""
+
+    def __init__(self, path, player=None, batch_size=100_000, flush_interval=0.1):
+        """Open or create the store at path and start its writer.
+
+        player is the name recorded when record() is not given one (the
+        login name by default). A transaction holds at most batch_size
+        results, and results wait at most about flush_interval seconds
+        before the writer picks them up.
+        """
+        self.path = path
+        self.player = player or getpass.getuser()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.connection = _connect(path)
+        self.connection.executescript(_SCHEMA)
+        self.connection.commit()
+        self.written = 0
+        self.transactions = 0
+        self._error = None
+        # Results, and the markers flush() and close() wait on.
+        self._pending = collections.deque()
+        self._wake = threading.Event()
+        self._writer = threading.Thread(target=self._write_loop, name="results-writer",
+                                        daemon=True)
+        self._writer.start()
+
+    def record(self, game, outcome, money=None, player=None):
+        """Queue one result; outcome is 1, 0 or -1 for the player."""
+        self._pending.append((GAME_IDS[game], player or self.player, outcome, money, time.time()))
+
+    def flush(self):
+        """Wait until every queued result is committed."""
+        if self._writer.is_alive():
+            committed = threading.Event()
+            self._pending.append(committed)
+            self._wake.set()
+            # The writer may stop before it reaches the marker.
+            while not committed.wait(self.flush_interval) and self._writer.is_alive():
+                pass
+        self._raise_writer_error()
+
+    def close(self):
+        """Commit the queued results and stop the writer."""
+        if self._writer.is_alive():
+            self._pending.append(_STOP)
+            self._wake.set()
+            self._writer.join()
+        self.connection.close()
+        self._raise_writer_error()
+
+    def __enter__(self):
+        """Return the store for a with block."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the store at the end of a with block."""
+        self.close()
+
+    def _raise_writer_error(self):
+        """Re-raise an error that stopped the writer thread."""
+        if self._error is not None:
+            raise RuntimeError("The results writer failed.") from self._error
+
+    def _write_loop(self):
+        """Commit queued results in batches until stopped."""
+        try:
+            connection = _connect(self.path)
+            player_ids = dict(connection.execute("SELECT name, id FROM players"))
+        except Exception as error:  # pylint: disable=broad-except
+            # The writer stops before writing anything; flush() and close() raise.
+            self._error = error
+            return
+        pending = self._pending
+        try:
+            while True:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                while pending:
+                    batch = []
+                    marker = None
+                    while pending and len(batch) < self.batch_size:
+                        item = pending.popleft()
+                        if item.__class__ is not tuple:
+                            marker = item
+                            break
+                        batch.append(item)
+                    if batch and self._error is None:
+                        try:
+                            self._write_batch(connection, batch, player_ids)
+                        except Exception as error:  # pylint: disable=broad-except
+                            # Later results are dropped; flush() and close() raise.
+                            self._error = error
+                    if marker is _STOP:
+                        return
+                    if marker is not None:
+                        marker.set()
+        finally:
+            connection.close()
+
+    def _write_batch(self, connection, batch, player_ids):
+        """Insert a batch and add its totals to the standings in one transaction."""
+        rows = []
+        totals = {}
+        with connection:
+            for game, name, outcome, money, played_at in batch:
+                player = player_ids.get(name)
+                if player is None:
+                    # Another process may have added the player since.
+                    connection.execute("INSERT OR IGNORE INTO players (name) VALUES (?)",
+                                       (name,))
+                    player = connection.execute("SELECT id FROM players WHERE name = ?",
+                                                (name,)).fetchone()[0]
+                    player_ids[name] = player
+                rows.append((game, player, outcome, money, played_at))
+                counts = totals.get((player, game))
+                if counts is None:
+                    counts = totals[player, game] = [0, 0, 0]
+                counts[_COLUMNS[outcome]] += 1
+            connection.executemany(_INSERT_RESULT, rows)
+            connection.executemany(_ADD_STANDINGS, [(player, game, *counts) for
+                                                    (player, game), counts in totals.items()])
+        self.written += len(rows)
+        self.transactions += 1
+
+    def leaderboard(self, game, limit=10, order="wins", min_results=1):
+        """Return [(name, wins, ties, losses), ...] for a game's best players."""
+        return self.connection.execute(
+            "SELECT name, wins, ties, losses FROM standings "
+            "JOIN players ON players.id = standings.player "
+            "WHERE game = ? AND wins + ties + losses >= ? "
+            f"ORDER BY {_ORDERS[order]} LIMIT ?",
+            (GAME_IDS[game], min_results, limit)).fetchall()
+
+    def standings(self, player=None):
+        """Return {game: (wins, ties, losses)} for a player."""
+        rows = self.connection.execute(
+            "SELECT game, wins, ties, losses FROM standings "
+            "WHERE player = (SELECT id FROM players WHERE name = ?)",
+            (player or self.player,))
+        return {GAME_NAMES[game]: tuple(counts) for game, *counts in rows}
+
+    def win_rate(self, player=None, game=None):
+        """Return the share of a player's results that were wins, or None."""
+        standings = self.standings(player)
+        if game is not None:
+            standings = {game: standings[game]} if game in standings else {}
+        played = sum(sum(counts) for counts in standings.values())
+        if not played:
+            return None
+        return sum(wins for wins, _, _ in standings.values()) / played
+
+    def recent(self, game, player=None, limit=10):
+        """Return a player's last (outcome, money, played_at) results in a game."""
+        return self.connection.execute(
+            "SELECT outcome, money, played_at FROM results "
+            "WHERE player = (SELECT id FROM players WHERE name = ?) AND game = ? "
+            "ORDER BY id DESC LIMIT ?",
+            (player or self.player, GAME_IDS[game], limit)).fetchall()
+
+
+@contextlib.contextmanager
+def results_from_environment(environ=os.environ):
+    """Yield a ResultsStore as GAMES_RESULTS/GAMES_PLAYER ask, or None; close it after."""
+    path = environ.get("GAMES_RESULTS")
+    if not path:
+        yield None
+        return
+    with ResultsStore(path, player=environ.get("GAMES_PLAYER")) as store:
+        yield store
+
+
+class _Counter:
+    """A stand-in store that only counts results."""
+
+    def __init__(self):
+        """Initialize the count at zero."""
+        self.count = 0
+
+    def record(self, game, outcome, money=None, player=None):
+        """Count one result."""
+        self.count += 1
+
+
+# The benchmark plays real games; each game's module loads when it runs.
+# pylint: disable=import-outside-toplevel
+def _simulated_games(results, seed):
+    """Yield headless games recording into results, cycling through the three."""
+    from oo_ttt_game.oo_ttt_game import TTTGame
+    from oo_twenty_one.oo_twenty_one import TwentyOneGame
+    from oo_twenty_one.twenty_one_strategy import StrategyPlayer
+    from rps_game.oop_rps import RPSGame
+
+    rng = random.Random(seed)
+    while True:
+        yield autoplay(TTTGame(difficulty="normal", max_score=3, renderer=NullRenderer(),
+                               results=results, seed=rng.getrandbits(32)),
+                       lambda game: (str(game.board.unused_squares()[0])
+                                     if game.state == "human_move" else "y"))
+        yield autoplay(TwentyOneGame(player=StrategyPlayer(), renderer=NullRenderer(),
+                                     results=results, seed=rng.getrandbits(32)),
+                       lambda game: "y")
+        yield autoplay(RPSGame(renderer=NullRenderer(), results=results,
+                               seed=rng.getrandbits(32)),
+                       lambda game: (rng.choice(("rock", "paper", "scissors")) if game.state == "move"
+                                     else "no" if game.is_game_over() else "yes"))
+
+
+def bench_games(path, seconds=2.0):
+    """Report game results per second with and without a store recording them."""
+    print("Store    | Games/s | Results/s | Game loop us/result")
+    print("---------|---------|-----------|--------------------")
+    for label in ("none", "sqlite"):
+        store = ResultsStore(path, player="simulation") if label == "sqlite" else None
+        counter = _Counter()
+        games = 0
+        start = time.perf_counter()
+        for _ in _simulated_games(store or counter, seed=0):
+            games += 1
+            if time.perf_counter() - start >= seconds:
+                break
+        elapsed = time.perf_counter() - start
+        if store is not None:
+            store.flush()
+            recorded = store.written
+            store.close()
+        else:
+            recorded = counter.count
+        print(f"{label:<9}| {games / elapsed:<8,.0f}| {recorded / elapsed:<10,.0f}| "
+              f"{elapsed / recorded * 1e6:.1f}")
+
+
+def bench_inserts(path, rows, players, batch_size):
+    """Report results per second when recording rows results as fast as possible."""
+    rng = random.Random(1)
+    names = [f"player{index}" for index in range(players)]
+    games = list(GAME_IDS)
+    outcomes = (1, 0, -1)
+    store = ResultsStore(path, batch_size=batch_size)
+    start = time.perf_counter()
+    for done in range(0, rows, batch_size):
+        # Wait for the writer every batch, as a long simulation keeping up would.
+        store.flush()
+        for _ in range(min(batch_size, rows - done)):
+            game = games[int(rng.random() * 3)]
+            store.record(game, outcomes[int(rng.random() * 3)],
+                         int(rng.random() * 10) if game == "twenty-one" else None,
+                         names[int(rng.random() * players)])
+    store.flush()
+    elapsed = time.perf_counter() - start
+    print(f"Inserted {store.written:,} results in {store.transactions:,} transactions: "
+          f"{elapsed:.1f} s ({store.written / elapsed:,.0f} results/s)")
+    store.close()
+
+
+def bench_queries(path, players, samples=200):
+    """Report the latency of each query over the store at path."""
+    store = ResultsStore(path)
+    total = store.connection.execute("SELECT max(id) FROM results").fetchone()[0] or 0
+    rng = random.Random(2)
+    queries = {
+        "leaderboard wins": lambda: store.leaderboard(rng.choice(list(GAME_IDS))),
+        "leaderboard win_rate": lambda: store.leaderboard(rng.choice(list(GAME_IDS)),
+                                                          order="win_rate", min_results=10),
+        "standings": lambda: store.standings(f"player{rng.randrange(players)}"),
+        "win_rate": lambda: store.win_rate(f"player{rng.randrange(players)}", "ttt"),
+        "recent 10": lambda: store.recent("rps", f"player{rng.randrange(players)}"),
+    }
+    print(f"\nQuery latency over {total:,} results and {players:,} players")
+    print("Query                | Median us | p99 us")
+    print("---------------------|-----------|--------")
+    for name, query in queries.items():
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            query()
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"{name:<21}| {statistics.median(timings) * 1e6:<10,.0f}| "
+              f"{timings[int(len(timings) * 0.99) - 1] * 1e6:,.0f}")
+    store.close()
+
+
+def main():
+    """Query the store or benchmark it from the command line."""
+    parser = argparse.ArgumentParser(description="Game results stored in SQLite.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    leaders_parser = commands.add_parser("leaderboard", help="show a game's best players")
+    leaders_parser.add_argument("path")
+    leaders_parser.add_argument("--game", choices=list(GAME_IDS), default="ttt")
+    leaders_parser.add_argument("--order", choices=list(_ORDERS), default="wins")
+    leaders_parser.add_argument("--limit", type=int, default=10)
+    player_parser = commands.add_parser("player", help="show a player's standings")
+    player_parser.add_argument("path")
+    player_parser.add_argument("name")
+    bench_parser = commands.add_parser("bench", help="time inserts and queries")
+    bench_parser.add_argument("--path", help="database to fill (default: a temporary file)")
+    bench_parser.add_argument("--rows", type=int, default=2_000_000)
+    bench_parser.add_argument("--players", type=int, default=10_000)
+    bench_parser.add_argument("--batch-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    if args.command == "leaderboard":
+        with ResultsStore(args.path) as store:
+            print(f"{'Player':<20} {'Wins':>8} {'Ties':>8} {'Losses':>8} {'Win rate':>9}")
+            for name, wins, ties, losses in store.leaderboard(args.game, args.limit, args.order):
+                print(f"{name:<20} {wins:>8,} {ties:>8,} {losses:>8,} "
+                      f"{wins / (wins + ties + losses):>9.1%}")
+        return
+
+    if args.command == "player":
+        with ResultsStore(args.path) as store:
+            print(f"{'Game':<12} {'Wins':>8} {'Ties':>8} {'Losses':>8}")
+            for game, (wins, ties, losses) in sorted(store.standings(args.name).items()):
+                print(f"{game:<12} {wins:>8,} {ties:>8,} {losses:>8,}")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.path or os.path.join(directory, "results.db")
+        bench_games(os.path.join(directory, "games.db"))
+        print()
+        bench_inserts(path, args.rows, args.players, args.batch_size)
+        bench_queries(path, args.players)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Reproducible, splittable random streams for the games.
+
+BlockRNG offers the part of random.Random the games use (random,
+randrange, choice, shuffle) on top of a NumPy PCG64 generator. Uniform
+draws are generated a block at a time, so a shuffle or a computer move
+costs a list lookup per number instead of a call into the generator.
+
+Streams for parallel work come from a root seed through NumPy's
+SeedSequence: stream_seed(root_seed, n) is the 64-bit seed of child n,
+the same child SeedSequence.spawn() would hand out. Worker n therefore
+draws the same numbers for a given root seed however many workers run
+and in whatever order they finish, and its seed is what the replay log
+records.
+
+Requires NumPy.
+
+Run from the repository root: python rng_streams.py twenty-one --workers 4 --games 5000
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from game_io import NullRenderer, autoplay
+from oo_ttt_game.oo_ttt_game import TTTGame
+from oo_twenty_one.oo_twenty_one import TwentyOneGame
+from rps_game.oop_rps import Player, RPSGame
+
+BLOCK_SIZE = 4096
+
+
+class BlockRNG:
+    """random.Random-style draws served from pre-generated NumPy blocks."""
+
+    def __init__(self, seed=None, block_size=BLOCK_SIZE):
+        """Initialize the stream from a seed (an int or a SeedSequence)."""
+        self.seed = seed
+        self.generator = np.random.Generator(np.random.PCG64(seed))
+        self.block_size = block_size
+        self._block = []
+        self._position = 0
+
+    def _take(self, count):
+        """Return the next count uniform floats in [0, 1)."""
+        end = self._position + count
+        if end > len(self._block):
+            rest = self._block[self._position:]
+            size = max(self.block_size, count - len(rest))
+            self._block = rest + self.generator.random(size).tolist()
+            self._position, end = 0, count
+        draws = self._block[self._position:end]
+        self._position = end
+        return draws
+
+    def random(self):
+        """Return the next uniform float in [0, 1)."""
+        if self._position == len(self._block):
+            self._block = self.generator.random(self.block_size).tolist()
+            self._position = 0
+        value = self._block[self._position]
+        self._position += 1
+        return value
+
+    def randrange(self, stop):
+        """Return a random integer in range(stop)."""
+        return int(self.random() * stop)
+
+    def choice(self, sequence):
+        """Return a random element of a non-empty sequence."""
+        return sequence[int(self.random() * len(sequence))]
+
+    def shuffle(self, items):
+        """Shuffle a mutable sequence in place (Fisher-Yates)."""
+        last = len(items) - 1
+        for index, draw in zip(range(last, 0, -1), self._take(last)):
+            other = int(draw * (index + 1))
+            items[index], items[other] = items[other], items[index]
+
+
+def stream_seed(root_seed, index):
+    """Return the 64-bit seed of stream index under root_seed."""
+    child = np.random.SeedSequence(root_seed, spawn_key=(index,))
+    return int(child.generate_state(1, np.uint64)[0])
+
+
+def stream(root_seed, index, block_size=BLOCK_SIZE):
+    """Return the BlockRNG for stream index under root_seed."""
+    return BlockRNG(stream_seed(root_seed, index), block_size)
+
+
+def _ttt_answer(game):
+    """Play a random open square and always play again."""
+    if game.state == "human_move":
+        return str(game.rng.choice(game.board.unused_squares()))
+    return "y"
+
+
+def _twenty_one_answer(game):
+    """Hit below 15 and always play again."""
+    if game.state == "player_turn":
+        return 'h' if game.player.score() < 15 else 's'
+    return 'y'
+
+
+def _rps_answer(game):
+    """Play a random move and stop once someone reaches the max score."""
+    if game.state == 'move':
+        return game.rng.choice(Player.CHOICES)
+    return 'no' if game.is_game_over() else 'yes'
+
+
+def play_games(game, seed, games):
+    """Play games headlessly from one stream; return a result digest.
+
+    Game n is played on stream n under seed, so each game can be replayed
+    on its own from the seed its replay log would record. The digest is a
+    tuple of totals (human wins, computer wins and draws for ttt and rps;
+    games reaching $10 and final money for twenty-one) that two runs agree
+    on only if they drew the same numbers.
+    """
+    totals = [0, 0, 0]
+    for index in range(games):
+        game_seed = stream_seed(seed, index)
+        rng = BlockRNG(game_seed)
+        if game == "ttt":
+            played = autoplay(TTTGame(difficulty="normal", max_score=3, renderer=NullRenderer(),
+                                      rng=rng, seed=game_seed), _ttt_answer)
+            totals[0] += played.human_score
+            totals[1] += played.computer_score
+            totals[2] += played.draws
+        elif game == "twenty-one":
+            played = autoplay(TwentyOneGame(renderer=NullRenderer(), rng=rng, seed=game_seed),
+                              _twenty_one_answer)
+            totals[0] += played.player.money >= 10
+            totals[1] += played.player.money
+        else:
+            played = autoplay(RPSGame(renderer=NullRenderer(), rng=rng, seed=game_seed),
+                              _rps_answer)
+            totals[0] += played.human_score
+            totals[1] += played.computer_score
+    return tuple(totals)
+
+
+def run_workers(game, root_seed, workers, games, processes=None):
+    """Play games on each of workers streams; return the digests in order."""
+    seeds = [stream_seed(root_seed, index) for index in range(workers)]
+    with ProcessPoolExecutor(processes) as pool:
+        return list(pool.map(play_games, [game] * workers, seeds, [games] * workers))
+
+
+def bench_shuffle(rounds=100_000):
+    """Print deck shuffles per second for random.shuffle and BlockRNG."""
+    cards = list(range(52))
+    for label, rng in (("random.shuffle", random.Random(0)), ("BlockRNG", BlockRNG(0))):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            rng.shuffle(cards)
+        print(f"{label:<15} {rounds / (time.perf_counter() - start):>12,.0f} shuffles/s")
+
+
+def main():
+    """Run seeded workers in a pool, then again in one process, and compare."""
+    parser = argparse.ArgumentParser(description="Reproducible parallel headless games.")
+    parser.add_argument("game", choices=("ttt", "twenty-one", "rps"))
+    parser.add_argument("--root-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--games", type=int, default=2000, help="games per worker")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    digests = run_workers(args.game, args.root_seed, args.workers, args.games)
+    elapsed = time.perf_counter() - start
+    for index, digest in enumerate(digests):
+        print(f"worker {index}: seed {stream_seed(args.root_seed, index):>20}  totals {digest}")
+    print(f"{args.workers * args.games:,} games in {elapsed:.2f} s")
+
+    # The same streams in a single process, in reverse order, must agree.
+    single = [play_games(args.game, stream_seed(args.root_seed, index), args.games)
+              for index in reversed(range(args.workers))][::-1]
+    print("Single-process rerun matches:", single == digests)
+    bench_shuffle()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Rock Paper Scissors: the game, its computers, the bot tournament and equilibria.
+
+Names are loaded on first access, so importing the package alone does
+not import NumPy for the tournament or the regret trainer until they are
+used.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "Computer": ".oop_rps",
+    "EquilibriumComputer": ".rps_regret",
+    "LizardSpockRule": ".oop_rps",
+    "PredictingComputer": ".oop_rps",
+    "RPSGame": ".oop_rps",
+    "RegretTrainer": ".rps_regret",
+    "Rule": ".oop_rps",
+    "equilibrium": ".rps_regret",
+    "run_tournament": ".rps_tournament",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    """Import the module that defines name the first time it is used."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """List the lazily exported names with the module's own."""
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,5 @@
+"""Entry point for python -m rps_game."""
+
+from .oop_rps import main
+
+main()
@@ -0,0 +1,132 @@
+"""Benchmarks for the Rock Paper Scissors computer players.
+
+Run from the repository root: python -m rps_game.benchmarks [name ...]
+"""
+
+import itertools
+import random
+import sys
+import time
+
+from .oop_rps import Computer, PredictingComputer, Player, Rule
+
+
+def biased_opponent(rng):
+    """Yield rock half the time and a random move otherwise."""
+    while True:
+        yield 'rock' if rng.random() < 0.5 else rng.choice(Player.CHOICES)
+
+
+def cycling_opponent(rng):
+    """Yield rock, paper, scissors in a loop."""
+    yield from itertools.cycle(Player.CHOICES)
+
+
+def sticky_opponent(rng):
+    """Yield the previous move again 80% of the time, else a random one."""
+    move = rng.choice(Player.CHOICES)
+    while True:
+        yield move
+        if rng.random() >= 0.8:
+            move = rng.choice(Player.CHOICES)
+
+
+def random_opponent(rng):
+    """Yield uniformly random moves."""
+    while True:
+        yield rng.choice(Player.CHOICES)
+
+
+OPPONENTS = {
+    "biased": biased_opponent,
+    "cycling": cycling_opponent,
+    "sticky": sticky_opponent,
+    "random": random_opponent,
+}
+
+
+def play_rounds(computer, opponent, rounds):
+    """Play rounds silently; return (computer wins, ties, computer losses)."""
+    wins = ties = losses = 0
+    for human_move in itertools.islice(opponent, rounds):
+        computer.choose()
+        if computer.move == human_move:
+            ties += 1
+        elif (computer.move, human_move) in Rule.winning_rules:
+            wins += 1
+        else:
+            losses += 1
+        computer.observe(human_move)
+    return wins, ties, losses
+
+
+def bench_predictor(rounds=100_000):
+    """Report rounds per second and win rate against scripted opponents."""
+    print("Opponent  | Computer   | Rounds/s  | Win   | Tie   | Loss")
+    print("----------|------------|-----------|-------|-------|------")
+    for name, opponent in OPPONENTS.items():
+        for label, computer in (("random", Computer()), ("predicting", PredictingComputer())):
+            random.seed(0)
+            start = time.perf_counter()
+            wins, ties, losses = play_rounds(computer, opponent(random.Random(1)), rounds)
+            rate = rounds / (time.perf_counter() - start)
+            print(f"{name:<10}| {label:<11}| {rate:<10,.0f}| {wins / rounds:<6.1%}| "
+                  f"{ties / rounds:<6.1%}| {losses / rounds:.1%}")
+
+
+def bench_regret(iterations=20_000, batch=1_000):
+    """Report regret-matching speed and RM vs CFR+ convergence.
+
+    Single games train in plain Python. The batch trains the rps
+    equilibrium for a sweep of rock-over-scissors payoffs, from 1 to 3,
+    in one trainer.
+    """
+    from .rps_regret import RegretTrainer, payoff_matrix
+    from .rps_tournament import VARIANTS
+
+    weighted = payoff_matrix(Rule.winning_rules, {('rock', 'scissors'): 2.0})
+    sweep = [payoff_matrix(Rule.winning_rules, {('rock', 'scissors'): 1.0 + 2.0 * game / batch})
+             for game in range(batch)]
+    cases = (
+        ("rps", 1, payoff_matrix(Rule.winning_rules), iterations),
+        ("rpsls", 1, payoff_matrix(VARIANTS["rpsls"].winning_rules), iterations),
+        (f"sweep x {batch}", batch, sweep, iterations // 10),
+    )
+    print("Games        | Trainer | Iterations/s | Game-iterations/s")
+    print("-------------|---------|--------------|------------------")
+    for label, games, matrices, count in cases:
+        for name, plus in (("RM", False), ("CFR+", True)):
+            trainer = RegretTrainer(matrices, plus=plus)
+            start = time.perf_counter()
+            trainer.train(count)
+            rate = count / (time.perf_counter() - start)
+            print(f"{label:<13}| {name:<8}| {rate:<13,.0f}| {rate * games:,.0f}")
+
+    checkpoints = (10, 100, 1_000, 10_000, 100_000)
+    history = {}
+    for name, plus in (("RM", False), ("CFR+", True)):
+        trainer = RegretTrainer(weighted, plus=plus)
+        history[name] = trainer.train(checkpoints[-1], track=True)[:, 0]
+    print("\nExploitability on rps with rock over scissors paying 2")
+    print("Iterations | RM       | CFR+")
+    print("-----------|----------|---------")
+    for checkpoint in checkpoints:
+        print(f"{checkpoint:<11,}| {history['RM'][checkpoint - 1]:<9.2e}| "
+              f"{history['CFR+'][checkpoint - 1]:.2e}")
+
+
+BENCHMARKS = {
+    "predictor": bench_predictor,
+    "regret": bench_regret,
+}
+
+
+def main(names):
+    """Run the named benchmarks, or all of them."""
+    for name in names or BENCHMARKS:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -2,9 +2,13 @@
 """Rock Paper Scissors game implemented using object-oriented programming."""
 
 import random
+import sys
+from array import array
+from collections import OrderedDict, deque
 
 class Player:
     """Base class for players in the Rock Paper Scissors game."""
+    __slots__ = ('move',)
     CHOICES = ['rock', 'paper', 'scissors']
     def __init__(self):
         # A player has choices and a move
@@ -13,62 +17,84 @@ class Player:
 
 class Human(Player):
     """A player that chooses moves via user input."""
+    __slots__ = ()
     def __init__(self):
         super().__init__()
 
-    def choose(self):
-        """Prompt the user to choose a move and set self.move."""
-        while True:
-            choice = input('Choose your move (rock, paper, scissors): ').lower()
-            if choice in Player.CHOICES:
-                break
-            print("Invalid move. Please try again.")
+    def choose(self, choice):
+        """Set self.move from the user's answer; return False if invalid."""
+        choice = choice.lower()
+        if choice not in Player.CHOICES:
+            return False
         self.move = choice
+        return True
 
 
 class Computer(Player):
     """A player that chooses moves randomly."""
-    def __init__(self):
+    __slots__ = ('rng',)
+    def __init__(self, rng=None):
         super().__init__()
+        # Picks moves with rng.choice(); the global random module by default
+        self.rng = random if rng is None else rng
 
     def choose(self):
         """Randomly select a move and set self.move."""
-        self.move = random.choice(Player.CHOICES)
+        self.move = self.rng.choice(Player.CHOICES)
+
+    def observe(self, human_move):
+        """Learn from the human's move; the random computer ignores it."""
 
 class Rule:
-    """Manages the rules for determining the winner in Rock Paper Scissors."""
+    """Manages the rules for determining the winner in Rock Paper Scissors.
+
+    Output goes to a renderer, any object with a write() method. Lines are
+    collected into a frame and written with a single write() call by
+    render_frame().
+    """
     winning_rules = {
             ('rock', 'scissors'): 'rock crushes scissors',
             ('paper', 'rock'): 'paper covers rock',
             ('scissors', 'paper'): 'scissors cut paper'
         }
 
-    def __init__(self):
+    def __init__(self, renderer=None):
         self.max_score = 5
         self.human_score = 0
         self.computer_score = 0
+        self.renderer = sys.stdout if renderer is None else renderer
+        self._frame = []
 
+    def _say(self, text=""):
+        """Add a line of output to the current frame."""
+        self._frame.append(text)
+
+    def render_frame(self):
+        """Write the output collected since the last frame in one write."""
+        if self._frame:
+            self.renderer.write("\n".join(self._frame) + "\n")
+            self._frame.clear()
 
     def compare(self, human_move, computer_move):
         """Compare human and computer moves to determine the winner. Returns the winner and updates score"""
         if human_move == computer_move:
-            print("It's a tie!")
+            self._say("It's a tie!")
             return "tie"
         elif (human_move, computer_move) in self.winning_rules:
             self.human_score += 1
-            print(f"You win: {self.winning_rules[(human_move, computer_move)]}!")
+            self._say(f"You win: {self.winning_rules[(human_move, computer_move)]}!")
             return "human"
         else:
             # Infer the computer's winning message by reversing the moves
             self.computer_score += 1
             reverse_key = (computer_move, human_move)
             message = self.winning_rules.get(reverse_key, f"{computer_move} beats {human_move}")
-            print(f"Computer wins: {message}!")
+            self._say(f"Computer wins: {message}!")
             return "computer"
         
     def display_scores(self):
         """Display the current scores."""
-        print(f"Score - Player: {self.human_score}, Computer: {self.computer_score}")
+        self._say(f"Score - Player: {self.human_score}, Computer: {self.computer_score}")
 
     def get_winner(self):
         """Returne the overall game winner."""
@@ -83,77 +109,329 @@ class Rule:
         return self.human_score == self.max_score or self.computer_score == self.max_score
 
 
+class LizardSpockRule(Rule):
+    """Rules for the Rock Paper Scissors Lizard Spock variant."""
+    winning_rules = {
+            **Rule.winning_rules,
+            ('rock', 'lizard'): 'rock crushes lizard',
+            ('lizard', 'spock'): 'lizard poisons spock',
+            ('spock', 'scissors'): 'spock smashes scissors',
+            ('scissors', 'lizard'): 'scissors decapitate lizard',
+            ('lizard', 'paper'): 'lizard eats paper',
+            ('paper', 'spock'): 'paper disproves spock',
+            ('spock', 'rock'): 'spock vaporizes rock'
+        }
+
+
+class NGramPredictor:
+    """Predicts a player's next move from n-gram counts of past moves.
+
+    For every order n from 1 to max_order it counts which move followed
+    each context of the last n moves. Counts are decayed each time their
+    context is updated, so old habits fade, and each order keeps at most
+    max_contexts contexts, dropping the least recently used.
+    """
+    def __init__(self, choices, max_order=3, decay=0.95, max_contexts=1024):
+        self.choices = list(choices)
+        self.max_order = max_order
+        self.decay = decay
+        self.max_contexts = max_contexts
+        self.history = deque(maxlen=max_order)
+        # tables[n - 1] maps a context of n moves to per-choice counts.
+        self.tables = [OrderedDict() for _ in range(max_order)]
+        self._index = {choice: index for index, choice in enumerate(self.choices)}
+
+    def update(self, move):
+        """Record the player's latest move in every order's table."""
+        move_index = self._index[move]
+        history = tuple(self.history)
+        for order, table in enumerate(self.tables, start=1):
+            if len(history) < order:
+                break
+            context = history[-order:]
+            counts = table.get(context)
+            if counts is None:
+                counts = [0.0] * len(self.choices)
+                table[context] = counts
+                if len(table) > self.max_contexts:
+                    table.popitem(last=False)
+            else:
+                table.move_to_end(context)
+                for index, count in enumerate(counts):
+                    counts[index] = count * self.decay
+            counts[move_index] += 1.0
+        self.history.append(move)
+
+    def predict(self):
+        """Return the most likely next move, or None with nothing to go on.
+
+        The longest context seen before wins; shorter ones are a fallback.
+        """
+        history = tuple(self.history)
+        for order in range(min(len(history), self.max_order), 0, -1):
+            counts = self.tables[order - 1].get(history[-order:])
+            if counts:
+                return self.choices[counts.index(max(counts))]
+        return None
+
+
+class PredictingComputer(Computer):
+    """A computer that learns the human's habits and plays the counter."""
+    __slots__ = ('predictor', 'counters')
+    def __init__(self, max_order=3, decay=0.95, max_contexts=1024, rng=None):
+        super().__init__(rng)
+        self.predictor = NGramPredictor(Player.CHOICES, max_order, decay, max_contexts)
+        self.counters = {loser: winner for winner, loser in Rule.winning_rules}
+
+    def choose(self):
+        """Play the counter to the human's predicted move, or a random one."""
+        predicted = self.predictor.predict()
+        if predicted is None:
+            super().choose()
+        else:
+            self.move = self.counters[predicted]
+
+    def observe(self, human_move):
+        """Learn from the human's move in the round just played."""
+        self.predictor.update(human_move)
+
+
+class MoveHistory:
+    """Keeps the most recent rounds in a fixed-size ring buffer.
+
+    Each round is stored as three small codes: the human's and computer's
+    moves (indexes into Player.CHOICES) and the outcome (an index into
+    MoveHistory.OUTCOMES). Running per-move and per-outcome totals cover
+    every round played, even those overwritten in the buffer. With a
+    log_path every round is also appended to a file as one byte, which
+    read_log() streams back lazily.
+    """
+    OUTCOMES = ('tie', 'human', 'computer')
+
+    def __init__(self, capacity=100, log_path=None):
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1.")
+        self.capacity = capacity
+        self.total_rounds = 0
+        self._rounds = array('B', bytes(capacity))
+        self.human_counts = [0] * len(Player.CHOICES)
+        self.computer_counts = [0] * len(Player.CHOICES)
+        self.outcome_counts = [0] * len(MoveHistory.OUTCOMES)
+        self._log = open(log_path, 'ab') if log_path else None
+
+    def __len__(self):
+        """Return the number of rounds still held in the buffer."""
+        return min(self.total_rounds, self.capacity)
+
+    @staticmethod
+    def encode(human_move, computer_move, outcome):
+        """Pack a round into one byte."""
+        return ((Player.CHOICES.index(human_move) * len(Player.CHOICES)
+                 + Player.CHOICES.index(computer_move)) * len(MoveHistory.OUTCOMES)
+                + MoveHistory.OUTCOMES.index(outcome))
+
+    @staticmethod
+    def decode(code):
+        """Unpack a byte into (human_move, computer_move, outcome)."""
+        moves, outcome = divmod(code, len(MoveHistory.OUTCOMES))
+        human, computer = divmod(moves, len(Player.CHOICES))
+        return Player.CHOICES[human], Player.CHOICES[computer], MoveHistory.OUTCOMES[outcome]
+
+    def append(self, human_move, computer_move, outcome):
+        """Record a round, overwriting the oldest once the buffer is full."""
+        code = MoveHistory.encode(human_move, computer_move, outcome)
+        self._rounds[self.total_rounds % self.capacity] = code
+        self.total_rounds += 1
+        self.human_counts[Player.CHOICES.index(human_move)] += 1
+        self.computer_counts[Player.CHOICES.index(computer_move)] += 1
+        self.outcome_counts[MoveHistory.OUTCOMES.index(outcome)] += 1
+        if self._log:
+            self._log.write(bytes((code,)))
+
+    def recent(self, count):
+        """Yield (round, human_move, computer_move, outcome), oldest first."""
+        first = max(self.total_rounds - min(count, len(self)), 0)
+        for round_index in range(first, self.total_rounds):
+            yield (round_index + 1, *MoveHistory.decode(self._rounds[round_index % self.capacity]))
+
+    def close(self):
+        """Flush and close the on-disk log, if any."""
+        if self._log:
+            self._log.close()
+            self._log = None
+
+
+def read_log(path, chunk_size=65536):
+    """Yield (round, human_move, computer_move, outcome) from a history log."""
+    round_number = 0
+    with open(path, 'rb') as file:
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                return
+            for code in chunk:
+                round_number += 1
+                yield (round_number, *MoveHistory.decode(code))
+
+
 class RPSGame(Rule):
-    """Main game class that orchestrates the Rock Paper Scissors game."""
-    def __init__(self):
-        super().__init__() # Initialize Rule's scorekeeping
+    """Main game class that orchestrates the Rock Paper Scissors game.
+
+    The game runs as a state machine: begin() starts it, and handle()
+    takes one answer to the current prompt and advances until the next
+    answer is needed or the game is finished. play() drives the machine
+    from the terminal.
+    """
+    HISTORY_WINDOW = 5 # Rounds shown after each round
+    RESULT_OUTCOMES = {'tie': 0, 'human': 1, 'computer': -1} # Recorded by results
+
+    def __init__(self, computer=None, history_capacity=100, history_log=None,
+                 renderer=None, input_source=None, replay=None, rng=None, seed=None,
+                 results=None):
+        super().__init__(renderer) # Initialize Rule's scorekeeping and output
+        # The default computer's moves come from rng, or random.Random(seed),
+        # or the global random module; seed is recorded in the replay log
+        self.seed = seed
+        if rng is None:
+            rng = random if seed is None else random.Random(seed)
+        self.rng = rng
+        # Called with each prompt by play(); input() by default
+        self.input_source = input if input_source is None else input_source
+        # A replay_log.ReplayWriter recording every round, if given
+        self.replay = replay
+        # A results_store.ResultsStore recording every round's outcome, if given
+        self.results = results
         self._human = Human()
-        self._computer = Computer()
-        self.move_history = [] # List to store move history
+        self._computer = computer or Computer(rng)
+        self.move_history = MoveHistory(history_capacity, history_log)
         self.round_count = 0 # Track current round
+        self.state = None
+        self.finished = False
+
+    @property
+    def prompt(self):
+        """Return the question the game is waiting on, or None."""
+        if self.state == 'move':
+            return 'Choose your move (rock, paper, scissors): '
+        if self.state == 'play_again':
+            return 'Do you want to play again? (yes/no): '
+        return None
+
+    def begin(self):
+        """Welcome the player and wait for the first move."""
+        self.finished = False
+        if self.replay is not None:
+            self.replay.start_game("rps", self.seed)
+        self._display_welcome_message()
+        self.state = 'move'
+        self.render_frame()
+
+    def handle(self, answer):
+        """Apply one answer to the current prompt and advance the game."""
+        if self.finished:
+            raise RuntimeError('The game is already finished.')
+        if self.state == 'move':
+            if self._human.choose(answer):
+                self._play_round()
+                self.state = 'play_again'
+            else:
+                self._say("Invalid move. Please try again.")
+        elif answer.lower() == 'yes':
+            self.state = 'move'
+        elif answer.lower() == 'no':
+            if self.replay is not None:
+                self.replay.end_game()
+            self._display_goodbye_message()
+            self.state = None
+            self.finished = True
+        else:
+            self._say("Invalid input. Please enter 'yes' or 'no'.")
+        self.render_frame()
 
     def _display_welcome_message(self):
         """Display the welcome message for the game."""
-        print('Welcome to Rock Paper Scissors!')
-        print(f'First to {self.max_score} points wins!')
+        self._say('Welcome to Rock Paper Scissors!')
+        self._say(f'First to {self.max_score} points wins!')
 
     def _display_goodbye_message(self):
         """Displays the winner and the goodbye message when the game ends."""
-        print(f'Final Score - Player: {self.human_score}, Computer: {self.computer_score}')
+        self._say(f'Final Score - Player: {self.human_score}, Computer: {self.computer_score}')
 
         winner = self.get_winner()
         if winner:
-            print(f"{winner} wins the game!")
+            self._say(f"{winner} wins the game!")
         else:
-            print('Game ended without a winner.')
+            self._say('Game ended without a winner.')
 
-        print('Thanks for playing Rock Paper Scissors. Goodbye!')
+        self._say('Thanks for playing Rock Paper Scissors. Goodbye!')
+        self.move_history.close()
 
     def _display_move_history(self):
-        """Display the history of moves made during the round."""
-        if not self.move_history:
-            print("No moves have been made yet.")
+        """Display the most recent rounds and totals for the whole game."""
+        history = self.move_history
+        if not history.total_rounds:
+            self._say("No moves have been made yet.")
             return
-        print("\nMove History:")
-        print("Round | Human   | Computer")
-        print("------|---------|---------")
-        for round_num, human_move, computer_move in self.move_history:
-            print(f"{round_num:<6}| {human_move:<7} | {computer_move:<8}")
+        shown = min(self.HISTORY_WINDOW, len(history))
+        self._say(f"\nMove History (last {shown} of {history.total_rounds} rounds):")
+        self._say("Round | Human   | Computer")
+        self._say("------|---------|---------")
+        for round_num, human_move, computer_move, _ in history.recent(self.HISTORY_WINDOW):
+            self._say(f"{round_num:<6}| {human_move:<7} | {computer_move:<8}")
+        human = ", ".join(f"{choice} {count}" for choice, count
+                          in zip(Player.CHOICES, history.human_counts))
+        computer = ", ".join(f"{choice} {count}" for choice, count
+                             in zip(Player.CHOICES, history.computer_counts))
+        ties, human_wins, computer_wins = history.outcome_counts
+        self._say(f"Human moves: {human}")
+        self._say(f"Computer moves: {computer}")
+        self._say(f"Rounds won - Player: {human_wins}, Computer: {computer_wins}, Ties: {ties}")
 
     def _display_winner(self):
-        """Display the players' moves and the game result."""
+        """Display the players' moves and the game result; return the outcome."""
         human_move = self._human.move
         computer_move = self._computer.move
-        print(f'Player chose: {human_move}')
-        print(f'Computer chose: {computer_move}')
-        self.compare(human_move, computer_move)
+        self._say(f'Player chose: {human_move}')
+        self._say(f'Computer chose: {computer_move}')
+        outcome = self.compare(human_move, computer_move)
         self.display_scores()
-
-    def _play_again(self):
-        """Ask if the user wants to play another round."""
-        while True:
-            play_again = input('Do you want to play again? (yes/no): ').lower()
-            if play_again in ['yes', 'no']:
-                return play_again == 'yes'
-            print("Invalid input. Please enter 'yes' or 'no'.")
+        return outcome
 
     def _play_round(self):
         """Play a single round of the game."""
         self.round_count += 1
-        self._human.choose()
         self._computer.choose()
-        self._display_winner()
+        outcome = self._display_winner()
+        self._computer.observe(self._human.move)
         #add moves to history
-        self.move_history.append((self.round_count, self._human.move, self._computer.move))
+        self.move_history.append(self._human.move, self._computer.move, outcome)
+        if self.replay is not None:
+            self.replay.rps_round(Player.CHOICES.index(self._human.move),
+                                  Player.CHOICES.index(self._computer.move))
+        if self.results is not None:
+            self.results.record("rps", RPSGame.RESULT_OUTCOMES[outcome])
         self._display_move_history()
 
     def play(self):
-        """Run the main game loop."""
-        self._display_welcome_message()
-        while True:
-            self._play_round()
-            if not self._play_again():
-                break
-        self._display_goodbye_message()
+        """Run the main game loop, closing the history log however it ends."""
+        try:
+            self.begin()
+            while not self.finished:
+                self.handle(self.input_source(self.prompt))
+        finally:
+            self.move_history.close()
+
+def main():
+    """Play Rock Paper Scissors in the terminal."""
+    # Instrumentation and SQLite are only loaded for the terminal game.
+    # pylint: disable=import-outside-toplevel
+    from instrumentation import configure_from_environment
+    from results_store import results_from_environment
+    configure_from_environment()
+    rng = random.Random()
+    with results_from_environment() as results:
+        RPSGame(computer=PredictingComputer(rng=rng), rng=rng, results=results).play()
+
 
-RPSGame().play()
+if __name__ == "__main__":
+    main()
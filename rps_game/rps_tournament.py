@@ -0,0 +1,184 @@
+"""Round-robin Rock Paper Scissors tournaments resolved with NumPy.
+
+Moves are small integers indexing a rule set's choices. A rule set's
+winning_rules dict (Rule, LizardSpockRule, ...) is turned into an n x n
+outcome matrix once, and whole arrays of rounds are resolved with a single
+fancy-indexing lookup into it. Nothing is printed per round.
+
+Requires NumPy.
+
+Run from the repository root: python -m rps_game.rps_tournament --rounds 1000000
+"""
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from .oop_rps import LizardSpockRule, Player, Rule
+
+VARIANTS = {
+    "rps": Rule,
+    "rpsls": LizardSpockRule,
+}
+
+
+def rule_choices(winning_rules):
+    """Return the moves of a rule set, Player.CHOICES first."""
+    choices = [choice for choice in Player.CHOICES
+               if any(choice in pair for pair in winning_rules)]
+    for pair in winning_rules:
+        for move in pair:
+            if move not in choices:
+                choices.append(move)
+    return choices
+
+
+def outcome_matrix(winning_rules, choices=None):
+    """Return an int8 matrix: +1 where the row move beats the column move.
+
+    Losses are -1 and ties (including pairs the rules don't cover) are 0.
+    """
+    choices = choices or rule_choices(winning_rules)
+    index = {choice: position for position, choice in enumerate(choices)}
+    matrix = np.zeros((len(choices), len(choices)), dtype=np.int8)
+    for winner, loser in winning_rules:
+        matrix[index[winner], index[loser]] = 1
+        matrix[index[loser], index[winner]] = -1
+    return matrix
+
+
+def resolve(matrix, moves_a, moves_b):
+    """Return the outcome of every round for player A (+1, 0 or -1)."""
+    return matrix[moves_a, moves_b]
+
+
+class MixedBot:
+    """Plays each move with a fixed probability."""
+
+    def __init__(self, name, probabilities):
+        """Initialize the bot with one probability per move."""
+        self.name = name
+        self.probabilities = np.asarray(probabilities, dtype=float)
+        self.probabilities /= self.probabilities.sum()
+
+    def start_match(self, rng):
+        """Prepare for a new match; a mixed bot has no state."""
+
+    def moves(self, rng, first, rounds):
+        """Return an array of the bot's moves for rounds from index first on."""
+        return rng.choice(len(self.probabilities), size=rounds,
+                          p=self.probabilities).astype(np.int8)
+
+
+class CycleBot:
+    """Repeats a fixed pattern of moves from a random starting point."""
+
+    def __init__(self, name, pattern):
+        """Initialize the bot with a pattern of move indexes."""
+        self.name = name
+        self.pattern = np.asarray(pattern, dtype=np.int8)
+        self.offset = 0
+
+    def start_match(self, rng):
+        """Pick a random starting point in the pattern for a new match."""
+        self.offset = int(rng.integers(len(self.pattern)))
+
+    def moves(self, rng, first, rounds):
+        """Return an array of the bot's moves for rounds from index first on.
+
+        The pattern carries on from the match's starting point, so the
+        moves don't depend on how the match is split into chunks.
+        """
+        shift = (self.offset + first) % len(self.pattern)
+        return np.resize(np.roll(self.pattern, -shift), rounds)
+
+
+def default_bots(choices):
+    """Return a field of simple bots for a rule set's choices."""
+    count = len(choices)
+    bots = [MixedBot("uniform", [1] * count)]
+    for index, choice in enumerate(choices):
+        bots.append(MixedBot(f"always-{choice}", np.eye(count)[index]))
+    bots.append(MixedBot(f"{choices[0]}-heavy", [3] + [1] * (count - 1)))
+    bots.append(CycleBot("cycle", range(count)))
+    bots.append(CycleBot("reverse-cycle", range(count - 1, -1, -1)))
+    return bots
+
+
+class Standing:
+    """A bot's aggregate tournament record."""
+
+    def __init__(self, name):
+        """Initialize an empty record."""
+        self.name = name
+        self.wins = 0
+        self.ties = 0
+        self.losses = 0
+
+    @property
+    def rounds(self):
+        """Return the number of rounds played."""
+        return self.wins + self.ties + self.losses
+
+    @property
+    def points(self):
+        """Return wins minus losses."""
+        return self.wins - self.losses
+
+
+def run_tournament(bots, matrix, rounds, seed=None, chunk_size=1_000_000):
+    """Play every pair of bots for `rounds` rounds; return sorted standings."""
+    rng = np.random.default_rng(seed)
+    standings = {bot.name: Standing(bot.name) for bot in bots}
+    for bot_a, bot_b in itertools.combinations(bots, 2):
+        record_a, record_b = standings[bot_a.name], standings[bot_b.name]
+        bot_a.start_match(rng)
+        bot_b.start_match(rng)
+        for first in range(0, rounds, chunk_size):
+            size = min(chunk_size, rounds - first)
+            outcomes = resolve(matrix, bot_a.moves(rng, first, size),
+                               bot_b.moves(rng, first, size))
+            losses, ties, wins = np.bincount(outcomes + 1, minlength=3).tolist()
+            record_a.wins += wins
+            record_a.ties += ties
+            record_a.losses += losses
+            record_b.wins += losses
+            record_b.ties += ties
+            record_b.losses += wins
+    return sorted(standings.values(), key=lambda standing: standing.points, reverse=True)
+
+
+def display_standings(standings):
+    """Print a standings table."""
+    print("Bot              | Points      | Win    | Tie    | Loss")
+    print("-----------------|-------------|--------|--------|-------")
+    for standing in standings:
+        rounds = standing.rounds or 1
+        print(f"{standing.name:<17}| {standing.points:<12,}| {standing.wins / rounds:<7.1%}| "
+              f"{standing.ties / rounds:<7.1%}| {standing.losses / rounds:.1%}")
+
+
+def main():
+    """Run a tournament from the command line."""
+    parser = argparse.ArgumentParser(description="Round-robin RPS bot tournament.")
+    parser.add_argument("--variant", default="rps", choices=VARIANTS)
+    parser.add_argument("--rounds", type=int, default=1_000_000, help="rounds per pairing")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    winning_rules = VARIANTS[args.variant].winning_rules
+    choices = rule_choices(winning_rules)
+    bots = default_bots(choices)
+    start = time.perf_counter()
+    standings = run_tournament(bots, outcome_matrix(winning_rules, choices),
+                               args.rounds, args.seed)
+    elapsed = time.perf_counter() - start
+    display_standings(standings)
+    total = args.rounds * len(bots) * (len(bots) - 1) // 2
+    print(f"\n{total:,} rounds in {elapsed:.2f} s ({total / elapsed:,.0f} rounds/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Replay logs record every seed the games accept."""
+
+import pytest
+
+from game_io import NullRenderer
+from replay_log import ReplayWriter, replay, seed_hash
+from rps_game.oop_rps import Player, RPSGame
+
+SEEDS = [None, 0, 1, 2**64 - 1, 2**64, -1, -2**70, "table 7", b"bytes", 1.5]
+
+
+def play_rps(writer, seed):
+    """Play a seeded rps game to the end, logging it to writer."""
+    game = RPSGame(renderer=NullRenderer(), replay=writer, seed=seed)
+    game.begin()
+    while not game.finished:
+        if game.state == 'move':
+            game.handle(game.rng.choice(Player.CHOICES))
+        else:
+            game.handle('no' if game.is_game_over() else 'yes')
+
+
+def test_seeds_round_trip(tmp_path):
+    path = str(tmp_path / "games.log")
+    writer = ReplayWriter(path)
+    for seed in SEEDS:
+        play_rps(writer, seed)
+    writer.close()
+
+    summaries = list(replay(path))
+    assert len(summaries) == len(SEEDS)
+    for seed, summary in zip(SEEDS, summaries):
+        assert summary.wins + summary.losses + summary.ties > 0
+        if seed is None:
+            assert summary.seed is None and not summary.seed_hashed
+        elif isinstance(seed, int) and 0 <= seed < 2**64:
+            assert summary.seed == seed and not summary.seed_hashed
+        else:
+            assert summary.seed == seed_hash(seed) and summary.seed_hashed
+
+
+@pytest.mark.parametrize("first, second", [(1, "1"), (1, 1.0), (-1, 2**64 - 1), ("a", b"a")])
+def test_seed_hash_tells_types_apart(first, second):
+    assert seed_hash(first) != seed_hash(second)
@@ -0,0 +1,43 @@
+"""ResultsStore surfaces a writer thread that cannot start."""
+
+import sqlite3
+import threading
+
+import pytest
+
+import results_store
+from results_store import ResultsStore
+
+
+@pytest.fixture(name="failing_writer")
+def fixture_failing_writer(monkeypatch):
+    """Make _connect fail on every thread but the main one."""
+    connect = results_store._connect  # pylint: disable=protected-access
+
+    def writer_connect(path):
+        if threading.current_thread() is not threading.main_thread():
+            raise sqlite3.OperationalError("unable to open database file")
+        return connect(path)
+
+    monkeypatch.setattr(results_store, "_connect", writer_connect)
+
+
+@pytest.mark.usefixtures("failing_writer")
+def test_flush_and_close_raise_when_writer_cannot_connect(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"), player="alice", flush_interval=0.01)
+    store.record("ttt", 1)
+    with pytest.raises(RuntimeError) as raised:
+        store.flush()
+    assert isinstance(raised.value.__cause__, sqlite3.OperationalError)
+    with pytest.raises(RuntimeError):
+        store.close()
+
+
+def test_results_are_committed(tmp_path):
+    with ResultsStore(str(tmp_path / "results.db"), player="alice", flush_interval=0.01) as store:
+        store.record("ttt", 1)
+        store.record("ttt", -1)
+        store.record("rps", 0, player="bob")
+        store.flush()
+        assert store.standings() == {"ttt": (1, 0, 1)}
+        assert store.standings("bob") == {"rps": (0, 1, 0)}
@@ -0,0 +1,32 @@
+"""Tournament results for deterministic bots don't depend on chunking."""
+
+import numpy as np
+import pytest
+
+from rps_game.oop_rps import Rule
+from rps_game.rps_tournament import CycleBot, MixedBot, outcome_matrix, rule_choices, run_tournament
+
+
+def deterministic_bots(count):
+    """Return bots whose moves need no random draws once a match starts."""
+    return [MixedBot("always-first", np.eye(count)[0]),
+            CycleBot("cycle", range(count)),
+            CycleBot("pair", [0, 1])]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 7])
+def test_cycle_carries_on_across_chunks(chunk_size):
+    choices = rule_choices(Rule.winning_rules)
+    matrix = outcome_matrix(Rule.winning_rules, choices)
+    whole = run_tournament(deterministic_bots(len(choices)), matrix, 100, seed=3)
+    chunked = run_tournament(deterministic_bots(len(choices)), matrix, 100, seed=3,
+                             chunk_size=chunk_size)
+    assert ([(s.name, s.wins, s.ties, s.losses) for s in chunked]
+            == [(s.name, s.wins, s.ties, s.losses) for s in whole])
+
+
+def test_cycle_moves_follow_absolute_round():
+    bot = CycleBot("cycle", [0, 1, 2])
+    bot.offset = 1
+    assert bot.moves(None, 0, 5).tolist() == [1, 2, 0, 1, 2]
+    assert bot.moves(None, 4, 4).tolist() == [2, 0, 1, 2]
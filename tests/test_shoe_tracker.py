@@ -0,0 +1,62 @@
+"""ShoeTracker counts against the cards a Shoe has actually dealt."""
+
+import random
+
+from game_io import NullRenderer
+from oo_twenty_one.oo_twenty_one import Shoe, TwentyOneGame
+from oo_twenty_one.twenty_one_counting import CountingPlayer, ShoeTracker
+
+
+def counted(shoe):
+    """Return a fresh tracker told of every card dealt since the last shuffle."""
+    tracker = ShoeTracker(shoe.decks)
+    for code in shoe.codes[:shoe.position]:
+        tracker.deal(code)
+    return tracker
+
+
+def assert_same_counts(tracker, expected):
+    assert tracker.rank_counts == expected.rank_counts
+    assert tracker.composition() == expected.composition()
+    assert tracker.cards_remaining == expected.cards_remaining
+    assert tracker.running_count == expected.running_count
+
+
+def test_reshuffle_mid_hand_drops_concealed_card():
+    tracker = ShoeTracker(1)
+    shoe = Shoe(decks=1, penetration=1, rng=random.Random(5), tracker=tracker)
+    for _ in range(51):
+        shoe.deal()
+    hole_card = shoe.deal()
+    tracker.conceal(hole_card.code)
+    shoe.deal()  # The shoe runs out and is reshuffled mid-hand
+    tracker.reveal(hole_card.code)
+    assert shoe.position == 1
+    assert tracker.concealed == []
+    assert_same_counts(tracker, counted(shoe))
+
+
+def test_reveal_counts_card_concealed_since_reset():
+    tracker = ShoeTracker(1)
+    shoe = Shoe(decks=1, rng=random.Random(6), tracker=tracker)
+    hole_card = shoe.deal()
+    tracker.conceal(hole_card.code)
+    shoe.deal()
+    tracker.reveal(hole_card.code)
+    assert_same_counts(tracker, counted(shoe))
+
+
+def test_game_tracker_matches_shoe_after_every_hand():
+    tracker = ShoeTracker(1)
+    game = TwentyOneGame(shoe_decks=1, penetration=1, player=CountingPlayer(tracker),
+                         renderer=NullRenderer(), seed=3, tracker=tracker)
+    mid_hand_reshuffles = 0
+    game.begin()
+    for _ in range(100):
+        assert game.state == "play_again"
+        game.player.money = 5  # Keep the game going
+        game.handle('y')
+        on_table = len(game.player.hand) + len(game.dealer.hand)
+        mid_hand_reshuffles += game.deck.position < on_table
+        assert_same_counts(tracker, counted(game.deck))
+    assert mid_hand_reshuffles > 0
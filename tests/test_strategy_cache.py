@@ -0,0 +1,58 @@
+"""The strategy table's disk cache: round trips, damaged files and unwritable directories."""
+
+import os
+
+import pytest
+
+from oo_twenty_one import twenty_one_strategy
+from oo_twenty_one.twenty_one_strategy import StrategyTable, strategy_table
+
+
+@pytest.fixture(name="tables")
+def fixture_tables(monkeypatch):
+    """Give each test an empty in-memory table cache."""
+    tables = {}
+    monkeypatch.setattr(twenty_one_strategy, "_tables", tables)
+    return tables
+
+
+@pytest.fixture(name="table", scope="module")
+def fixture_table():
+    """Compute the single-deck table once for the module."""
+    return StrategyTable(1)
+
+
+def test_save_and_load_round_trip(tmp_path, table):
+    path = tmp_path / "table.bin"
+    table.save(str(path))
+    loaded = StrategyTable.load(str(path))
+    assert loaded.decks == 1
+    assert loaded.values == table.values
+    assert os.listdir(tmp_path) == ["table.bin"]
+
+
+def test_short_file_is_rejected(tmp_path, table):
+    path = tmp_path / "table.bin"
+    table.save(str(path))
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) - 4 * 10])
+    with pytest.raises(ValueError):
+        StrategyTable.load(str(path))
+
+
+def test_damaged_cache_is_recomputed_and_replaced(tmp_path, tables, table):
+    path = tmp_path / "strategy_1deck.bin"
+    table.save(str(path))
+    path.write_bytes(path.read_bytes()[:100])
+    result = strategy_table(1, cache_dir=str(tmp_path))
+    assert result.values == table.values
+    assert StrategyTable.load(str(path)).values == table.values
+    assert tables[1] is result
+
+
+def test_unwritable_cache_keeps_table_in_memory(tmp_path, tables, table):
+    blocker = tmp_path / "not_a_directory"
+    blocker.write_text("")
+    result = strategy_table(1, cache_dir=str(blocker / "cache"))
+    assert result.values == table.values
+    assert result.should_hit(12, False, 10) == table.should_hit(12, False, 10)
@@ -0,0 +1,74 @@
+"""BitBoard and Board winning_square() against the original line-by-line scan."""
+
+import itertools
+import random
+
+import pytest
+
+from oo_ttt_game.oo_ttt_game import BitBoard, Board, Square
+
+MARKERS = (Square.HUMAN_MARKER, Square.COMPUTER_MARKER)
+
+
+def baseline_winning_square(cells, marker):
+    """Return the empty square of the first line holding two of marker, as TTTGame did."""
+    for combination in Board.WINNING_COMBINATIONS:
+        markers = [cells[key] for key in combination]
+        if markers.count(marker) == 2 and markers.count(Square.INITIAL_MARKER) == 1:
+            return combination[markers.index(Square.INITIAL_MARKER)]
+    return None
+
+
+def make_boards(cells):
+    """Return a Board and a BitBoard holding the same markers."""
+    boards = (Board(), BitBoard())
+    for key, marker in cells.items():
+        if marker != Square.INITIAL_MARKER:
+            for board in boards:
+                board.mark_square(key, marker)
+    return boards
+
+
+def threat_count(cells, marker):
+    """Return how many distinct empty squares would complete a line for marker."""
+    return len({key for combination in Board.WINNING_COMBINATIONS
+                for key in combination
+                if cells[key] == Square.INITIAL_MARKER
+                and [cells[other] for other in combination].count(marker) == 2})
+
+
+def all_positions():
+    """Yield every assignment of markers to the nine squares."""
+    choices = (Square.INITIAL_MARKER,) + MARKERS
+    for markers in itertools.product(choices, repeat=9):
+        yield dict(zip(range(1, 10), markers))
+
+
+@pytest.mark.parametrize("marker", MARKERS)
+def test_several_threats_pick_the_first_line(marker):
+    checked = 0
+    for cells in all_positions():
+        if threat_count(cells, marker) < 2:
+            continue
+        expected = baseline_winning_square(cells, marker)
+        for board in make_boards(cells):
+            assert board.winning_square(marker) == expected, (type(board).__name__, cells)
+        checked += 1
+    assert checked > 1000
+
+
+def test_random_games_agree():
+    rng = random.Random(0)
+    for _ in range(3000):
+        cells = dict.fromkeys(range(1, 10), Square.INITIAL_MARKER)
+        boards = make_boards(cells)
+        order = list(range(1, 10))
+        rng.shuffle(order)
+        for turn, key in enumerate(order):
+            for marker in MARKERS:
+                expected = baseline_winning_square(cells, marker)
+                assert [board.winning_square(marker) for board in boards] == [expected] * 2
+            marker = MARKERS[turn % 2]
+            cells[key] = marker
+            for board in boards:
+                board.mark_square(key, marker)
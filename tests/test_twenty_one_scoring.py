@@ -0,0 +1,99 @@
+"""Participant.score() and is_busted() against the original rescanning rules."""
+
+import random
+
+import pytest
+
+from oo_twenty_one.oo_twenty_one import CARDS, Card, Dealer, Participant, Player
+
+
+def baseline_score(hand):
+    """Score a hand as Participant.score originally did: sum, then adjust aces."""
+    score = sum(Card.VALUES[card.rank] for card in hand)
+    num_aces = sum(1 for card in hand if card.rank == 'A')
+    while score > 21 and num_aces > 0:
+        score -= 10
+        num_aces -= 1
+    return score
+
+
+ACES = [card for card in CARDS if card.rank == 'A']
+
+
+def random_hand(rng):
+    """Return up to 12 cards drawn with replacement, as from a multi-deck shoe.
+
+    Half the hands are weighted towards aces so several aces come up often.
+    """
+    size = rng.randint(0, 12)
+    if rng.random() < 0.5:
+        return [rng.choice(ACES) if rng.random() < 0.4 else rng.choice(CARDS)
+                for _ in range(size)]
+    return [rng.choice(CARDS) for _ in range(size)]
+
+
+def assert_matches_baseline(participant):
+    """Check a participant's score and bust flag against baseline_score."""
+    expected = baseline_score(participant.hand)
+    assert participant.score() == expected, participant.hand
+    assert participant.is_busted() == (expected > 21), participant.hand
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_hands_card_by_card(seed):
+    rng = random.Random(seed)
+    for _ in range(2_000):
+        participant = Participant()
+        assert_matches_baseline(participant)
+        for card in random_hand(rng):
+            participant.add_card(card)
+            assert_matches_baseline(participant)
+
+
+@pytest.mark.parametrize("participant_class", [Participant, Player, Dealer])
+def test_cleared_hands_are_reused(participant_class):
+    rng = random.Random(participant_class.__name__)
+    participant = participant_class()
+    for _ in range(2_000):
+        participant.clear_hand()
+        assert participant.hand == []
+        assert_matches_baseline(participant)
+        for card in random_hand(rng):
+            participant.add_card(card)
+            assert_matches_baseline(participant)
+
+
+def test_assigned_hands_are_recounted():
+    rng = random.Random(7)
+    participant = Participant()
+    for _ in range(2_000):
+        participant.hand = random_hand(rng)
+        assert_matches_baseline(participant)
+
+
+@pytest.mark.parametrize("aces", range(1, 13))
+def test_several_aces(aces):
+    participant = Participant()
+    for card in [ACES[0]] * aces:
+        participant.add_card(card)
+    assert_matches_baseline(participant)
+    for rank in ('9', '10', 'K'):
+        participant.add_card(Card(rank, Card.SUITS[0]))
+        assert_matches_baseline(participant)
+
+
+@pytest.mark.parametrize("ranks, score", [
+    (('A', 'K'), 21),
+    (('A', 'A'), 12),
+    (('A', 'A', '9'), 21),
+    (('A', 'A', 'A', '8'), 21),
+    (('A', '5', '5', 'K'), 21),
+    (('K', 'Q', 'A'), 21),
+    (('K', 'Q', 'A', 'A'), 22),
+    (('10', '6', '6'), 22),
+])
+def test_known_scores(ranks, score):
+    participant = Participant()
+    participant.hand = [Card(rank, Card.SUITS[0]) for rank in ranks]
+    assert participant.score() == score
+    assert participant.is_busted() == (score > 21)